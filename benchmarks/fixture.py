@@ -0,0 +1,1900 @@
+"""
+Generates a synthetic jar (and matching mappings) shaped like a Minecraft
+client jar, so that Burger can be benchmarked without downloading anything.
+
+The jar contains:
+- a few thousand obfuscated filler classes with string constants, fields and
+  methods, which is what identify spends most of its time scanning;
+- classes carrying each of the strings identify looks for;
+- Blocks, Items, EntityType, BlockEntityType, ParticleTypes and Biomes, whose
+  <clinit> registers thousands of entries through the same lambdas, builders
+  and block state properties as the real jar, and the classes they refer to;
+- entity classes defining synched data, and the entity data serializers;
+- ConnectionProtocol/PacketFlow enums and packet list classes in the shape the
+  packets topping expects, plus the packet classes themselves;
+- tag, recipe and language JSON, version.json and other resources.
+"""
+
+import io
+import json
+import random
+import struct
+import zipfile
+
+from jawa.assemble import assemble
+from jawa.attribute import ATTRIBUTE_CLASSES
+from jawa.attributes.bootstrap import BootstrapMethod
+from jawa.attributes.inner_classes import InnerClass
+from jawa.cf import ClassFile
+
+# Deobfuscated names of the classes identify looks for, along with the strings
+# that identify them
+IDENTIFY_TARGETS = (
+    ('net.minecraft.server.level.ServerEntity', 'Fetching packet for removed entity'),
+    ('net.minecraft.world.item.ItemStack', '#%04d/%d%s'),
+    ('net.minecraft.client.multiplayer.ClientPacketListener', 'disconnect.lost'),
+    (
+        'net.minecraft.server.network.ServerGamePacketListenerImpl',
+        ' just tried to change non-editable sign',
+    ),
+    ('net.minecraft.nbt.CompoundTag', 'Tag name'),
+    ('net.minecraft.network.syncher.SynchedEntityData', '! (Max is 254)'),
+    (
+        'net.minecraft.world.level.block.entity.BlockEntity',
+        'Skipping BlockEntity with id ',
+    ),
+    (
+        'net.minecraft.server.level.ChunkMap',
+        'ThreadedAnvilChunkStorage ({}): All chunks are saved',
+    ),
+    (
+        'net.minecraft.world.level.block.state.StateDefinition$Builder',
+        'has invalidly named property',
+    ),
+    ('net.minecraft.core.IdMap', 'No value with id '),
+    ('net.minecraft.resources.ResourceKey', 'ResourceKey['),
+    ('net.minecraft.core.particles.ParticleTypes', 'bubble'),
+    ('net.minecraft.world.entity.EntityType', 'Skipping Entity with id'),
+    ('net.minecraft.world.level.biome.Biomes', 'ice_spikes'),
+    ('net.minecraft.references.Blocks', 'attached_pumpkin_stem'),
+    ('net.minecraft.references.Items', 'pumpkin_seeds'),
+    ('net.minecraft.core.BlockPos', 'The two directions cannot be on the same axis'),
+    (
+        'net.minecraft.core.Direction$Plane',
+        'HORIZONTAL',
+        "Someone's been tampering with the universe!",
+    ),
+    (
+        'net.minecraft.server.network.ServerHandshakePacketListenerImpl',
+        'multiplayer.disconnect.outdated_client',
+    ),
+)
+
+# Blocks with a block entity
+BLOCK_ENTITIES = ('furnace', 'chest', 'brewing_stand')
+
+# Plugin channels sent through the custom payload packets
+CHANNELS = ('brand', 'debug/paths', 'debug/neighbors_update')
+
+# Method handle kinds
+REF_INVOKE_STATIC = 6
+REF_NEW_INVOKE_SPECIAL = 8
+
+METAFACTORY = (
+    'java/lang/invoke/LambdaMetafactory',
+    'metafactory',
+    '(Ljava/lang/invoke/MethodHandles$Lookup;Ljava/lang/String;'
+    'Ljava/lang/invoke/MethodType;Ljava/lang/invoke/MethodType;'
+    'Ljava/lang/invoke/MethodHandle;Ljava/lang/invoke/MethodType;)'
+    'Ljava/lang/invoke/CallSite;',
+)
+
+# Access flags of inner classes
+INNER_CLASS = 0x0009  # public static
+INNER_INTERFACE = 0x0609  # public static interface abstract
+
+WORDS = (
+    'stone granite diorite andesite dirt grass podzol cobble oak spruce birch '
+    'jungle acacia cherry mangrove bamboo sand gravel ore iron gold copper coal '
+    'lapis redstone emerald wool glass terracotta concrete slab stairs wall fence '
+    'door trapdoor button plate sign banner bed candle lantern chain rail piston'
+).split()
+
+
+def _names():
+    """Yields short, unique, obfuscated-looking class names."""
+    alphabet = 'abcdefghijklmnopqrstuvwxyz'
+    length = 1
+    while True:
+        indices = [0] * length
+        while True:
+            yield ''.join(alphabet[i] for i in indices)
+            for pos in range(length - 1, -1, -1):
+                indices[pos] += 1
+                if indices[pos] < len(alphabet):
+                    break
+                indices[pos] = 0
+            else:
+                break
+        length += 1
+
+
+def _method(cf, name, descriptor, code, *, static=True, max_stack=8, max_locals=8):
+    method = cf.methods.create(name, descriptor, code=True)
+    method.access_flags.acc_static = static
+    method.code.max_stack = max_stack
+    method.code.max_locals = max_locals
+    method.code.assemble(assemble(code))
+    return method
+
+
+def _abstract_method(cf, name, descriptor):
+    method = cf.methods.create(name, descriptor)
+    method.access_flags.acc_abstract = True
+    return method
+
+
+def _constructor(cf, descriptor, super_descriptor='()V', arguments=()):
+    """
+    Adds a constructor that calls the superclass constructor, after running
+    `arguments` to push what it's passed.
+    """
+    init = cf.constants.create_method_ref(
+        cf.super_.name.value, '<init>', super_descriptor
+    )
+    code = [('aload_0',), *arguments, ('invokespecial', init), ('return',)]
+    return _method(cf, '<init>', descriptor, code, static=False)
+
+
+def _ldc(cf, value):
+    """Loads a string, a float or an existing constant (such as a class)."""
+    if isinstance(value, str):
+        const = cf.constants.create_string(value)
+    elif isinstance(value, float):
+        const = cf.constants.create_float(value)
+    else:
+        const = value
+    # ldc only takes a one byte index
+    return ('ldc' if const.index < 256 else 'ldc_w', const)
+
+
+def _signature(cf, owner, signature):
+    # Importing jawa.attributes.signature directly before jawa.attribute
+    # leaves Signature out of jawa's attribute registry, so look it up there
+    attribute = owner.attributes.create(ATTRIBUTE_CLASSES['Signature'], None)
+    attribute.signature = cf.constants.create_utf8(signature)
+
+
+def _field(cf, name, descriptor, *, static=True, signature=None, enum=False):
+    field = cf.fields.create(name, descriptor)
+    field.access_flags.acc_public = True
+    field.access_flags.acc_static = static
+    field.access_flags.acc_final = True
+    field.access_flags.acc_enum = enum
+    if signature is not None:
+        _signature(cf, field, signature)
+    return field
+
+
+def _interface(cf):
+    cf.access_flags.acc_interface = True
+    cf.access_flags.acc_abstract = True
+
+
+def _implements(cf, interface):
+    cf._interfaces.append(cf.constants.create_class(interface).index)
+
+
+def _inner_classes(cf, *inner):
+    """Lists `inner` (pairs of class name and access flags) as inner classes."""
+    attribute = cf.attributes.create(ATTRIBUTE_CLASSES['InnerClasses'], None)
+    outer = cf.constants.create_class(cf.this.name.value)
+    for name, flags in inner:
+        attribute.inner_classes.append(
+            InnerClass(
+                cf.constants.create_class(name).index,
+                outer.index,
+                cf.constants.create_utf8(name.rpartition('$')[2]).index,
+                flags,
+            )
+        )
+
+
+class _BootstrapMethodsAttribute(ATTRIBUTE_CLASSES['BootstrapMethods']):
+    # jawa hands the arguments of each method to struct.pack as one tuple, so
+    # it can only write methods that take a single argument
+    def pack(self):
+        out = io.BytesIO()
+        out.write(struct.pack('>H', len(self.table)))
+        for method in self.table:
+            arguments = method.bootstrap_args
+            out.write(struct.pack('>HH', method.method_ref, len(arguments)))
+            out.write(struct.pack(f'>{len(arguments)}H', *arguments))
+        return out.getvalue()
+
+
+def _lambda(cf, name, descriptor, kind, target, sam, instantiated):
+    """
+    Returns the constant for an invokedynamic that makes a lambda or method
+    reference with LambdaMetafactory, as javac does.  `target` is the class,
+    name and descriptor of the method that a handle of `kind` refers to.
+    Like javac, the handle is put just before the invokedynamic constant,
+    which the blocks topping relies on.
+    """
+    if cf.attributes.find_one(name='BootstrapMethods') is None:
+        cf.attributes.create(_BootstrapMethodsAttribute)
+    pool = cf.constants
+    metafactory = pool.create_method_ref(*METAFACTORY)
+    pool.append((15, REF_INVOKE_STATIC, metafactory.index))
+    bootstrap = pool.raw_count - 1
+    pool.append((16, pool.create_utf8(sam).index))
+    sam_type = pool.raw_count - 1
+    pool.append((16, pool.create_utf8(instantiated).index))
+    instantiated_type = pool.raw_count - 1
+    name_and_type = pool.create_name_and_type(name, descriptor)
+    reference = pool.create_method_ref(*target)
+    pool.append((15, kind, reference.index))
+    handle = pool.raw_count - 1
+    cf.bootstrap_methods.append(
+        BootstrapMethod(bootstrap, (sam_type, handle, instantiated_type))
+    )
+    pool.append((18, len(cf.bootstrap_methods) - 1, name_and_type.index))
+    return pool.get(pool.raw_count - 1)
+
+
+class FixtureBuilder:
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.names = _names()
+        self.classes = []
+        # Classes by deobfuscated name
+        self.class_files = {}
+        # Lines of the mappings file, in order
+        self.mappings = []
+        self.resources = {}
+
+    def new_class(self, real_name, super_='java/lang/Object', obfuscated=None):
+        if obfuscated is None:
+            obfuscated = next(self.names)
+        cf = ClassFile.create(obfuscated, super_)
+        self.classes.append(cf)
+        self.class_files[real_name] = cf
+        self.mappings.append(f'{real_name} -> {obfuscated}:')
+        return cf
+
+    def name_of(self, real_name):
+        return self.class_files[real_name].this.name.value
+
+    def map_field(self, real_type, real_name, obfuscated):
+        self.mappings.append(f'    {real_type} {real_name} -> {obfuscated}')
+
+    def map_method(self, real_type, real_name, params, obfuscated):
+        line = self.random.randint(1, 5000)
+        self.mappings.append(
+            f'    {line}:{line + 3}:{real_type} {real_name}({params}) -> {obfuscated}'
+        )
+
+    def add_filler_class(self, index):
+        cf = self.new_class(f'net.minecraft.synthetic.Filler{index}')
+        for field_index in range(4):
+            name = f'f{field_index}'
+            _field(cf, name, 'I', static=False)
+            self.map_field('int', f'field{field_index}', name)
+        for method_index in range(6):
+            strings = [
+                f'{self.random.choice(WORDS)}.{self.random.choice(WORDS)}.{index}.{method_index}'
+                for _ in range(3)
+            ]
+            code = []
+            for string in strings:
+                code.append(_ldc(cf, string))
+                code.append(('pop',))
+            code.append(('return',))
+            name = f'm{method_index}'
+            _method(cf, name, '()V', code)
+            self.map_method('void', f'method{method_index}', '', name)
+
+    def add_identify_target(self, real_name, *strings):
+        cf = self.new_class(real_name)
+        code = []
+        for string in strings:
+            code.extend((_ldc(cf, string), ('pop',)))
+        _method(
+            cf, 'a', '()Ljava/lang/String;', [*code, ('aconst_null',), ('areturn',)]
+        )
+        self.map_method('java.lang.String', 'describe', '', 'a')
+        return cf
+
+    def add_level_chunk(self):
+        """
+        Adds LevelChunk, whose getBlockState method identifies BlockState
+        through its return type.
+        """
+        block_state = self.new_class('net.minecraft.world.level.block.state.BlockState')
+        cf = self.new_class('net.minecraft.world.level.chunk.LevelChunk')
+        descriptor = f'()L{block_state.this.name.value};'
+        _method(
+            cf,
+            'a',
+            descriptor,
+            [_ldc(cf, 'Getting block state'), ('pop',), ('aconst_null',), ('areturn',)],
+            static=False,
+        )
+        self.map_method(
+            'net.minecraft.world.level.block.state.BlockState', 'getBlockState', '', 'a'
+        )
+
+    def add_particle_argument(self):
+        """
+        Adds ParticleArgument, whose generic interface identifies
+        ParticleOptions.
+        """
+        options = self.new_class('net.minecraft.core.particles.ParticleOptions')
+        cf = self.new_class('net.minecraft.commands.arguments.ParticleArgument')
+        interface = cf.constants.create_class(
+            'com/mojang/brigadier/arguments/ArgumentType'
+        )
+        cf._interfaces.append(interface.index)
+        _signature(
+            cf,
+            cf,
+            'Ljava/lang/Object;Lcom/mojang/brigadier/arguments/ArgumentType'
+            f'<L{options.this.name.value};>;',
+        )
+        _method(
+            cf,
+            'a',
+            '()Ljava/lang/String;',
+            [_ldc(cf, 'particle.notFound'), ('areturn',)],
+        )
+        self.map_method('java.lang.String', 'describe', '', 'a')
+
+    def add_registry(self, real_name, identifying_string, entries, entry_class):
+        """
+        Adds a registry class whose <clinit> registers every entry by name,
+        in the shape of net.minecraft.sounds.SoundEvents.
+        """
+        cf = self.new_class(real_name)
+        register = cf.constants.create_method_ref(
+            cf.this.name.value,
+            'a',
+            f'(Ljava/lang/String;)L{entry_class};',
+        )
+        code = []
+        for index, entry in enumerate([identifying_string, *entries]):
+            field = f'f{index}'
+            _field(cf, field, f'L{entry_class};')
+            self.map_field(
+                'net.minecraft.synthetic.Entry', entry.upper().replace('.', '_'), field
+            )
+            code.append(_ldc(cf, entry))
+            code.append(('invokestatic', register))
+            code.append(
+                (
+                    'putstatic',
+                    cf.constants.create_field_ref(
+                        cf.this.name.value, field, f'L{entry_class};'
+                    ),
+                )
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        _method(
+            cf,
+            'a',
+            f'(Ljava/lang/String;)L{entry_class};',
+            [('aconst_null',), ('areturn',)],
+        )
+        self.map_method(
+            'net.minecraft.synthetic.Entry', 'register', 'java.lang.String', 'a'
+        )
+        return cf
+
+    def add_enum(self, real_name, constants, identifying=True):
+        cf = self.new_class(real_name, 'java/lang/Enum')
+        cf.access_flags.acc_enum = True
+        cf.access_flags.acc_final = True
+        this = cf.this.name.value
+        init = cf.constants.create_method_ref(this, '<init>', '(Ljava/lang/String;I)V')
+        code = []
+        for index, name in enumerate(constants):
+            field = f'f{index}'
+            _field(cf, field, f'L{this};', enum=True)
+            self.map_field(real_name, name, field)
+            code.extend(
+                [
+                    ('new', cf.constants.create_class(this)),
+                    ('dup',),
+                    _ldc(cf, name),
+                    ('bipush', index),
+                    ('invokespecial', init),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{this};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        return cf
+
+    def add_packets(self, packets_per_state):
+        """
+        Adds ConnectionProtocol, PacketFlow, the packet list classes and the
+        packet classes, in the shape the packets topping expects.
+        """
+        self.add_enum(
+            'net.minecraft.network.ConnectionProtocol',
+            ['HANDSHAKING', 'PLAY', 'STATUS', 'LOGIN', 'CONFIGURATION'],
+        )
+        flow = self.add_enum(
+            'net.minecraft.network.protocol.PacketFlow', ['CLIENTBOUND', 'SERVERBOUND']
+        )
+        flow_name = flow.this.name.value
+        flow_fields = {
+            name: field.name.value
+            for name, field in zip(('CLIENTBOUND', 'SERVERBOUND'), flow.fields)
+        }
+
+        packetbuffer = self.add_identify_target(
+            'net.minecraft.network.FriendlyByteBuf', 'VarIntArray with size '
+        )
+        packetbuffer_name = packetbuffer.this.name.value
+        identifier = self.add_identify_target(
+            'net.minecraft.resources.ResourceLocation', 'minecraft'
+        )
+        for name in ('a', 'b'):
+            field = _field(identifier, name, 'Ljava/lang/String;', static=False)
+            field.access_flags.acc_public = False
+            field.access_flags.acc_private = True
+        self.map_field('java.lang.String', 'namespace', 'a')
+        self.map_field('java.lang.String', 'path', 'b')
+        identifier_name = identifier.this.name.value
+        registration = self.new_class('net.minecraft.network.protocol.PacketType')
+        registration_name = registration.this.name.value
+
+        lists = (
+            (
+                'net.minecraft.network.protocol.handshake.HandshakePacketTypes',
+                'intention',
+                ('SERVERBOUND',),
+                1,
+            ),
+            (
+                'net.minecraft.network.protocol.login.LoginPacketTypes',
+                'custom_query',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                packets_per_state,
+            ),
+            (
+                'net.minecraft.network.protocol.cookie.CookiePacketTypes',
+                'cookie_request',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                2,
+            ),
+            (
+                'net.minecraft.network.protocol.common.CommonPacketTypes',
+                'resource_pack_pop',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                packets_per_state,
+            ),
+            (
+                'net.minecraft.network.protocol.game.GamePacketTypes',
+                'block_destruction',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                packets_per_state * 8,
+            ),
+            (
+                'net.minecraft.network.protocol.ping.PingPacketTypes',
+                'ping_request',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                2,
+            ),
+            (
+                'net.minecraft.network.protocol.status.StatusPacketTypes',
+                'status_request',
+                ('CLIENTBOUND', 'SERVERBOUND'),
+                2,
+            ),
+        )
+        for real_name, identifying_name, directions, count in lists:
+            packet_names = [identifying_name] + [
+                f'{identifying_name.split("_")[0]}_packet_{i}' for i in range(count - 1)
+            ]
+            if identifying_name == 'intention':
+                packet_names = ['intention']
+
+            cf = self.new_class(real_name)
+            this = cf.this.name.value
+            register_methods = {}
+            for index, direction in enumerate(directions):
+                method_name = 'ab'[index]
+                register_methods[direction] = method_name
+                descriptor = f'(Ljava/lang/String;)L{registration_name};'
+                _method(
+                    cf,
+                    method_name,
+                    descriptor,
+                    [
+                        ('new', cf.constants.create_class(registration_name)),
+                        ('dup',),
+                        (
+                            'getstatic',
+                            cf.constants.create_field_ref(
+                                flow_name, flow_fields[direction], f'L{flow_name};'
+                            ),
+                        ),
+                        ('aload_0',),
+                        (
+                            'invokestatic',
+                            cf.constants.create_method_ref(
+                                identifier_name,
+                                'a',
+                                f'(Ljava/lang/String;)L{identifier_name};',
+                            ),
+                        ),
+                        (
+                            'invokespecial',
+                            cf.constants.create_method_ref(
+                                registration_name,
+                                '<init>',
+                                f'(L{flow_name};L{identifier_name};)V',
+                            ),
+                        ),
+                        ('areturn',),
+                    ],
+                )
+            _method(cf, '<init>', '()V', [('return',)], static=False)
+
+            code = []
+            for index, packet_name in enumerate(packet_names):
+                direction = directions[index % len(directions)]
+                packet = self.add_packet_class(
+                    f'{real_name}$Packet{index}', packetbuffer_name
+                )
+                field = f'f{index}'
+                _field(
+                    cf,
+                    field,
+                    f'L{registration_name};',
+                    signature=f'L{registration_name}<L{packet.this.name.value};>;',
+                )
+                code.extend(
+                    [
+                        _ldc(cf, packet_name),
+                        (
+                            'invokestatic',
+                            cf.constants.create_method_ref(
+                                this,
+                                register_methods[direction],
+                                f'(Ljava/lang/String;)L{registration_name};',
+                            ),
+                        ),
+                        (
+                            'putstatic',
+                            cf.constants.create_field_ref(
+                                this, field, f'L{registration_name};'
+                            ),
+                        ),
+                    ]
+                )
+            code.append(('return',))
+            _method(cf, '<clinit>', '()V', code)
+
+    def add_packet_class(self, real_name, packetbuffer_name):
+        cf = self.new_class(real_name)
+        this = cf.this.name.value
+        _field(cf, 'a', 'I', static=False)
+        self.map_field('int', 'value', 'a')
+        _method(cf, '<init>', f'(L{packetbuffer_name};)V', [('return',)], static=False)
+        _method(
+            cf,
+            'a',
+            f'(L{packetbuffer_name};)V',
+            [
+                ('aload_1',),
+                ('aload_0',),
+                ('getfield', cf.constants.create_field_ref(this, 'a', 'I')),
+                (
+                    'invokevirtual',
+                    cf.constants.create_method_ref(
+                        packetbuffer_name, 'c', f'(I)L{packetbuffer_name};'
+                    ),
+                ),
+                ('pop',),
+                ('return',),
+            ],
+            static=False,
+        )
+        self.map_method('void', 'write', 'net.minecraft.network.FriendlyByteBuf', 'a')
+        return cf
+
+    def add_block_base(self):
+        """
+        Adds Block, BlockBehaviour and BlockBehaviour$Properties, with the
+        setters the blocks topping looks for.
+        """
+        package = 'net.minecraft.world.level.block'
+        container = self.name_of(f'{package}.state.StateDefinition$Builder')
+        behaviour = self.new_class(f'{package}.state.BlockBehaviour')
+        _constructor(behaviour, '()V')
+        behaviour_name = behaviour.this.name.value
+
+        real_properties = f'{package}.state.BlockBehaviour$Properties'
+        cf = self.new_class(real_properties, obfuscated=f'{behaviour_name}$d')
+        this = cf.this.name.value
+        returns = f'L{this};'
+        _constructor(cf, '()V')
+        _method(
+            cf,
+            'i',
+            f'(){returns}',
+            [
+                ('new', cf.constants.create_class(this)),
+                ('dup',),
+                (
+                    'invokespecial',
+                    cf.constants.create_method_ref(this, '<init>', '()V'),
+                ),
+                ('areturn',),
+            ],
+        )
+        self.map_method(real_properties, 'of', '', 'i')
+        setters = (
+            ('a', 'strength', 'float,float', '(FF)', []),
+            (
+                'b',
+                'strength',
+                'float',
+                '(F)',
+                [
+                    ('fload_1',),
+                    ('fload_1',),
+                    (
+                        'invokevirtual',
+                        cf.constants.create_method_ref(this, 'a', f'(FF){returns}'),
+                    ),
+                ],
+            ),
+            (
+                'c',
+                'instabreak',
+                '',
+                '()',
+                [
+                    ('fconst_0',),
+                    (
+                        'invokevirtual',
+                        cf.constants.create_method_ref(this, 'b', f'(F){returns}'),
+                    ),
+                ],
+            ),
+            ('d', 'forceSolidOn', '', '()', []),
+            ('e', 'forceSolidOff', '', '()', []),
+            ('f', 'requiresCorrectToolForDrops', '', '()', []),
+            ('g', 'friction', 'float', '(F)', []),
+            (
+                'h',
+                'lightLevel',
+                'java.util.function.ToIntFunction',
+                '(Ljava/util/function/ToIntFunction;)',
+                [],
+            ),
+        )
+        for name, real_name, params, arguments, code in setters:
+            _method(
+                cf,
+                name,
+                arguments + returns,
+                [('aload_0',), *code, ('areturn',)],
+                static=False,
+            )
+            self.map_method(real_properties, real_name, params, name)
+
+        block = self.new_class(f'{package}.Block', behaviour_name)
+        _constructor(block, f'({returns})V')
+        method = _method(block, 'a', f'(L{container};)V', [('return',)], static=False)
+        method.access_flags.acc_public = False
+        method.access_flags.acc_protected = True
+        self.map_method(
+            'void',
+            'createBlockStateDefinition',
+            f'{package}.state.StateDefinition$Builder',
+            'a',
+        )
+
+    def add_block_state_properties(self):
+        """
+        Adds the property types and BlockStateProperties, whose <clinit>
+        creates a property of each type.
+        """
+        package = 'net.minecraft.world.level.block.state.properties'
+        direction = self.add_enum(
+            'net.minecraft.core.Direction',
+            ['DOWN', 'UP', 'NORTH', 'SOUTH', 'EAST', 'WEST'],
+        ).this.name.value
+        axis = self.add_enum('net.minecraft.core.Direction$Axis', ['X', 'Y', 'Z'])
+        rail_shape = self.add_enum(
+            f'{package}.RailShape',
+            ['NORTH_SOUTH', 'EAST_WEST', 'ASCENDING_EAST', 'ASCENDING_WEST'],
+        )
+
+        property_ = self.new_class(f'{package}.Property').this.name.value
+        enum = f'<T:Ljava/lang/Enum<TT;>;>L{property_}<TT;>;'
+        # The block states topping expects five property types; the last one
+        # stands in for the enum property subclasses of older versions
+        types = {}
+        for kind, super_, signature in (
+            ('BooleanProperty', None, f'L{property_}<Ljava/lang/Boolean;>;'),
+            ('IntegerProperty', None, f'L{property_}<Ljava/lang/Integer;>;'),
+            ('EnumProperty', None, enum),
+            ('DirectionProperty', 'EnumProperty', None),
+            ('RailShapeProperty', 'EnumProperty', enum),
+        ):
+            super_ = property_ if super_ is None else types[super_]
+            if signature is None:
+                signature = f'L{super_}<L{direction};>;'
+            cf = self.new_class(f'{package}.{kind}', super_)
+            _signature(cf, cf, signature)
+            types[kind] = cf.this.name.value
+
+        cf = self.new_class(f'{package}.BlockStateProperties')
+        this = cf.this.name.value
+        axis_class = cf.constants.create_class(axis.this.name.value)
+        rail_shape_class = cf.constants.create_class(rail_shape.this.name.value)
+        properties = (
+            ('LIT', 'lit', 'BooleanProperty', [], ''),
+            ('WATERLOGGED', 'waterlogged', 'BooleanProperty', [], ''),
+            ('AGE_7', 'age', 'IntegerProperty', [('bipush', 0), ('bipush', 7)], 'II'),
+            (
+                'AXIS',
+                'axis',
+                'EnumProperty',
+                [_ldc(cf, axis_class)],
+                'Ljava/lang/Class;',
+            ),
+            ('FACING', 'facing', 'DirectionProperty', [], ''),
+            (
+                'RAIL_SHAPE',
+                'shape',
+                'RailShapeProperty',
+                [_ldc(cf, rail_shape_class)],
+                'Ljava/lang/Class;',
+            ),
+        )
+        # Fields by deobfuscated name, as (field, type) pairs
+        self.block_state_properties = {}
+        code = []
+        for index, (real_name, name, kind, arguments, descriptor) in enumerate(
+            properties
+        ):
+            field = f'f{index}'
+            type_ = types[kind]
+            _field(cf, field, f'L{type_};')
+            self.map_field(f'{package}.{kind}', real_name, field)
+            self.block_state_properties[real_name] = (field, type_)
+            create = cf.constants.create_method_ref(
+                type_, 'a', f'(Ljava/lang/String;{descriptor})L{type_};'
+            )
+            code.extend(
+                [
+                    _ldc(cf, name),
+                    *arguments,
+                    ('invokestatic', create),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{type_};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+
+    def add_block_class(self, real_name, super_, properties=None):
+        """
+        Adds a block class.  If `properties` (names of BlockStateProperties
+        fields) is given, its createBlockStateDefinition adds them.
+        """
+        package = 'net.minecraft.world.level.block'
+        block_properties = self.name_of(f'{package}.state.BlockBehaviour$Properties')
+        cf = self.new_class(real_name, super_)
+        descriptor = f'(L{block_properties};)V'
+        _constructor(cf, descriptor, descriptor, [('aload_1',)])
+        if properties is None:
+            return cf
+
+        state_properties = self.name_of(
+            f'{package}.state.properties.BlockStateProperties'
+        )
+        property_ = self.name_of(f'{package}.state.properties.Property')
+        container = self.name_of(f'{package}.state.StateDefinition$Builder')
+        code = [
+            ('aload_1',),
+            ('bipush', len(properties)),
+            ('anewarray', cf.constants.create_class(property_)),
+        ]
+        for index, name in enumerate(properties):
+            field, type_ = self.block_state_properties[name]
+            code.extend(
+                [
+                    ('dup',),
+                    ('bipush', index),
+                    (
+                        'getstatic',
+                        cf.constants.create_field_ref(
+                            state_properties, field, f'L{type_};'
+                        ),
+                    ),
+                    ('aastore',),
+                ]
+            )
+        add = cf.constants.create_method_ref(
+            container, 'a', f'([L{property_};)L{container};'
+        )
+        code.extend([('invokevirtual', add), ('pop',), ('return',)])
+        method = _method(cf, 'a', f'(L{container};)V', code, static=False)
+        method.access_flags.acc_public = False
+        method.access_flags.acc_protected = True
+        self.map_method(
+            'void',
+            'createBlockStateDefinition',
+            f'{package}.state.StateDefinition$Builder',
+            'a',
+        )
+        return cf
+
+    def add_block_entities(self, names):
+        """
+        Adds BlockEntityType, whose <clinit> registers a block entity class
+        for each of `names`.  Returns the block entity classes by name.
+        """
+        package = 'net.minecraft.world.level.block'
+        block = self.name_of(f'{package}.Block')
+        block_entity = self.class_files[f'{package}.entity.BlockEntity']
+        position = self.name_of('net.minecraft.core.BlockPos')
+        state = self.name_of(f'{package}.state.BlockState')
+
+        cf = self.new_class(f'{package}.entity.BlockEntityType')
+        this = cf.this.name.value
+        _constructor(block_entity, f'(L{this};L{position};L{state};)V', '()V', [])
+        block_entity_name = block_entity.this.name.value
+        supplier = self.new_class(
+            f'{package}.entity.BlockEntityType$BlockEntitySupplier',
+            obfuscated=f'{this}$a',
+        )
+        _interface(supplier)
+        factory = f'(L{position};L{state};)'
+        _abstract_method(supplier, 'a', f'{factory}L{block_entity_name};')
+        supplier = supplier.this.name.value
+
+        classes = {}
+        for index, name in enumerate(names):
+            real_name = ''.join(word.title() for word in name.split('_'))
+            block_entity_class = self.new_class(
+                f'{package}.entity.{real_name}BlockEntity', block_entity_name
+            )
+            field = block_entity_class.constants.create_field_ref(
+                this, f'f{index}', f'L{this};'
+            )
+            _constructor(
+                block_entity_class,
+                f'{factory}V',
+                f'(L{this};L{position};L{state};)V',
+                [('getstatic', field), ('aload_1',), ('aload_2',)],
+            )
+            classes[name] = block_entity_class.this.name.value
+
+        _inner_classes(cf, (supplier, INNER_INTERFACE))
+        register = cf.constants.create_method_ref(
+            this, 'a', f'(Ljava/lang/String;L{supplier};[L{block};)L{this};'
+        )
+        _method(
+            cf,
+            'a',
+            register.name_and_type.descriptor.value,
+            [('aconst_null',), ('areturn',)],
+        )
+        code = []
+        for index, (name, block_entity_class) in enumerate(classes.items()):
+            field = f'f{index}'
+            _field(
+                cf, field, f'L{this};', signature=f'L{this}<L{block_entity_class};>;'
+            )
+            create = _lambda(
+                cf,
+                'create',
+                f'()L{supplier};',
+                REF_NEW_INVOKE_SPECIAL,
+                (block_entity_class, '<init>', f'{factory}V'),
+                f'{factory}L{block_entity_name};',
+                f'{factory}L{block_entity_class};',
+            )
+            code.extend(
+                [
+                    _ldc(cf, name),
+                    ('invokedynamic', create, 0, 0),
+                    ('bipush', 0),
+                    ('anewarray', cf.constants.create_class(block)),
+                    ('invokestatic', register),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{this};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        return classes
+
+    def add_blocks(self, blocks, block_entities):
+        """
+        Adds the block classes and Blocks, whose <clinit> registers each of
+        `blocks` with a block class and some properties, in the shape the
+        blocks topping expects.  `block_entities` are the block entity
+        classes by name, which get blocks of their own.  Returns the Blocks
+        field of each block by name.
+        """
+        package = 'net.minecraft.world.level.block'
+        block = self.name_of(f'{package}.Block')
+        block_properties = self.name_of(f'{package}.state.BlockBehaviour$Properties')
+        block_entity = self.name_of(f'{package}.entity.BlockEntity')
+        position = self.name_of('net.minecraft.core.BlockPos')
+        state = self.name_of(f'{package}.state.BlockState')
+
+        crop = self.add_block_class(f'{package}.CropBlock', block, ['AGE_7'])
+        simple = [
+            block,
+            crop.this.name.value,
+            self.add_block_class(
+                f'{package}.CarrotBlock', crop.this.name.value
+            ).this.name.value,
+        ]
+        for real_name, properties in (
+            ('RedstoneLampBlock', ['LIT']),
+            ('RotatedPillarBlock', ['AXIS']),
+            ('RailBlock', ['RAIL_SHAPE']),
+            ('StairBlock', ['FACING', 'WATERLOGGED']),
+        ):
+            cf = self.add_block_class(f'{package}.{real_name}', block, properties)
+            simple.append(cf.this.name.value)
+
+        entity_block = self.new_class(f'{package}.EntityBlock')
+        _interface(entity_block)
+        factory = f'(L{position};L{state};)L{block_entity};'
+        _abstract_method(entity_block, 'a', factory)
+        base = self.add_block_class(f'{package}.BaseEntityBlock', block)
+        base.access_flags.acc_abstract = True
+        _implements(base, entity_block.this.name.value)
+        entries = [('piston_head', block), ('air', block)]
+        for name, block_entity_class in block_entities.items():
+            real_name = ''.join(word.title() for word in name.split('_'))
+            properties = {
+                'furnace': ['FACING', 'LIT'],
+                'chest': ['FACING'],
+            }.get(name, [])
+            cf = self.add_block_class(
+                f'{package}.{real_name}Block', base.this.name.value, properties
+            )
+            init = cf.constants.create_method_ref(
+                block_entity_class, '<init>', f'(L{position};L{state};)V'
+            )
+            _method(
+                cf,
+                'a',
+                factory,
+                [
+                    ('new', cf.constants.create_class(block_entity_class)),
+                    ('dup',),
+                    ('aload_1',),
+                    ('aload_2',),
+                    ('invokespecial', init),
+                    ('areturn',),
+                ],
+                static=False,
+            )
+            entries.append((name, cf.this.name.value))
+        entries.extend((name, self.random.choice(simple)) for name in blocks)
+
+        cf = self.new_class(f'{package}.Blocks')
+        this = cf.this.name.value
+        returns = f'L{block_properties};'
+
+        def setter(name, arguments):
+            return (
+                'invokevirtual',
+                cf.constants.create_method_ref(
+                    block_properties, name, f'({arguments}){returns}'
+                ),
+            )
+
+        strength = setter('b', 'F')
+        setters = (
+            [],
+            [_ldc(cf, 1.5), strength],
+            [setter('c', '')],
+            [_ldc(cf, 3.0), strength, setter('f', '')],
+            [_ldc(cf, 0.98), setter('g', 'F')],
+        )
+        of = cf.constants.create_method_ref(block_properties, 'i', f'(){returns}')
+        descriptor = (
+            f'(Ljava/lang/String;Ljava/util/function/Function;{returns})L{block};'
+        )
+        register = cf.constants.create_method_ref(this, 'a', descriptor)
+        # One lambda per block class, as javac shares identical method references
+        factories = {}
+        fields = {}
+        code = []
+        for index, (name, block_class) in enumerate(entries):
+            field = f'f{index}'
+            _field(cf, field, f'L{block};')
+            self.map_field(f'{package}.Block', name.upper(), field)
+            fields[name] = field
+            if block_class not in factories:
+                factories[block_class] = _lambda(
+                    cf,
+                    'apply',
+                    '()Ljava/util/function/Function;',
+                    REF_NEW_INVOKE_SPECIAL,
+                    (block_class, '<init>', f'({returns})V'),
+                    '(Ljava/lang/Object;)Ljava/lang/Object;',
+                    f'({returns})L{block_class};',
+                )
+            code.extend(
+                [
+                    _ldc(cf, name),
+                    ('invokedynamic', factories[block_class], 0, 0),
+                    ('invokestatic', of),
+                    *self.random.choice(setters),
+                    ('invokestatic', register),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{block};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        _method(cf, 'a', descriptor, [('aconst_null',), ('areturn',)])
+        self.map_method(
+            f'{package}.Block',
+            'register',
+            'java.lang.String,java.util.function.Function,'
+            f'{package}.state.BlockBehaviour$Properties',
+            'a',
+        )
+        _method(
+            cf,
+            'b',
+            f'(Ljava/lang/String;L{block};)L{block};',
+            [('aconst_null',), ('areturn',)],
+        )
+        self.map_method(
+            f'{package}.Block',
+            'registerLegacyStair',
+            f'java.lang.String,{package}.Block',
+            'b',
+        )
+        return fields
+
+    def add_items(self, items, block_fields):
+        """
+        Adds Item, BlockItem and Items, whose <clinit> registers each of
+        `items`.  Items that are also blocks (in `block_fields`, the Blocks
+        field of each block by name) are registered from their block.
+        """
+        package = 'net.minecraft.world.item'
+        component_type = self.new_class(
+            'net.minecraft.core.component.DataComponentType'
+        ).this.name.value
+        components = self.new_class('net.minecraft.core.component.DataComponents')
+        _field(components, 'a', f'L{component_type};')
+        components = components.this.name.value
+
+        item = self.new_class(f'{package}.Item')
+        item_name = item.this.name.value
+        real_properties = f'{package}.Item$Properties'
+        cf = self.new_class(real_properties, obfuscated=f'{item_name}$a')
+        properties = cf.this.name.value
+        returns = f'L{properties};'
+        _constructor(cf, '()V')
+        component = cf.constants.create_method_ref(
+            properties, 'b', f'(L{component_type};Ljava/lang/Object;){returns}'
+        )
+        _method(
+            cf,
+            'a',
+            f'(I){returns}',
+            [
+                ('aload_0',),
+                (
+                    'getstatic',
+                    cf.constants.create_field_ref(
+                        components, 'a', f'L{component_type};'
+                    ),
+                ),
+                ('iload_1',),
+                (
+                    'invokestatic',
+                    cf.constants.create_method_ref(
+                        'java/lang/Integer', 'valueOf', '(I)Ljava/lang/Integer;'
+                    ),
+                ),
+                ('invokevirtual', component),
+                ('areturn',),
+            ],
+            static=False,
+        )
+        self.map_method(real_properties, 'stacksTo', 'int', 'a')
+        _method(
+            cf,
+            'b',
+            component.name_and_type.descriptor.value,
+            [('aload_0',), ('areturn',)],
+            static=False,
+        )
+        self.map_method(
+            real_properties,
+            'component',
+            'net.minecraft.core.component.DataComponentType,java.lang.Object',
+            'b',
+        )
+        _constructor(item, f'({returns})V')
+
+        block = self.name_of('net.minecraft.world.level.block.Block')
+        blocks = self.name_of('net.minecraft.world.level.block.Blocks')
+        block_item = self.new_class(f'{package}.BlockItem', item_name)
+        _constructor(
+            block_item, f'(L{block};{returns})V', f'({returns})V', [('aload_2',)]
+        )
+
+        cf = self.new_class(f'{package}.Items')
+        this = cf.this.name.value
+        item_class = cf.constants.create_class(item_name)
+        properties_class = cf.constants.create_class(properties)
+        properties_init = cf.constants.create_method_ref(properties, '<init>', '()V')
+        item_init = cf.constants.create_method_ref(item_name, '<init>', f'({returns})V')
+        stacks_to = cf.constants.create_method_ref(properties, 'a', f'(I){returns}')
+        stack_sizes = ([], [('bipush', 16), ('invokevirtual', stacks_to)])
+        register_item = cf.constants.create_method_ref(
+            this, 'a', f'(Ljava/lang/String;L{item_name};)L{item_name};'
+        )
+        register_block = cf.constants.create_method_ref(
+            this, 'b', f'(L{block};)L{item_name};'
+        )
+        code = []
+        for index, name in enumerate(['diamond_pickaxe', *items]):
+            field = f'f{index}'
+            _field(cf, field, f'L{item_name};')
+            self.map_field(f'{package}.Item', name.upper(), field)
+            if name in block_fields:
+                block_field = cf.constants.create_field_ref(
+                    blocks, block_fields[name], f'L{block};'
+                )
+                code.extend(
+                    [('getstatic', block_field), ('invokestatic', register_block)]
+                )
+            else:
+                code.extend(
+                    [
+                        _ldc(cf, name),
+                        ('new', item_class),
+                        ('dup',),
+                        ('new', properties_class),
+                        ('dup',),
+                        ('invokespecial', properties_init),
+                        *self.random.choice(stack_sizes),
+                        ('invokespecial', item_init),
+                        ('invokestatic', register_item),
+                    ]
+                )
+            code.append(
+                (
+                    'putstatic',
+                    cf.constants.create_field_ref(this, field, f'L{item_name};'),
+                )
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        _method(
+            cf,
+            'a',
+            register_item.name_and_type.descriptor.value,
+            [('aload_1',), ('areturn',)],
+        )
+        self.map_method(
+            f'{package}.Item', 'registerItem', f'java.lang.String,{package}.Item', 'a'
+        )
+        _method(
+            cf,
+            'b',
+            register_block.name_and_type.descriptor.value,
+            [
+                ('new', cf.constants.create_class(block_item.this.name.value)),
+                ('dup',),
+                ('aload_0',),
+                ('new', properties_class),
+                ('dup',),
+                ('invokespecial', properties_init),
+                (
+                    'invokespecial',
+                    cf.constants.create_method_ref(
+                        block_item.this.name.value,
+                        '<init>',
+                        f'(L{block};{returns})V',
+                    ),
+                ),
+                ('areturn',),
+            ],
+        )
+        self.map_method(
+            f'{package}.Item',
+            'registerBlock',
+            'net.minecraft.world.level.block.Block',
+            'b',
+        )
+
+    def add_synched_entity_data(self):
+        """
+        Adds the builder of SynchedEntityData, EntityDataAccessor and the
+        entity data serializers, in the shape the entity metadata topping
+        expects.  Returns the serializer fields as (field, value type) pairs.
+        """
+        syncher = 'net.minecraft.network.syncher'
+        codec = self.new_class(
+            'net.minecraft.network.codec.StreamCodec'
+        ).this.name.value
+        codecs = self.new_class('net.minecraft.network.codec.ByteBufCodecs')
+        accessor = self.new_class(f'{syncher}.EntityDataAccessor')
+        serializer = self.new_class(f'{syncher}.EntityDataSerializer')
+        serializers = self.new_class(f'{syncher}.EntityDataSerializers')
+        this = serializers.this.name.value
+        value_types = (
+            'java/lang/Byte',
+            'java/lang/Integer',
+            'java/lang/Float',
+            'java/lang/String',
+            self.name_of('net.minecraft.network.chat.Component'),
+            'java/lang/Boolean',
+        )
+
+        _constructor(accessor, '()V')
+        serializer_name = serializer.this.name.value
+        _method(
+            accessor,
+            'a',
+            f'()L{serializer_name};',
+            [('aconst_null',), ('areturn',)],
+            static=False,
+        )
+        accessor = accessor.this.name.value
+
+        # forValueType wraps a codec in a lambda, as EntityDataSerializer does
+        _interface(serializer)
+        _abstract_method(serializer, 'c', f'()L{codec};')
+        wrap = _lambda(
+            serializer,
+            'c',
+            f'(L{codec};)L{serializer_name};',
+            REF_INVOKE_STATIC,
+            (serializer_name, 'b', f'(L{codec};)L{codec};'),
+            f'()L{codec};',
+            f'()L{codec};',
+        )
+        _method(
+            serializer,
+            'a',
+            f'(L{codec};)L{serializer_name};',
+            [('aload_0',), ('invokedynamic', wrap, 0, 0), ('areturn',)],
+        )
+        _method(serializer, 'b', f'(L{codec};)L{codec};', [('aload_0',), ('areturn',)])
+
+        for_value_type = serializers.constants.create_method_ref(
+            serializer_name, 'a', f'(L{codec};)L{serializer_name};'
+        )
+        register = serializers.constants.create_method_ref(
+            this, 'a', f'(L{serializer_name};)V'
+        )
+        code = []
+        registration = []
+        fields = []
+        for index, value_type in enumerate(value_types):
+            field = f'f{index}'
+            _field(codecs, field, f'L{codec};')
+            _field(
+                serializers,
+                field,
+                f'L{serializer_name};',
+                signature=f'L{serializer_name}<L{value_type};>;',
+            )
+            reference = serializers.constants.create_field_ref(
+                this, field, f'L{serializer_name};'
+            )
+            code.extend(
+                [
+                    (
+                        'getstatic',
+                        serializers.constants.create_field_ref(
+                            codecs.this.name.value, field, f'L{codec};'
+                        ),
+                    ),
+                    ('invokestatic', for_value_type),
+                    ('putstatic', reference),
+                ]
+            )
+            registration.extend([('getstatic', reference), ('invokestatic', register)])
+            fields.append((field, value_type))
+        _method(serializers, '<clinit>', '()V', [*code, *registration, ('return',)])
+        _method(serializers, 'a', f'(L{serializer_name};)V', [('return',)])
+        _method(
+            serializers,
+            'b',
+            f'(L{serializer_name};)I',
+            [('bipush', 0), ('ireturn',)],
+        )
+
+        metadata = self.class_files[f'{syncher}.SynchedEntityData']
+        metadata_name = metadata.this.name.value
+        builder = self.new_class(
+            f'{syncher}.SynchedEntityData$Builder', obfuscated=f'{metadata_name}$a'
+        )
+        builder_name = builder.this.name.value
+        _inner_classes(metadata, (builder_name, INNER_CLASS))
+        _method(
+            metadata,
+            'b',
+            f'(Ljava/lang/Class;L{serializer_name};)L{accessor};',
+            [
+                ('new', metadata.constants.create_class(accessor)),
+                ('dup',),
+                (
+                    'invokespecial',
+                    metadata.constants.create_method_ref(accessor, '<init>', '()V'),
+                ),
+                ('areturn',),
+            ],
+        )
+        _constructor(builder, '()V')
+        _method(
+            builder,
+            'a',
+            f'(L{accessor};Ljava/lang/Object;)L{builder_name};',
+            [
+                ('aload_1',),
+                (
+                    'invokevirtual',
+                    builder.constants.create_method_ref(
+                        accessor, 'a', f'()L{serializer_name};'
+                    ),
+                ),
+                (
+                    'invokestatic',
+                    builder.constants.create_method_ref(
+                        this, 'b', f'(L{serializer_name};)I'
+                    ),
+                ),
+                ('pop',),
+                _ldc(builder, 'Unregistered serializer '),
+                ('pop',),
+                ('aload_0',),
+                ('areturn',),
+            ],
+            static=False,
+        )
+        return fields
+
+    def add_entities(self, mobs, serializers):
+        """
+        Adds the entity classes, each defining some synched data, and the
+        <clinit> of EntityType, which registers an item, an armor stand and
+        each of `mobs`, in the shape the entities topping expects.
+        `serializers` are the serializer fields from add_synched_entity_data.
+        Returns the names of the registered entities.
+        """
+        package = 'net.minecraft.world.entity'
+        syncher = 'net.minecraft.network.syncher'
+        entity_type = self.class_files[f'{package}.EntityType']
+        this = entity_type.this.name.value
+        metadata = self.name_of(f'{syncher}.SynchedEntityData')
+        builder = self.name_of(f'{syncher}.SynchedEntityData$Builder')
+        accessor = self.name_of(f'{syncher}.EntityDataAccessor')
+        serializer = self.name_of(f'{syncher}.EntityDataSerializer')
+        serializer_fields = self.name_of(f'{syncher}.EntityDataSerializers')
+        define = (builder, 'a', f'(L{accessor};Ljava/lang/Object;)L{builder};')
+        define_id = (metadata, 'b', f'(Ljava/lang/Class;L{serializer};)L{accessor};')
+        define_synched_data = f'(L{builder};)V'
+        boxes = {
+            'java/lang/Byte': ('B', ('bipush', 0)),
+            'java/lang/Integer': ('I', ('bipush', 0)),
+            'java/lang/Float': ('F', ('fconst_0',)),
+            'java/lang/Boolean': ('Z', ('bipush', 0)),
+        }
+
+        def add_accessor(cf, field, value_type):
+            """Adds a static accessor field, and the code that defines it."""
+            class_name = cf.this.name.value
+            _field(cf, 'a', f'L{accessor};', signature=f'L{accessor}<L{value_type};>;')
+            _method(
+                cf,
+                '<clinit>',
+                '()V',
+                [
+                    _ldc(cf, cf.constants.create_class(class_name)),
+                    (
+                        'getstatic',
+                        cf.constants.create_field_ref(
+                            serializer_fields, field, f'L{serializer};'
+                        ),
+                    ),
+                    ('invokestatic', cf.constants.create_method_ref(*define_id)),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(class_name, 'a', f'L{accessor};'),
+                    ),
+                    ('return',),
+                ],
+            )
+            if value_type == 'java/lang/String':
+                default = [_ldc(cf, '')]
+            elif value_type in boxes:
+                primitive, load = boxes[value_type]
+                value_of = cf.constants.create_method_ref(
+                    value_type, 'valueOf', f'({primitive})L{value_type};'
+                )
+                default = [load, ('invokestatic', value_of)]
+            else:
+                default = [('aconst_null',)]
+            return [
+                (
+                    'getstatic',
+                    cf.constants.create_field_ref(class_name, 'a', f'L{accessor};'),
+                ),
+                *default,
+                ('invokevirtual', cf.constants.create_method_ref(*define)),
+                ('pop',),
+            ]
+
+        entity = self.new_class(f'{package}.Entity')
+        entity.access_flags.acc_abstract = True
+        entity_name = entity.this.name.value
+        define_flags = add_accessor(entity, *serializers[0])
+        _field(entity, 'b', f'L{builder};', static=False)
+        data = entity.constants.create_field_ref(entity_name, 'b', f'L{builder};')
+        _method(
+            entity,
+            '<init>',
+            f'(L{this};)V',
+            [
+                ('aload_0',),
+                (
+                    'invokespecial',
+                    entity.constants.create_method_ref(
+                        'java/lang/Object', '<init>', '()V'
+                    ),
+                ),
+                ('aload_0',),
+                ('new', entity.constants.create_class(builder)),
+                ('dup',),
+                (
+                    'invokespecial',
+                    entity.constants.create_method_ref(builder, '<init>', '()V'),
+                ),
+                ('putfield', data),
+                ('aload_0',),
+                ('getfield', data),
+                *define_flags,
+                ('aload_0',),
+                ('aload_0',),
+                ('getfield', data),
+                (
+                    'invokevirtual',
+                    entity.constants.create_method_ref(
+                        entity_name, 'a', define_synched_data
+                    ),
+                ),
+                ('return',),
+            ],
+            static=False,
+        )
+        _abstract_method(entity, 'a', define_synched_data)
+        _method(entity, 'c', '(I)Z', [('bipush', 0), ('ireturn',)], static=False)
+        _method(
+            entity,
+            'd',
+            '()Z',
+            [
+                ('aload_0',),
+                ('bipush', 0),
+                (
+                    'invokevirtual',
+                    entity.constants.create_method_ref(entity_name, 'c', '(I)Z'),
+                ),
+                ('ireturn',),
+            ],
+            static=False,
+        )
+
+        def add_entity(real_name, super_, abstract=False, synched=True):
+            cf = self.new_class(real_name, super_)
+            cf.access_flags.acc_abstract = abstract
+            descriptor = f'(L{this};)V'
+            _constructor(cf, descriptor, descriptor, [('aload_1',)])
+            if synched:
+                code = [
+                    ('aload_0',),
+                    ('aload_1',),
+                    (
+                        'invokespecial',
+                        cf.constants.create_method_ref(
+                            super_, 'a', define_synched_data
+                        ),
+                    ),
+                    ('aload_1',),
+                    *add_accessor(cf, *self.random.choice(serializers)),
+                    ('return',),
+                ]
+                _method(cf, 'a', define_synched_data, code, static=False)
+            return cf.this.name.value
+
+        living = add_entity(f'{package}.LivingEntity', entity_name, abstract=True)
+        mob = add_entity(f'{package}.Mob', living, abstract=True, synched=False)
+        entities = [
+            ('item', add_entity(f'{package}.item.ItemEntity', entity_name)),
+            ('armor_stand', add_entity(f'{package}.decoration.ArmorStand', living)),
+        ]
+        for index, name in enumerate(mobs):
+            entities.append(
+                (name, add_entity(f'{package}.synthetic.SyntheticMob{index}', mob))
+            )
+
+        category = self.add_enum(
+            f'{package}.MobCategory', ['MONSTER', 'CREATURE', 'AMBIENT', 'MISC']
+        ).this.name.value
+        factory = f'{this}$b'
+        real_builder = f'{package}.EntityType$Builder'
+        cf = self.new_class(real_builder, obfuscated=f'{this}$a')
+        type_builder = cf.this.name.value
+        returns = f'L{type_builder};'
+        _constructor(cf, '()V')
+        _method(
+            cf,
+            'a',
+            f'(L{factory};L{category};){returns}',
+            [
+                ('new', cf.constants.create_class(type_builder)),
+                ('dup',),
+                (
+                    'invokespecial',
+                    cf.constants.create_method_ref(type_builder, '<init>', '()V'),
+                ),
+                ('areturn',),
+            ],
+        )
+        self.map_method(
+            real_builder,
+            'of',
+            f'{package}.EntityType$EntityFactory,{package}.MobCategory',
+            'a',
+        )
+        for name, real_name, params, arguments in (
+            ('a', 'sized', 'float,float', '(FF)'),
+            ('b', 'eyeHeight', 'float', '(F)'),
+        ):
+            _method(
+                cf,
+                name,
+                arguments + returns,
+                [('aload_0',), ('areturn',)],
+                static=False,
+            )
+            self.map_method(real_builder, real_name, params, name)
+        cf = self.new_class(f'{package}.EntityType$EntityFactory', obfuscated=factory)
+        _interface(cf)
+        _abstract_method(cf, 'a', f'(L{this};)L{entity_name};')
+
+        _inner_classes(
+            entity_type, (type_builder, INNER_CLASS), (factory, INNER_INTERFACE)
+        )
+        pool = entity_type.constants
+        of = pool.create_method_ref(
+            type_builder, 'a', f'(L{factory};L{category};){returns}'
+        )
+        sized = pool.create_method_ref(type_builder, 'a', f'(FF){returns}')
+        eye_height = pool.create_method_ref(type_builder, 'b', f'(F){returns}')
+        misc = pool.create_field_ref(category, 'f3', f'L{category};')
+        register = pool.create_method_ref(
+            this, 'b', f'(Ljava/lang/String;{returns})L{this};'
+        )
+        sizes = [_ldc(entity_type, size) for size in (0.25, 0.5, 0.6, 1.8)]
+        code = []
+        for index, (name, entity_class) in enumerate(entities):
+            field = f'f{index}'
+            _field(
+                entity_type, field, f'L{this};', signature=f'L{this}<L{entity_class};>;'
+            )
+            create = _lambda(
+                entity_type,
+                'create',
+                f'()L{factory};',
+                REF_NEW_INVOKE_SPECIAL,
+                (entity_class, '<init>', f'(L{this};)V'),
+                f'(L{this};)L{entity_name};',
+                f'(L{this};)L{entity_class};',
+            )
+            code.extend(
+                [
+                    _ldc(entity_type, name),
+                    ('invokedynamic', create, 0, 0),
+                    ('getstatic', misc),
+                    ('invokestatic', of),
+                    self.random.choice(sizes),
+                    self.random.choice(sizes),
+                    ('invokevirtual', sized),
+                    self.random.choice(sizes),
+                    ('invokevirtual', eye_height),
+                    ('invokestatic', register),
+                    ('putstatic', pool.create_field_ref(this, field, f'L{this};')),
+                ]
+            )
+        code.append(('return',))
+        _method(entity_type, '<clinit>', '()V', code)
+        _method(
+            entity_type,
+            'b',
+            register.name_and_type.descriptor.value,
+            [('aconst_null',), ('areturn',)],
+        )
+        return [name for name, _ in entities]
+
+    def add_particle_types(self, particles):
+        """Adds the <clinit> of ParticleTypes, which registers `particles`."""
+        simple = self.new_class(
+            'net.minecraft.core.particles.SimpleParticleType'
+        ).this.name.value
+        cf = self.class_files['net.minecraft.core.particles.ParticleTypes']
+        this = cf.this.name.value
+        register = cf.constants.create_method_ref(
+            this, 'b', f'(Ljava/lang/String;Z)L{simple};'
+        )
+        code = []
+        for index, name in enumerate(particles):
+            field = f'f{index}'
+            _field(cf, field, f'L{simple};')
+            code.extend(
+                [
+                    _ldc(cf, name),
+                    ('bipush', 0),
+                    ('invokestatic', register),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{simple};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        _method(
+            cf,
+            'b',
+            register.name_and_type.descriptor.value,
+            [('aconst_null',), ('areturn',)],
+        )
+
+    def add_biomes(self, biomes):
+        """
+        Adds Biome, a couple of subclasses and the <clinit> of Biomes, which
+        registers each of `biomes` with a numeric id.
+        """
+        package = 'net.minecraft.world.level.biome'
+        biome = self.new_class(f'{package}.Biome')
+        _constructor(biome, '()V')
+        biome = biome.this.name.value
+        classes = [biome]
+        for real_name in ('IceSpikesBiome', 'DesertBiome'):
+            cf = self.new_class(f'{package}.{real_name}', biome)
+            _constructor(cf, '()V')
+            classes.append(cf.this.name.value)
+
+        cf = self.class_files[f'{package}.Biomes']
+        this = cf.this.name.value
+        register = cf.constants.create_method_ref(
+            this, 'b', f'(ILjava/lang/String;L{biome};)L{biome};'
+        )
+        inits = {
+            biome_class: (
+                cf.constants.create_class(biome_class),
+                cf.constants.create_method_ref(biome_class, '<init>', '()V'),
+            )
+            for biome_class in classes
+        }
+        code = []
+        for index, name in enumerate(biomes):
+            field = f'f{index}'
+            _field(cf, field, f'L{biome};')
+            biome_class, init = inits[self.random.choice(classes)]
+            code.extend(
+                [
+                    ('bipush' if index < 128 else 'sipush', index),
+                    _ldc(cf, name),
+                    ('new', biome_class),
+                    ('dup',),
+                    ('invokespecial', init),
+                    ('invokestatic', register),
+                    (
+                        'putstatic',
+                        cf.constants.create_field_ref(this, field, f'L{biome};'),
+                    ),
+                ]
+            )
+        code.append(('return',))
+        _method(cf, '<clinit>', '()V', code)
+        _method(
+            cf,
+            'b',
+            register.name_and_type.descriptor.value,
+            [('aconst_null',), ('areturn',)],
+        )
+
+    def add_tags(self, registry, entries, count):
+        for index in range(count):
+            values = [
+                f'minecraft:{value}'
+                for value in self.random.sample(entries, min(len(entries), 12))
+            ]
+            # Reference a couple of earlier tags, so that flattening has work to do
+            for _ in range(min(index, 2)):
+                values.append(f'#minecraft:tag_{self.random.randrange(index)}')
+            self.resources[f'data/minecraft/tags/{registry}/tag_{index}.json'] = {
+                'values': values
+            }
+
+    def add_recipes(self, items, count):
+        for index in range(count):
+            name = 'stick' if index == 0 else f'recipe_{index}'
+            if index % 2:
+                recipe = {
+                    'type': 'minecraft:crafting_shapeless',
+                    'ingredients': [
+                        {'item': f'minecraft:{item}'}
+                        for item in self.random.sample(items, 3)
+                    ],
+                    'result': {
+                        'item': f'minecraft:{self.random.choice(items)}',
+                        'count': 1,
+                    },
+                }
+            else:
+                recipe = {
+                    'type': 'minecraft:crafting_shaped',
+                    'pattern': ['##', '#X'],
+                    'key': {
+                        '#': {'item': f'minecraft:{self.random.choice(items)}'},
+                        'X': {'tag': f'minecraft:tag_{self.random.randrange(10)}'},
+                    },
+                    'result': {
+                        'item': f'minecraft:{self.random.choice(items)}',
+                        'count': 4,
+                    },
+                }
+            self.resources[f'data/minecraft/recipes/{name}.json'] = recipe
+
+    def write_jar(self, path):
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for cf in self.classes:
+                buffer = io.BytesIO()
+                cf.save(buffer)
+                zf.writestr(f'{cf.this.name.value}.class', buffer.getvalue())
+            for name, value in self.resources.items():
+                if isinstance(value, bytes):
+                    zf.writestr(name, value)
+                else:
+                    zf.writestr(name, json.dumps(value))
+
+    def write_mappings(self, path):
+        with open(path, 'w') as fout:
+            fout.write('# synthetic mappings generated by benchmarks/fixture.py\n')
+            fout.write('\n'.join(self.mappings))
+            fout.write('\n')
+
+
+def build_fixture(jar_path, mappings_path, *, classes=4000, registry_size=1000, seed=0):
+    """
+    Writes a synthetic jar and mappings file.  `classes` is the number of
+    filler classes and `registry_size` the number of blocks and items.
+    """
+    builder = FixtureBuilder(seed)
+
+    blocks = [f'{builder.random.choice(WORDS)}_block_{i}' for i in range(registry_size)]
+    items = blocks + [
+        f'{builder.random.choice(WORDS)}_item_{i}' for i in range(registry_size)
+    ]
+    sounds = [f'block.{block}.break' for block in blocks]
+    mobs = [f'synthetic_mob_{i}' for i in range(max(registry_size // 10, 1))]
+    particles = [
+        'bubble',
+        'flame',
+        'smoke',
+        *(f'particle_{i}' for i in range(registry_size // 10)),
+    ]
+    biomes = [
+        'ice_spikes',
+        'plains',
+        'desert',
+        'forest',
+        *(
+            f'{builder.random.choice(WORDS)}_biome_{i}'
+            for i in range(registry_size // 10)
+        ),
+    ]
+
+    builder.add_identify_target('net.minecraft.network.chat.Component', 'chat')
+    for real_name, *strings in IDENTIFY_TARGETS:
+        builder.add_identify_target(real_name, *strings)
+    builder.add_identify_target(
+        'net.minecraft.network.protocol.common.ClientboundCustomPayloadPacket',
+        'Payload may not be larger than 1048576 bytes',
+        *CHANNELS,
+    )
+    builder.add_identify_target(
+        'net.minecraft.network.protocol.common.ServerboundCustomPayloadPacket',
+        'Payload may not be larger than 32767 bytes',
+        'brand',
+    )
+    builder.add_level_chunk()
+    builder.add_particle_argument()
+    builder.add_packets(packets_per_state=12)
+
+    builder.add_block_base()
+    builder.add_block_state_properties()
+    block_entities = builder.add_block_entities(BLOCK_ENTITIES)
+    block_fields = builder.add_blocks(blocks, block_entities)
+    builder.add_items(items, block_fields)
+    serializers = builder.add_synched_entity_data()
+    entities = builder.add_entities(mobs, serializers)
+    builder.add_particle_types(particles)
+    builder.add_biomes(biomes)
+
+    sound_class = builder.new_class('net.minecraft.sounds.SoundEvent').this.name.value
+    builder.add_registry(
+        'net.minecraft.sounds.SoundEvents', 'ambient.cave', sounds, sound_class
+    )
+
+    for index in range(classes):
+        builder.add_filler_class(index)
+
+    # Startup classes aren't obfuscated
+    main = ClassFile.create('net/minecraft/client/main/Main')
+    _method(main, 'main', '([Ljava/lang/String;)V', [('return',)])
+    builder.classes.append(main)
+
+    # Plural tag directories, as in the versions with data/minecraft/recipes/
+    builder.add_tags('blocks', blocks, registry_size // 4)
+    builder.add_tags('items', items, registry_size // 4)
+    builder.add_recipes(items, registry_size)
+
+    language = {}
+    for kind, names in (
+        ('block', [*BLOCK_ENTITIES, *blocks]),
+        ('item', items),
+        ('entity', entities),
+        ('biome', biomes),
+    ):
+        for name in names:
+            language[f'{kind}.minecraft.{name}'] = name.replace('_', ' ').title()
+    for index in range(registry_size * 4):
+        language[f'gui.synthetic.{index}'] = f'Synthetic string {index}'
+    builder.resources['assets/minecraft/lang/en_us.json'] = language
+
+    for index in range(registry_size * 3):
+        builder.resources[f'assets/minecraft/textures/block/texture_{index}.png'] = (
+            bytes(builder.random.getrandbits(8) for _ in range(64))
+        )
+
+    builder.resources['version.json'] = {
+        'id': 'synthetic',
+        'name': 'synthetic',
+        'world_version': 4000,
+        'protocol_version': 770,
+    }
+
+    builder.write_jar(jar_path)
+    builder.write_mappings(mappings_path)
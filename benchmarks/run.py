@@ -0,0 +1,254 @@
+"""
+Runs Burger against a synthetic jar and reports how long each stage takes.
+
+    $ python -m benchmarks.run --save results.json
+    $ python -m benchmarks.run --baseline results.json
+
+Each stage is repeated several times and the median is reported.  Passing
+--baseline compares against a previously saved result, and marks stages that
+got noticeably slower.  Exits with a non-zero status if any topping fails, as
+its timing (and that of everything depending on it) wouldn't mean anything.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from jawa.transforms import expand_constants, simple_swap
+
+from benchmarks.fixture import build_fixture
+from burger import jarindex, registry
+from burger.classloader import JarClassLoader
+from burger.mappings import Mappings, set_global_mappings
+from burger.output import write_sharded
+from burger.roundedfloats import transform_floats
+from burger.scheduler import ToppingScheduler
+
+RESULTS_FORMAT = 1
+
+# Toppings that need network access, which the benchmarks must not depend on
+NETWORK_TOPPINGS = ('sounds',)
+
+# Stages slower than the baseline by more than this ratio are flagged
+REGRESSION_THRESHOLD = 1.1
+# Stages faster than this (in seconds) are too noisy to be flagged
+MINIMUM_FLAGGED_DURATION = 0.001
+
+
+class Timings:
+    def __init__(self):
+        self.runs = {}
+        self.status = {}
+
+    def record(self, name, duration, succeeded=True):
+        self.runs.setdefault(name, []).append(duration)
+        if not succeeded:
+            self.status[name] = 'failed'
+        else:
+            self.status.setdefault(name, 'ok')
+
+    def time(self, name, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.record(name, time.perf_counter() - start)
+        return result
+
+    def to_json(self):
+        return {
+            name: {
+                'median': statistics.median(runs),
+                'min': min(runs),
+                'runs': runs,
+                'status': self.status[name],
+            }
+            for name, runs in self.runs.items()
+        }
+
+
+def run_topping(timings, classloader):
+    def run(topping, aggregate):
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            topping.act(aggregate, classloader)
+            succeeded = True
+        finally:
+            timings.record(
+                f'topping.{topping.__name__}',
+                time.perf_counter() - start,
+                succeeded,
+            )
+
+    return run
+
+
+def run_benchmarks(jar_path, mappings_path, repeat, timings):
+    # munch lives at the top level of the repository, next to this package
+    import munch
+
+    with open(mappings_path, 'r') as fin:
+        mappings_txt = fin.read()
+
+    for _ in range(repeat):
+        mappings = timings.time('mappings.parse', Mappings.parse, mappings_txt)
+    set_global_mappings(mappings)
+
+    all_toppings = timings.time('toppings.import', registry.import_toppings)
+    timings.time('toppings.manifest', registry.load_toppings)
+    loaded_toppings = [
+        topping
+        for name, topping in all_toppings.items()
+        if name not in NETWORK_TOPPINGS
+    ]
+    to_be_run = munch.order_toppings(loaded_toppings, {})
+
+    # Always time building the jar index, even if one is left over from an
+    # earlier run with --fixture-dir
+    sha1 = jarindex.jar_sha1(jar_path)
+    index = timings.time(
+        'jar.index.build', jarindex.JarIndex.build, JarClassLoader(jar_path), sha1
+    )
+    index.save(jarindex.index_path(jar_path))
+
+    aggregate = None
+    for _ in range(repeat):
+        classloader = timings.time(
+            'jar.open',
+            JarClassLoader,
+            jar_path,
+            max_cache=0,
+            bytecode_transforms=[simple_swap, expand_constants],
+        )
+        classloader.index = timings.time(
+            'jar.index.load', jarindex.load_or_build, jar_path, classloader
+        )
+        aggregate = {'source': {'file': jar_path}}
+        ToppingScheduler(to_be_run, aggregate, run_topping(timings, classloader)).run()
+
+    for _ in range(repeat):
+        timings.time(
+            'output.json',
+            lambda: json.dumps(transform_floats([aggregate]), sort_keys=True, indent=4),
+        )
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(repeat):
+            timings.time('output.sharded', write_sharded, aggregate, output_dir)
+
+
+def format_comparison(results, baseline):
+    lines = [f'{"stage":<40} {"median (s)":>11} {"baseline":>11} {"ratio":>7}']
+    lines.append('-' * len(lines[0]))
+    for name, result in results.items():
+        line = f'{name:<40} {result["median"]:>11.4f}'
+        if baseline and name in baseline:
+            base = baseline[name]['median']
+            ratio = result['median'] / base if base else float('inf')
+            line += f' {base:>11.4f} {ratio:>7.2f}'
+            if max(base, result['median']) < MINIMUM_FLAGGED_DURATION:
+                pass
+            elif ratio > REGRESSION_THRESHOLD:
+                line += '  SLOWER'
+            elif ratio < 1 / REGRESSION_THRESHOLD:
+                line += '  faster'
+        if result['status'] != 'ok':
+            line += f'  ({result["status"]})'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def load_fixture_parameters(path):
+    """
+    Returns the parameters a kept fixture was built with, or None if they
+    weren't saved.
+    """
+    try:
+        with open(path, 'r') as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='benchmarks',
+        description='Benchmarks Burger against a synthetic Minecraft-like jar.',
+    )
+    parser.add_argument(
+        '--classes', type=int, default=4000, help='Number of filler classes'
+    )
+    parser.add_argument(
+        '--registry-size',
+        type=int,
+        default=1000,
+        help='Number of blocks and items in the generated registries',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a saved result')
+    parser.add_argument(
+        '--fixture-dir',
+        help='Keep the generated jar and mappings in this directory, reusing them if they were built with the same --classes and --registry-size',
+    )
+    parser.add_argument('-L', '--log', default='warning')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log.upper())
+
+    fixture = {'classes': args.classes, 'registry_size': args.registry_size}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fixture_dir = args.fixture_dir or temp_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+        jar_path = os.path.join(fixture_dir, 'synthetic.jar')
+        mappings_path = os.path.join(fixture_dir, 'synthetic-mappings.txt')
+        # What the fixture was built with, so that one built with other
+        # parameters is rebuilt instead of being timed under these
+        parameters_path = os.path.join(fixture_dir, 'synthetic.json')
+        if not (
+            os.path.exists(jar_path)
+            and os.path.exists(mappings_path)
+            and load_fixture_parameters(parameters_path) == fixture
+        ):
+            build_fixture(jar_path, mappings_path, **fixture)
+            with open(parameters_path, 'w') as fout:
+                json.dump(fixture, fout)
+
+        timings = Timings()
+        run_benchmarks(jar_path, mappings_path, args.repeat, timings)
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'python': platform.python_version(),
+        'fixture': fixture,
+        'repeat': args.repeat,
+        'results': timings.to_json(),
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as fin:
+            baseline = json.load(fin)['results']
+
+    print(format_comparison(results['results'], baseline))
+
+    if args.save:
+        with open(args.save, 'w') as fout:
+            json.dump(results, fout, indent=4)
+
+    # A failed topping isn't timed properly, so the results can't be trusted
+    failed = [
+        name for name, result in results['results'].items() if result['status'] != 'ok'
+    ]
+    if failed:
+        print(f'Failed: {", ".join(failed)}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import io
+from collections import Counter
+from contextlib import contextmanager
+from itertools import repeat
+
+from jawa.cf import ClassFile
+from jawa.classloader import ClassLoader
+from jawa.constants import ConstantPool, String
+
+from burger import tracing
+from burger.jarfile import MappedJar, UnsupportedJarError
+from burger.pathindex import PathIndex
+from burger.resources import ResourceTable
+from burger.statics import StaticTable
+from burger.xrefs import XrefIndex
+
+
+class JarClassLoader(ClassLoader):
+    """
+    The ClassLoader used by Burger.  Behaves like jawa's, but memory-maps jars
+    with MappedJar instead of reading them through zipfile, keeps counters of
+    how often classes are loaded and parsed so that runs can be profiled, and
+    records parses with the tracer.
+    """
+
+    def __init__(self, *sources, **kwargs):
+        self.stats = Counter()
+        # A burger.jarindex.JarIndex for the loaded jar, if one has been set
+        self.index = None
+        self._xrefs = None
+        self._statics = None
+        self._resources = None
+        self._paths = None
+        super().__init__(*sources, **kwargs)
+
+    @property
+    def xrefs(self) -> XrefIndex:
+        """Where each field and method is referenced, built as it is needed."""
+        if self._xrefs is None:
+            self._xrefs = XrefIndex(self)
+        return self._xrefs
+
+    @property
+    def statics(self) -> StaticTable:
+        """What each class's static initializer sets its fields to."""
+        if self._statics is None:
+            self._statics = StaticTable(self)
+        return self._statics
+
+    @property
+    def resources(self) -> ResourceTable:
+        """The jar's data and asset files, read in bulk."""
+        if self._resources is None:
+            self._resources = ResourceTable(self)
+        return self._resources
+
+    @property
+    def paths(self) -> PathIndex:
+        """The paths of every entry, indexed for prefix searches."""
+        if self._paths is None:
+            self._paths = PathIndex(self.path_map)
+        return self._paths
+
+    @property
+    def classes(self):
+        """Yields the name of every class, in jar order."""
+        yield from self.paths.classes
+
+    def update(self, *sources, **kwargs):
+        self._paths = None
+        others = []
+        for source in sources:
+            if isinstance(source, self.klass) or not str(source).lower().endswith(
+                ('.zip', '.jar')
+            ):
+                others.append(source)
+                continue
+
+            try:
+                jar = MappedJar(str(source))
+            except UnsupportedJarError:
+                others.append(source)
+                continue
+            self.path_map.update(zip(jar.names, repeat(jar)))
+
+        if others:
+            super().update(*others, **kwargs)
+
+    def read(self, path: str):
+        """
+        Returns the contents of `path`, without copying it if possible (as a
+        `memoryview` for jar entries that aren't compressed).
+        """
+        entry = self.path_map.get(path)
+        if isinstance(entry, MappedJar):
+            self.stats['reads'] += 1
+            return entry.read(path)
+        with self.open(path) as source:
+            return source.read()
+
+    @contextmanager
+    def open(self, path: str, mode: str = 'r'):
+        entry = self.path_map.get(path)
+        if not isinstance(entry, MappedJar):
+            with super().open(path, mode) as source:
+                yield source
+            return
+
+        self.stats['reads'] += 1
+        yield io.BytesIO(entry.read(path))
+
+    def load(self, path: str) -> ClassFile:
+        self.stats['loads'] += 1
+        if path in self.class_cache:
+            return super().load(path)
+
+        self.stats['parses'] += 1
+        with tracing.span(path, 'class.parse'):
+            return super().load(path)
+
+    def search_constant_pool(self, *, path: str, **options):
+        self.stats['constant_pool_scans'] += 1
+        with tracing.span(path, 'class.constant_pool'):
+            with self.open(f'{path}.class') as source:
+                # Skip over the magic, minor, and major version.
+                source.read(8)
+                pool = ConstantPool()
+                pool.unpack(source)
+        yield from pool.find(**options)
+
+    def strings(self, path: str):
+        """
+        Returns the string constants of the class at `path`, in constant pool
+        order, from the jar index if there is one.
+        """
+        if self.index is not None and path in self.index.strings:
+            return self.index.strings[path]
+        return [
+            constant.string.value
+            for constant in self.search_constant_pool(path=path, type_=String)
+        ]
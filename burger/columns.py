@@ -0,0 +1,101 @@
+"""
+Writing the physical properties of every block as NumPy arrays, so that they
+can be looked up for many blocks at once instead of one dict at a time.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from burger.states import StateTable
+
+# Columns of the blocks and states arrays, with the value used for blocks that
+# don't set them (the defaults of BlockBehaviour.Properties).  Values that
+# aren't constants (such as light levels that depend on the state) are -1.
+BLOCK_COLUMNS = (
+    ('hardness', 'f4', 0.0),
+    ('resistance', 'f4', 0.0),
+    ('friction', 'f4', 0.6),
+    ('light', 'i1', 0),
+    ('force_solid_on', '?', False),
+    ('force_solid_off', '?', False),
+    ('requires_correct_tool_for_drops', '?', False),
+)
+
+# Columns of the blocks array that only exist once blockstates has run
+STATE_ID_COLUMNS = ('min_state_id', 'max_state_id', 'num_states')
+
+
+def _column_value(block, name, default):
+    value = block.get(name, default)
+    if isinstance(default, bool):
+        return bool(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return -1
+    return value
+
+
+def block_arrays(blocks):
+    """
+    Returns the arrays written by write_block_columns:
+
+    - text_ids: the text id of every block, in ordered_blocks order
+    - blocks: a structured array with a record per block (in the same order)
+      holding numeric_id, BLOCK_COLUMNS and STATE_ID_COLUMNS
+    - states: a structured array with a record per block state id, holding
+      the index of its block, its packed property values (see burger.states)
+      and its block's BLOCK_COLUMNS
+
+    State id columns are -1 and states is empty if block states weren't found.
+    """
+    text_ids = list(blocks['ordered_blocks'])
+    has_states = bool(text_ids) and 'min_state_id' in blocks['block'][text_ids[0]]
+
+    block_dtype = numpy.dtype(
+        [('numeric_id', 'i4')]
+        + [(name, kind) for name, kind, _ in BLOCK_COLUMNS]
+        + [(name, 'i4') for name in STATE_ID_COLUMNS]
+    )
+    block_array = numpy.zeros(len(text_ids), dtype=block_dtype)
+    for index, text_id in enumerate(text_ids):
+        block = blocks['block'][text_id]
+        block_array[index] = (
+            (block['numeric_id'],)
+            + tuple(
+                _column_value(block, name, default)
+                for name, _, default in BLOCK_COLUMNS
+            )
+            + tuple(block.get(name, -1) for name in STATE_ID_COLUMNS)
+        )
+
+    state_dtype = numpy.dtype(
+        [('block', 'i4'), ('packed', 'i4')]
+        + [(name, kind) for name, kind, _ in BLOCK_COLUMNS]
+    )
+    if has_states:
+        table = StateTable.build(blocks)
+        state_block = numpy.asarray(table.state_block, dtype='i4')
+        state_array = numpy.zeros(len(table), dtype=state_dtype)
+        state_array['block'] = state_block
+        state_array['packed'] = numpy.asarray(table.state_packed, dtype='i4')
+        for name, _, _ in BLOCK_COLUMNS:
+            state_array[name] = block_array[name][state_block]
+    else:
+        state_array = numpy.zeros(0, dtype=state_dtype)
+
+    return {
+        'text_ids': numpy.asarray(text_ids, dtype=str),
+        'blocks': block_array,
+        'states': state_array,
+    }
+
+
+def write_block_columns(blocks, path: str):
+    """
+    Writes block_arrays() for the blocks section of the aggregate to `path`,
+    as a compressed .npz file.
+    """
+    if numpy is None:
+        raise Exception('NumPy is needed to write block columns')
+    numpy.savez_compressed(path, **block_arrays(blocks))
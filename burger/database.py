@@ -0,0 +1,431 @@
+import json
+import sqlite3
+
+from burger.roundedfloats import transform_floats
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    protocol INTEGER,
+    data_version INTEGER,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    text_id TEXT NOT NULL,
+    numeric_id INTEGER,
+    class TEXT,
+    display_name TEXT,
+    hardness REAL,
+    resistance REAL,
+    friction REAL,
+    light INTEGER,
+    num_states INTEGER,
+    min_state_id INTEGER,
+    max_state_id INTEGER,
+    data TEXT,
+    PRIMARY KEY (version_id, text_id)
+);
+CREATE INDEX IF NOT EXISTS blocks_numeric_id ON blocks (version_id, numeric_id);
+CREATE INDEX IF NOT EXISTS blocks_text_id ON blocks (text_id);
+CREATE TABLE IF NOT EXISTS block_properties (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    block TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    type TEXT,
+    num_values INTEGER,
+    property_values TEXT,
+    PRIMARY KEY (version_id, block, position)
+);
+CREATE INDEX IF NOT EXISTS block_properties_name ON block_properties (version_id, name);
+CREATE TABLE IF NOT EXISTS block_states (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    state_id INTEGER NOT NULL,
+    block TEXT NOT NULL,
+    state_index INTEGER NOT NULL,
+    PRIMARY KEY (version_id, state_id)
+);
+CREATE INDEX IF NOT EXISTS block_states_block ON block_states (version_id, block);
+CREATE TABLE IF NOT EXISTS items (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    text_id TEXT NOT NULL,
+    numeric_id INTEGER,
+    class TEXT,
+    display_name TEXT,
+    max_stack_size INTEGER,
+    data TEXT,
+    PRIMARY KEY (version_id, text_id)
+);
+CREATE INDEX IF NOT EXISTS items_numeric_id ON items (version_id, numeric_id);
+CREATE INDEX IF NOT EXISTS items_text_id ON items (text_id);
+CREATE TABLE IF NOT EXISTS entities (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    name TEXT NOT NULL,
+    id INTEGER,
+    class TEXT,
+    display_name TEXT,
+    width REAL,
+    height REAL,
+    data TEXT,
+    PRIMARY KEY (version_id, name)
+);
+CREATE INDEX IF NOT EXISTS entities_id ON entities (version_id, id);
+CREATE INDEX IF NOT EXISTS entities_class ON entities (version_id, class);
+CREATE TABLE IF NOT EXISTS entity_metadata (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    entity TEXT NOT NULL,
+    class TEXT NOT NULL,
+    idx INTEGER,
+    field TEXT,
+    serializer TEXT,
+    serializer_id INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS entity_metadata_entity ON entity_metadata (version_id, entity);
+CREATE INDEX IF NOT EXISTS entity_metadata_serializer ON entity_metadata (version_id, serializer);
+CREATE TABLE IF NOT EXISTS packets (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    name TEXT NOT NULL,
+    class TEXT,
+    state TEXT,
+    direction TEXT,
+    id INTEGER,
+    PRIMARY KEY (version_id, name)
+);
+CREATE INDEX IF NOT EXISTS packets_class ON packets (version_id, class);
+CREATE TABLE IF NOT EXISTS packet_fields (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    packet TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    operation TEXT,
+    field TEXT,
+    type TEXT,
+    data TEXT,
+    PRIMARY KEY (version_id, packet, position)
+);
+CREATE INDEX IF NOT EXISTS packet_fields_field ON packet_fields (version_id, field);
+CREATE INDEX IF NOT EXISTS packet_fields_type ON packet_fields (version_id, type);
+CREATE TABLE IF NOT EXISTS tags (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    tag TEXT NOT NULL,
+    type TEXT,
+    name TEXT,
+    PRIMARY KEY (version_id, tag)
+);
+CREATE TABLE IF NOT EXISTS tag_values (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    tag TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tag_values_tag ON tag_values (version_id, tag);
+CREATE INDEX IF NOT EXISTS tag_values_value ON tag_values (version_id, value);
+CREATE TABLE IF NOT EXISTS recipes (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    id TEXT,
+    makes TEXT NOT NULL,
+    type TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS recipes_makes ON recipes (version_id, makes);
+CREATE INDEX IF NOT EXISTS recipes_id ON recipes (version_id, id);
+"""
+
+# Every table holding per-version rows, in the order they should be cleared
+VERSIONED_TABLES = (
+    'blocks',
+    'block_properties',
+    'block_states',
+    'items',
+    'entities',
+    'entity_metadata',
+    'packets',
+    'packet_fields',
+    'tags',
+    'tag_values',
+    'recipes',
+)
+
+
+def _dump(value):
+    return json.dumps(transform_floats(value), sort_keys=True, default=str)
+
+
+def version_name(aggregate) -> str:
+    """Picks the name that a run is stored under in the database."""
+    version = aggregate.get('version', {})
+    if 'id' in version:
+        return version['id']
+    if 'name' in version:
+        return version['name']
+    return aggregate['source']['file']
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens (and if needed creates) a Burger database."""
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    row = connection.execute(
+        "SELECT value FROM meta WHERE key = 'schema_version'"
+    ).fetchone()
+    if row is None:
+        connection.execute(
+            "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+    elif int(row[0]) != SCHEMA_VERSION:
+        raise Exception(
+            f'Database {path} uses schema version {row[0]}, expected {SCHEMA_VERSION}'
+        )
+    return connection
+
+
+def write_aggregate(connection: sqlite3.Connection, aggregate):
+    """
+    Stores a single run in the database, replacing any previous run of the
+    same version.  Returns the id of the version row.
+    """
+    name = version_name(aggregate)
+    version = aggregate.get('version', {})
+
+    with connection:
+        row = connection.execute(
+            'SELECT id FROM versions WHERE name = ?', (name,)
+        ).fetchone()
+        if row is not None:
+            version_id = row[0]
+            for table in VERSIONED_TABLES:
+                connection.execute(
+                    f'DELETE FROM {table} WHERE version_id = ?', (version_id,)
+                )
+            connection.execute(
+                'UPDATE versions SET protocol = ?, data_version = ?, source = ? WHERE id = ?',
+                (
+                    version.get('protocol'),
+                    version.get('data'),
+                    _dump(aggregate.get('source')),
+                    version_id,
+                ),
+            )
+        else:
+            version_id = connection.execute(
+                'INSERT INTO versions (name, protocol, data_version, source) VALUES (?, ?, ?, ?)',
+                (
+                    name,
+                    version.get('protocol'),
+                    version.get('data'),
+                    _dump(aggregate.get('source')),
+                ),
+            ).lastrowid
+
+        if 'blocks' in aggregate:
+            _write_blocks(connection, version_id, aggregate['blocks'])
+        if 'items' in aggregate:
+            _write_items(connection, version_id, aggregate['items'])
+        if 'entities' in aggregate:
+            _write_entities(connection, version_id, aggregate['entities'])
+        if 'packets' in aggregate:
+            _write_packets(connection, version_id, aggregate['packets'])
+        if 'tags' in aggregate:
+            _write_tags(connection, version_id, aggregate['tags'])
+        if 'recipes' in aggregate:
+            _write_recipes(connection, version_id, aggregate['recipes'])
+
+    return version_id
+
+
+def _write_blocks(connection, version_id, blocks):
+    block_rows = []
+    property_rows = []
+    state_rows = []
+    for text_id, block in blocks.get('block', {}).items():
+        block_rows.append(
+            (
+                version_id,
+                text_id,
+                block.get('numeric_id'),
+                block.get('class'),
+                block.get('display_name'),
+                block.get('hardness'),
+                block.get('resistance'),
+                block.get('friction'),
+                block.get('light'),
+                block.get('num_states'),
+                block.get('min_state_id'),
+                block.get('max_state_id'),
+                _dump(block),
+            )
+        )
+        for position, prop in enumerate(block.get('states', [])):
+            property_rows.append(
+                (
+                    version_id,
+                    text_id,
+                    position,
+                    prop.get('name'),
+                    prop.get('type'),
+                    prop.get('num_values'),
+                    _dump(prop.get('values')),
+                )
+            )
+        if 'min_state_id' in block:
+            for state_index in range(block['num_states']):
+                state_rows.append(
+                    (
+                        version_id,
+                        block['min_state_id'] + state_index,
+                        text_id,
+                        state_index,
+                    )
+                )
+
+    connection.executemany(
+        'INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        block_rows,
+    )
+    connection.executemany(
+        'INSERT INTO block_properties VALUES (?, ?, ?, ?, ?, ?, ?)', property_rows
+    )
+    connection.executemany('INSERT INTO block_states VALUES (?, ?, ?, ?)', state_rows)
+
+
+def _write_items(connection, version_id, items):
+    connection.executemany(
+        'INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (
+            (
+                version_id,
+                text_id,
+                item.get('numeric_id'),
+                item.get('class'),
+                item.get('display_name'),
+                item.get('max_stack_size'),
+                _dump(item),
+            )
+            for text_id, item in items.get('item', {}).items()
+        ),
+    )
+
+
+def _write_entities(connection, version_id, entities):
+    entity_rows = []
+    metadata_rows = []
+    for name, entity in entities.get('entity', {}).items():
+        entity_rows.append(
+            (
+                version_id,
+                name,
+                entity.get('id'),
+                entity.get('class'),
+                entity.get('display_name'),
+                entity.get('width'),
+                entity.get('height'),
+                _dump(entity),
+            )
+        )
+        for entry in entity.get('metadata', []):
+            for data in entry.get('data', []):
+                metadata_rows.append(
+                    (
+                        version_id,
+                        name,
+                        entry['class'],
+                        data.get('index'),
+                        data.get('field'),
+                        data.get('serializer'),
+                        data.get('serializer_id'),
+                        _dump(data),
+                    )
+                )
+
+    connection.executemany(
+        'INSERT INTO entities VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entity_rows
+    )
+    connection.executemany(
+        'INSERT INTO entity_metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?)', metadata_rows
+    )
+
+
+def _flatten_instructions(instructions, depth=0):
+    """
+    Yields (depth, instruction) for a nested packet instruction list, in the
+    order they appear in the output.
+    """
+    for instruction in instructions:
+        yield depth, instruction
+        if 'instructions' in instruction:
+            yield from _flatten_instructions(instruction['instructions'], depth + 1)
+
+
+def _write_packets(connection, version_id, packets):
+    packet_rows = []
+    field_rows = []
+    for name, packet in packets.get('packet', {}).items():
+        packet_rows.append(
+            (
+                version_id,
+                name,
+                packet.get('class'),
+                packet.get('state'),
+                packet.get('direction'),
+                packet.get('id'),
+            )
+        )
+        flattened = _flatten_instructions(packet.get('instructions', []))
+        for position, (depth, instruction) in enumerate(flattened):
+            data = {k: v for k, v in instruction.items() if k != 'instructions'}
+            field_rows.append(
+                (
+                    version_id,
+                    name,
+                    position,
+                    depth,
+                    instruction.get('operation'),
+                    instruction.get('field'),
+                    instruction.get('type'),
+                    _dump(data),
+                )
+            )
+
+    connection.executemany('INSERT INTO packets VALUES (?, ?, ?, ?, ?, ?)', packet_rows)
+    connection.executemany(
+        'INSERT INTO packet_fields VALUES (?, ?, ?, ?, ?, ?, ?, ?)', field_rows
+    )
+
+
+def _write_tags(connection, version_id, tags):
+    connection.executemany(
+        'INSERT INTO tags VALUES (?, ?, ?, ?)',
+        (
+            (version_id, key, tag.get('type'), tag.get('name'))
+            for key, tag in tags.items()
+        ),
+    )
+    connection.executemany(
+        'INSERT INTO tag_values VALUES (?, ?, ?)',
+        (
+            (version_id, key, value)
+            for key, tag in tags.items()
+            for value in tag.get('values', [])
+            if isinstance(value, str)
+        ),
+    )
+
+
+def _write_recipes(connection, version_id, recipes):
+    connection.executemany(
+        'INSERT INTO recipes VALUES (?, ?, ?, ?, ?)',
+        (
+            (version_id, recipe.get('id'), makes, recipe.get('type'), _dump(recipe))
+            for makes, recipes_for_item in recipes.items()
+            for recipe in recipes_for_item
+        ),
+    )
@@ -0,0 +1,51 @@
+from typing import Optional
+
+# The provides that are actually needed by the requested toppings and their
+# dependencies, or None if everything every topping provides is needed
+DEMAND: Optional[set] = None
+
+
+def set_global_demand(demand):
+    global DEMAND
+    DEMAND = demand
+
+
+def demanded(provide: str) -> bool:
+    return DEMAND is None or provide in DEMAND
+
+
+def resolve(requested, all_toppings):
+    """
+    Works out what is needed to compute `requested`, a list of topping names
+    (standing for everything that topping provides) and individual provides.
+    Returns the toppings that have to run, and every provide that is needed
+    from them.
+    """
+    providers = {}
+    for topping in all_toppings.values():
+        for provide in topping.PROVIDES:
+            providers.setdefault(provide, topping)
+
+    pending = []
+    for name in requested:
+        if name in all_toppings:
+            pending.extend(all_toppings[name].PROVIDES)
+        elif name in providers:
+            pending.append(name)
+        else:
+            raise Exception(f"'{name}' is neither a topping nor provided by one")
+
+    toppings = []
+    demand = set()
+    while pending:
+        provide = pending.pop()
+        if provide in demand:
+            continue
+        demand.add(provide)
+        if provide not in providers:
+            raise Exception(f"Nothing provides '{provide}'")
+        topping = providers[provide]
+        if topping not in toppings:
+            toppings.append(topping)
+            pending.extend(topping.DEPENDS)
+    return toppings, demand
@@ -0,0 +1,50 @@
+import json
+import os
+from typing import Optional
+
+from burger.output import MANIFEST_NAME, read_section
+
+# The classes found by a previous run (usually of the previous version), by
+# their deobfuscated names, which identify checks before anything else
+PREVIOUS_CLASSES: Optional[dict] = None
+
+
+def set_global_previous_classes(classes):
+    global PREVIOUS_CLASSES
+    PREVIOUS_CLASSES = classes
+
+
+def load_previous_aggregate(path: str):
+    """
+    Loads the output of a previous run, written with either --output or
+    --output-dir.  Only the version and classes sections are loaded.
+    """
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        aggregate = {'classes': read_section(path, 'classes')}
+        try:
+            aggregate['version'] = read_section(path, 'version')
+        except KeyError:
+            pass
+        return aggregate
+
+    with open(path, 'r') as fin:
+        output = json.load(fin)
+    # --output writes a list with a single aggregate
+    return output[0] if isinstance(output, list) else output
+
+
+def deobfuscate_classes(classes, mappings):
+    """
+    Translates a run's classes map into deobfuscated names through the mappings
+    of the version it was run on.  Classes that aren't obfuscated are kept as
+    they are, and those missing from the mappings are dropped.
+    """
+    deobfuscated = {}
+    for key, name in classes.items():
+        if not isinstance(name, str):
+            continue
+        if '/' in name:
+            deobfuscated[key] = name
+        elif name in mappings.classes:
+            deobfuscated[key] = mappings.classes[name]
+    return deobfuscated
@@ -0,0 +1,174 @@
+import mmap
+import struct
+import zlib
+from array import array
+
+END_OF_CENTRAL_DIRECTORY = struct.Struct('<4s4H2LH')
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = b'PK\x05\x06'
+CENTRAL_DIRECTORY_ENTRY = struct.Struct('<4s4B4HL2L5H2L')
+CENTRAL_DIRECTORY_ENTRY_SIGNATURE = b'PK\x01\x02'
+LOCAL_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+LOCAL_FILE_HEADER_SIGNATURE = b'PK\x03\x04'
+
+STORED = 0
+DEFLATED = 8
+
+# Flag bits of an entry
+FLAG_ENCRYPTED = 0x1
+FLAG_UTF8 = 0x800
+
+
+class UnsupportedJarError(Exception):
+    """Raised for archives that MappedJar can't read, but zipfile can."""
+
+
+class MappedJar:
+    """
+    A read-only jar (or zip) file that is memory-mapped instead of being read
+    through `zipfile`.
+
+    The central directory is parsed once when the jar is opened, into a name to
+    index dict and flat arrays of offsets, sizes and compression methods.
+    Reading an entry then only has to look at its local header: stored entries
+    are returned as a `memoryview` into the mapping without copying, and
+    deflated ones are inflated straight from it.
+
+    Zip64 and encrypted archives aren't supported, and raise
+    `UnsupportedJarError`.  CRCs aren't checked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as fin:
+            self._mmap = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        self.names = []
+        self.index = {}
+        self._offsets = array('Q')
+        self._compressed_sizes = array('Q')
+        self._sizes = array('Q')
+        self._methods = array('B')
+        self._read_central_directory()
+
+    def _find_end_of_central_directory(self):
+        # The end of central directory record is followed by a comment of up
+        # to 65535 bytes, so it has to be searched for from the end
+        start = max(len(self._mmap) - END_OF_CENTRAL_DIRECTORY.size - 0xFFFF, 0)
+        position = self._mmap.rfind(END_OF_CENTRAL_DIRECTORY_SIGNATURE, start)
+        if position == -1:
+            raise Exception(f'{self.path} is not a zip file')
+        return END_OF_CENTRAL_DIRECTORY.unpack_from(self._mmap, position)
+
+    def _read_central_directory(self):
+        (_, _, _, _, count, size, offset, _) = self._find_end_of_central_directory()
+        if count == 0xFFFF or size == 0xFFFFFFFF or offset == 0xFFFFFFFF:
+            raise UnsupportedJarError(f'{self.path} is a zip64 archive')
+
+        view = self._view
+        position = offset
+        for _ in range(count):
+            (
+                signature,
+                _,
+                _,
+                _,
+                _,
+                flags,
+                method,
+                _,
+                _,
+                _,
+                compressed_size,
+                size,
+                name_length,
+                extra_length,
+                comment_length,
+                _,
+                _,
+                _,
+                local_offset,
+            ) = CENTRAL_DIRECTORY_ENTRY.unpack_from(view, position)
+            if signature != CENTRAL_DIRECTORY_ENTRY_SIGNATURE:
+                raise Exception(f'Bad central directory entry in {self.path}')
+            if flags & FLAG_ENCRYPTED:
+                raise UnsupportedJarError(f'{self.path} has encrypted entries')
+            if 0xFFFFFFFF in (compressed_size, size, local_offset):
+                raise UnsupportedJarError(f'{self.path} has zip64 entries')
+
+            name_start = position + CENTRAL_DIRECTORY_ENTRY.size
+            name = bytes(view[name_start : name_start + name_length])
+            name = name.decode('utf-8' if flags & FLAG_UTF8 else 'cp437')
+
+            self.index[name] = len(self.names)
+            self.names.append(name)
+            self._offsets.append(local_offset)
+            self._compressed_sizes.append(compressed_size)
+            self._sizes.append(size)
+            self._methods.append(method)
+
+            position = name_start + name_length + extra_length + comment_length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def namelist(self):
+        return list(self.names)
+
+    def size(self, name: str) -> int:
+        """The uncompressed size of the entry `name`."""
+        return self._sizes[self.index[name]]
+
+    def _raw(self, i: int) -> memoryview:
+        offset = self._offsets[i]
+        header = LOCAL_FILE_HEADER.unpack_from(self._view, offset)
+        if header[0] != LOCAL_FILE_HEADER_SIGNATURE:
+            raise Exception(f'Bad local header for {self.names[i]} in {self.path}')
+        # The local header's name and extra field lengths can differ from the
+        # central directory's
+        start = offset + LOCAL_FILE_HEADER.size + header[-2] + header[-1]
+        return self._view[start : start + self._compressed_sizes[i]]
+
+    def read(self, name: str):
+        """
+        Returns the contents of the entry `name`, as a `memoryview` into the
+        mapping for stored entries or as bytes for deflated ones.
+        """
+        i = self.index[name]
+        raw = self._raw(i)
+        method = self._methods[i]
+        if method == STORED:
+            return raw
+        elif method == DEFLATED:
+            return zlib.decompress(raw, -zlib.MAX_WBITS, self._sizes[i])
+        raise Exception(f'Unsupported compression method {method} for {name}')
+
+    def iter_chunks(self, name: str, chunk_size: int = 1 << 16):
+        """
+        Yields the contents of the entry `name` in chunks, inflating deflated
+        entries incrementally instead of all at once.
+        """
+        i = self.index[name]
+        raw = self._raw(i)
+        method = self._methods[i]
+        if method == STORED:
+            for start in range(0, len(raw), chunk_size):
+                yield raw[start : start + chunk_size]
+        elif method == DEFLATED:
+            inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+            for start in range(0, len(raw), chunk_size):
+                chunk = inflater.decompress(raw[start : start + chunk_size])
+                if chunk:
+                    yield chunk
+            rest = inflater.flush()
+            if rest:
+                yield rest
+        else:
+            raise Exception(f'Unsupported compression method {method} for {name}')
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
@@ -0,0 +1,397 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from struct import pack, unpack, unpack_from
+
+from jawa.constants import ConstantPool, String
+
+from burger import tracing
+from burger.opcodes import REFERENCE_KINDS, opcode_string
+
+# Bump whenever the schema or the meaning of any stored value changes, so that
+# indexes written by older versions are rebuilt instead of being misread
+INDEX_FORMAT = 4
+
+INDEX_SUFFIX = '.burger-index'
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE classes (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    superclass TEXT,
+    interfaces TEXT NOT NULL,
+    strings TEXT NOT NULL,
+    methods BLOB NOT NULL
+);
+CREATE TABLE resources (
+    position INTEGER PRIMARY KEY,
+    path TEXT NOT NULL
+);
+CREATE TABLE statics (
+    name TEXT PRIMARY KEY,
+    fields TEXT NOT NULL
+);
+"""
+
+
+def jar_sha1(path: str) -> str:
+    with open(path, 'rb') as fin:
+        return hashlib.file_digest(fin, 'sha1').hexdigest()
+
+
+def index_path(jar_path: str) -> str:
+    return jar_path + INDEX_SUFFIX
+
+
+def pack_methods(methods) -> bytes:
+    """Packs (name, descriptor, opcode string) tuples into bytes."""
+    packed = bytearray()
+    for name, descriptor, opcodes in methods:
+        name = name.encode()
+        descriptor = descriptor.encode()
+        packed += pack('>HHI', len(name), len(descriptor), len(opcodes))
+        packed += name + descriptor + opcodes
+    return bytes(packed)
+
+
+def unpack_methods(packed: bytes):
+    methods = {}
+    position = 0
+    while position < len(packed):
+        name_length, descriptor_length, length = unpack_from('>HHI', packed, position)
+        position += 8
+        name = packed[position : position + name_length].decode()
+        position += name_length
+        descriptor = packed[position : position + descriptor_length].decode()
+        position += descriptor_length
+        methods[(name, descriptor)] = packed[position : position + length]
+        position += length
+    return methods
+
+
+def _skip_attributes(source):
+    (count,) = unpack('>H', source.read(2))
+    for _ in range(count):
+        _, length = unpack('>HI', source.read(6))
+        source.read(length)
+
+
+def scan_class(source, references=None):
+    """
+    Reads the superclass, interfaces, string constants and the opcode string
+    (see burger.opcodes) of every method of a class, without building any
+    jawa objects for its fields or methods.
+
+    If a list is passed as `references`, every field and method reference
+    made by the class's code is appended to it, as (method name, method
+    descriptor, offset, kind, referenced constant).
+    """
+    # Skip over the magic, minor, and major version.
+    source.read(8)
+    pool = ConstantPool()
+    pool.unpack(source)
+
+    _, _, super_index, interface_count = unpack('>4H', source.read(8))
+    interfaces = unpack(f'>{interface_count}H', source.read(2 * interface_count))
+
+    superclass = pool[super_index].name.value if super_index else None
+    interfaces = [pool[index].name.value for index in interfaces]
+    strings = [constant.string.value for constant in pool.find(type_=String)]
+
+    (field_count,) = unpack('>H', source.read(2))
+    for _ in range(field_count):
+        source.read(6)
+        _skip_attributes(source)
+
+    methods = []
+    (method_count,) = unpack('>H', source.read(2))
+    for _ in range(method_count):
+        _, name_index, descriptor_index, attribute_count = unpack('>4H', source.read(8))
+        for _ in range(attribute_count):
+            attribute_index, length = unpack('>HI', source.read(6))
+            info = source.read(length)
+            if pool[attribute_index].value == 'Code':
+                (code_length,) = unpack_from('>I', info, 4)
+                name = pool[name_index].value
+                descriptor = pool[descriptor_index].value
+                found = [] if references is not None else None
+                opcodes = opcode_string(info[8 : 8 + code_length], found)
+                methods.append((name, descriptor, opcodes))
+                if found:
+                    references.extend(
+                        (name, descriptor, offset, REFERENCE_KINDS[op], pool[index])
+                        for offset, op, index in found
+                    )
+    return superclass, interfaces, strings, methods
+
+
+class JarIndex:
+    """
+    Facts about a jar that don't depend on anything but its contents: the
+    superclass, interfaces and string constants of every class, the opcode
+    string of every method, and the paths of every resource.  Stored next to
+    the jar, keyed by the jar's SHA-1.
+
+    Reading every class is the slow part, so an index opened with a
+    classloader that doesn't have them yet only reads them the first time
+    one of them is used, and saves them right away.  Runs that never use
+    them never pay for it.
+
+    Static initializers are evaluated (see burger.statics) only as toppings
+    ask about them, so their results are added to the index as they come in
+    and saved with save_statics().
+    """
+
+    def __init__(self, sha1: str, classloader=None, path: str = None):
+        self.sha1 = sha1
+        # What classes are read from if they're needed before they're in the
+        # index, and where the index is saved once they are
+        self._classloader = classloader
+        self._path = path
+        # Whether the file at `path` is this index, so that static
+        # initializers can be added to it
+        self._saved = False
+        self.has_classes = False
+        self._classes_lock = threading.Lock()
+        # Class name -> superclass, interfaces and string constants, in jar order
+        self._superclasses = {}
+        self._interfaces = {}
+        self._strings = {}
+        # Class name -> the opcode strings of its methods, packed with
+        # pack_methods until opcodes() first needs them
+        self._methods = {}
+        self._opcodes = {}
+        self._resources = []
+        # Class name -> the JSON-encoded summaries of its static fields
+        self.statics = {}
+        self._unsaved_statics = []
+        self._lock = threading.Lock()
+
+    def _read_classes(self):
+        if self.has_classes or self._classloader is None:
+            return
+        with self._classes_lock:
+            if self.has_classes:
+                return
+            with tracing.span('jar index', 'jar'):
+                self._scan(self._classloader)
+            if self._path is not None:
+                try:
+                    self.save(self._path)
+                    logging.debug(f'Saved jar index to {self._path}')
+                except (OSError, sqlite3.Error) as e:
+                    logging.warning(f'Unable to save jar index to {self._path}: {e}')
+
+    @property
+    def superclasses(self):
+        self._read_classes()
+        return self._superclasses
+
+    @property
+    def interfaces(self):
+        self._read_classes()
+        return self._interfaces
+
+    @property
+    def strings(self):
+        self._read_classes()
+        return self._strings
+
+    @property
+    def methods(self):
+        self._read_classes()
+        return self._methods
+
+    @property
+    def resources(self):
+        self._read_classes()
+        return self._resources
+
+    @property
+    def classes(self):
+        return self.strings.keys()
+
+    def opcodes(self, class_name):
+        """
+        Returns the opcode strings of the methods of a class, by method name
+        and descriptor, or None if the class isn't in the index.
+        """
+        opcodes = self._opcodes.get(class_name)
+        if opcodes is None:
+            if class_name not in self.methods:
+                return None
+            opcodes = unpack_methods(self.methods[class_name])
+            self._opcodes[class_name] = opcodes
+        return opcodes
+
+    def add_statics(self, class_name, fields):
+        with self._lock:
+            if class_name not in self.statics:
+                self.statics[class_name] = fields
+                self._unsaved_statics.append(class_name)
+
+    def save_statics(self, path: str):
+        """
+        Adds the static initializers evaluated since the index was loaded to
+        the index stored at `path`, saving the whole index there if it
+        hasn't been yet.
+        """
+        if not self._saved:
+            self.save(path)
+            return
+
+        with self._lock:
+            unsaved = self._unsaved_statics
+            self._unsaved_statics = []
+        if not unsaved:
+            return
+
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO statics (name, fields) VALUES (?, ?)',
+                    ((name, self.statics[name]) for name in unsaved),
+                )
+        finally:
+            connection.close()
+
+    def _scan(self, classloader):
+        for path in classloader.path_map.keys():
+            if not path.endswith('.class'):
+                self._resources.append(path)
+                continue
+
+            name = path[: -len('.class')]
+            with classloader.open(path) as source:
+                superclass, interfaces, strings, methods = scan_class(source)
+            self._superclasses[name] = superclass
+            self._interfaces[name] = interfaces
+            self._strings[name] = strings
+            self._methods[name] = pack_methods(methods)
+        self.has_classes = True
+
+    @staticmethod
+    def build(classloader, sha1: str) -> 'JarIndex':
+        index = JarIndex(sha1)
+        index._scan(classloader)
+        return index
+
+    def save(self, path: str):
+        # Write to a temporary file first so that a failed or concurrent run
+        # never leaves a half-written index behind
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        with self._lock:
+            statics = list(self.statics.items())
+            self._unsaved_statics = []
+
+        connection = sqlite3.connect(temp_path)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.executemany(
+                    'INSERT INTO meta (key, value) VALUES (?, ?)',
+                    (
+                        ('format', str(INDEX_FORMAT)),
+                        ('sha1', self.sha1),
+                        ('classes', str(int(self.has_classes))),
+                    ),
+                )
+                connection.executemany(
+                    'INSERT INTO classes '
+                    '(name, superclass, interfaces, strings, methods) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (
+                        (
+                            name,
+                            self._superclasses[name],
+                            json.dumps(self._interfaces[name]),
+                            json.dumps(strings),
+                            self._methods[name],
+                        )
+                        for name, strings in self._strings.items()
+                    ),
+                )
+                connection.executemany(
+                    'INSERT INTO resources (path) VALUES (?)',
+                    ((resource,) for resource in self._resources),
+                )
+                connection.executemany(
+                    'INSERT INTO statics (name, fields) VALUES (?, ?)', statics
+                )
+        except BaseException:
+            connection.close()
+            os.remove(temp_path)
+            raise
+        connection.close()
+        os.replace(temp_path, path)
+        self._saved = True
+
+    @staticmethod
+    def load(path: str, sha1: str, classloader=None):
+        """
+        Loads the index stored at `path`, or returns None if there isn't one
+        or it was written for a different jar or index format.  If it doesn't
+        have the classes yet, they're read from `classloader` when needed.
+        """
+        if not os.path.exists(path):
+            return None
+
+        connection = sqlite3.connect(path)
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+            if meta.get('format') != str(INDEX_FORMAT) or meta.get('sha1') != sha1:
+                return None
+
+            index = JarIndex(sha1, classloader, path)
+            index._saved = True
+            if meta.get('classes') == '1':
+                rows = connection.execute(
+                    'SELECT name, superclass, interfaces, strings, methods '
+                    'FROM classes ORDER BY position'
+                )
+                for name, superclass, interfaces, strings, methods in rows:
+                    index._superclasses[name] = superclass
+                    index._interfaces[name] = json.loads(interfaces)
+                    index._strings[name] = json.loads(strings)
+                    index._methods[name] = methods
+                index._resources = [
+                    row[0]
+                    for row in connection.execute(
+                        'SELECT path FROM resources ORDER BY position'
+                    )
+                ]
+                index.has_classes = True
+            index.statics = dict(connection.execute('SELECT name, fields FROM statics'))
+            return index
+        except sqlite3.DatabaseError:
+            logging.debug(f'Ignoring unreadable jar index {path}')
+            return None
+        finally:
+            connection.close()
+
+
+def load_or_build(jar_path: str, classloader) -> JarIndex:
+    """
+    Returns the index for the jar at `jar_path`, loading it from next to the
+    jar if an earlier run saved one.  Classes that aren't in it yet are read
+    from `classloader` the first time they're needed, and saved then.
+    """
+    sha1 = jar_sha1(jar_path)
+    path = index_path(jar_path)
+
+    index = JarIndex.load(path, sha1, classloader)
+    if index is not None:
+        logging.debug(f'Loaded jar index from {path}')
+        return index
+    return JarIndex(sha1, classloader, path)
@@ -10,7 +10,14 @@ def set_global_mappings(mappings):
 
 
 class Mappings:
-    __slots__ = ('classes', 'fields', 'methods', 'field_types', 'method_types')
+    __slots__ = (
+        'classes',
+        'fields',
+        'methods',
+        'field_types',
+        'method_types',
+        '_obfuscated_classes',
+    )
 
     def __init__(self, classes, fields, methods, field_types, method_types):
         self.classes = classes
@@ -18,6 +25,8 @@ class Mappings:
         self.methods = methods
         self.field_types = field_types
         self.method_types = method_types
+        # Deobfuscated name -> obfuscated name, built on first use
+        self._obfuscated_classes = None
 
     @staticmethod
     def parse(mappings_txt: str):
@@ -129,10 +138,14 @@ class Mappings:
         ]
 
     def obfuscate_class_name(self, deobfuscated_name: str) -> Optional[str]:
-        for obfuscated_name, real_name in self.classes.items():
-            if real_name == deobfuscated_name:
-                return obfuscated_name
-        return None
+        if self._obfuscated_classes is None:
+            # Iterate in reverse so the first obfuscated name wins, as it did
+            # when this was a linear search
+            self._obfuscated_classes = {
+                real_name: obfuscated_name
+                for obfuscated_name, real_name in reversed(self.classes.items())
+            }
+        return self._obfuscated_classes.get(deobfuscated_name)
 
     def get_class_from_classloader(
         self, classloader: ClassLoader, deobfuscated_class_name: str
@@ -0,0 +1,199 @@
+"""
+Searching methods for sequences of instructions without disassembling them.
+
+Every method's code is reduced to an opcode string, with one byte per
+instruction and operands left out.  Short forms such as aload_0 are replaced
+with the instruction they stand for (aload), as the simple_swap transform
+does.  A Pattern is compiled into a regular expression over those strings, so
+only the methods it matches are disassembled, to check operands and to hand
+the instructions back.
+"""
+
+import re
+from struct import unpack_from
+
+from jawa.util.bytecode import opcode_table
+
+
+def _build_tables():
+    sizes = bytearray(256)
+    normal = bytearray(range(256))
+    opcodes = {}
+    for op, ins in opcode_table.items():
+        if not isinstance(op, int):
+            continue
+        if ins['operands']:
+            sizes[op] = sum(fmt.value.size for fmt, _ in ins['operands'])
+        swap = ins['transform'].get('simple_swap')
+        if swap:
+            normal[op] = opcode_table[swap['op']]['op']
+        opcodes[ins['mnemonic']] = normal[op]
+    return bytes(sizes), bytes(normal), opcodes
+
+
+# The size of the operands of each opcode (except tableswitch, lookupswitch
+# and wide), the opcode each is normalized to, and opcodes by mnemonic
+_SIZES, _NORMAL, _OPCODES = _build_tables()
+
+TABLESWITCH = 0xAA
+LOOKUPSWITCH = 0xAB
+WIDE = 0xC4
+IINC = 0x84
+
+# Instructions that reference a field or method, and what they do with it
+REFERENCE_KINDS = {
+    0xB2: 'read',  # getstatic
+    0xB3: 'write',  # putstatic
+    0xB4: 'read',  # getfield
+    0xB5: 'write',  # putfield
+    0xB6: 'call',  # invokevirtual
+    0xB7: 'call',  # invokespecial
+    0xB8: 'call',  # invokestatic
+    0xB9: 'call',  # invokeinterface
+}
+
+
+def opcode_string(code: bytes, references=None) -> bytes:
+    """
+    Returns the normalized opcode of every instruction in `code`.  If a list
+    is passed as `references`, the offset, opcode and constant pool index of
+    every instruction in REFERENCE_KINDS is appended to it.
+    """
+    result = bytearray()
+    position = 0
+    length = len(code)
+    while position < length:
+        op = code[position]
+        if op == TABLESWITCH or op == LOOKUPSWITCH:
+            # Operands are aligned to 4 bytes from the start of the code
+            start = position + 1 + (-(position + 1) % 4)
+            if op == TABLESWITCH:
+                low, high = unpack_from('>ii', code, start + 4)
+                position = start + 12 + 4 * (high - low + 1)
+            else:
+                (pairs,) = unpack_from('>i', code, start + 4)
+                position = start + 8 + 8 * pairs
+        elif op == WIDE:
+            op = code[position + 1]
+            position += 6 if op == IINC else 4
+        else:
+            if references is not None and op in REFERENCE_KINDS:
+                (index,) = unpack_from('>H', code, position + 1)
+                references.append((position, op, index))
+            position += 1 + _SIZES[op]
+        result.append(_NORMAL[op])
+    return bytes(result)
+
+
+def method_opcodes(method):
+    """
+    Returns the opcode string of `method`, from the jar index if it has one,
+    or None if the method has no code.
+    """
+    code = method.code
+    if code is None:
+        return None
+
+    index = getattr(code.cf.classloader, 'index', None)
+    if index is not None:
+        opcodes = index.opcodes(code.cf.this.name.value)
+        if opcodes is not None:
+            key = (method.name.value, method.descriptor.value)
+            if key in opcodes:
+                return opcodes[key]
+    # jawa doesn't expose the raw code other than through disassemble()
+    return opcode_string(code._code)
+
+
+class PatternMatch:
+    def __init__(self, method, match, instructions):
+        self.method = method
+        self.start = match.start()
+        self.end = match.end()
+        self._instructions = instructions
+
+    @property
+    def all_instructions(self):
+        """Every instruction of the method."""
+        if self._instructions is None:
+            self._instructions = list(self.method.code.disassemble())
+        return self._instructions
+
+    @property
+    def instructions(self):
+        """The instructions that matched."""
+        return self.all_instructions[self.start : self.end]
+
+
+class Pattern:
+    """
+    A sequence of instructions to look for.  Each element is either:
+
+    - a mnemonic, or several separated by |, such as 'iload|aload'
+    - a (mnemonic, predicate) tuple, where predicate is called with the
+      disassembled instruction and has to return True
+    - '?' for any single instruction
+    - '*' for any number of instructions (as few as possible)
+
+    Mnemonics are normalized like opcode strings, so 'aload' also matches
+    aload_0.
+    """
+
+    def __init__(self, *elements):
+        parts = []
+        self._predicates = []
+        for element in elements:
+            if element == '?':
+                parts.append(b'.')
+                continue
+            if element == '*':
+                parts.append(b'.*?')
+                continue
+
+            predicate = None
+            if isinstance(element, tuple):
+                element, predicate = element
+            opcodes = bytes(_OPCODES[mnemonic] for mnemonic in element.split('|'))
+            part = b'[' + re.escape(opcodes) + b']'
+            if predicate is not None:
+                part = b'(' + part + b')'
+                self._predicates.append(predicate)
+            parts.append(part)
+        self._regex = re.compile(b''.join(parts), re.DOTALL)
+
+    def _find(self, method, find, retry):
+        opcodes = method_opcodes(method)
+        if opcodes is None:
+            return None
+
+        instructions = None
+        position = 0
+        while True:
+            match = find(opcodes, position)
+            if match is None:
+                return None
+            if self._predicates:
+                if instructions is None:
+                    instructions = list(method.code.disassemble())
+                if all(
+                    predicate(instructions[match.start(group)])
+                    for group, predicate in enumerate(self._predicates, 1)
+                ):
+                    return PatternMatch(method, match, instructions)
+            else:
+                return PatternMatch(method, match, instructions)
+            if not retry:
+                return None
+            position = match.start() + 1
+
+    def search(self, method):
+        """Returns the first match anywhere in `method`, or None."""
+        return self._find(method, self._regex.search, True)
+
+    def match(self, method):
+        """Returns a match at the start of `method`, or None."""
+        return self._find(method, self._regex.match, False)
+
+    def fullmatch(self, method):
+        """Returns a match covering all of `method`, or None."""
+        return self._find(method, self._regex.fullmatch, False)
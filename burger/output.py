@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from burger.roundedfloats import transform_floats
+
+MANIFEST_NAME = 'index.json'
+MANIFEST_FORMAT = 1
+
+
+def section_filename(name: str) -> str:
+    """Returns a file name for an aggregate section that is safe to write."""
+    safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+    return f'{safe}.json'
+
+
+def _write_section(name, value, path, compact):
+    """
+    Serializes a single aggregate section into its own file.  Runs in a worker
+    process, so everything it needs is passed in explicitly.
+    """
+    value = transform_floats(value)
+    if compact:
+        data = json.dumps(value)
+    else:
+        data = json.dumps(value, sort_keys=True, indent=4)
+    data = data.encode('utf-8')
+
+    with open(path, 'wb') as fout:
+        fout.write(data)
+
+    return name, len(data), hashlib.sha1(data).hexdigest()
+
+
+def write_sharded(aggregate, directory: str, compact: bool = False, jobs=None):
+    """
+    Writes each top-level section of the aggregate to its own JSON file in
+    `directory`, along with an index manifest describing the sections.
+
+    Sections are serialized in parallel worker processes, since encoding a
+    handful of large sections one after another dominates the time spent
+    writing output.  `jobs` is the number of worker processes to use; if it
+    is None, one process is used per CPU, and if it is 1, sections are
+    written one after another in this process.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    arguments = [
+        (name, value, os.path.join(directory, section_filename(name)), compact)
+        for name, value in aggregate.items()
+    ]
+    if jobs == 1:
+        results = [_write_section(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_write_section, *args) for args in arguments]
+            results = [future.result() for future in futures]
+
+    sections = {}
+    for name, size, sha1 in results:
+        sections[name] = {
+            'file': section_filename(name),
+            'size': size,
+            'sha1': sha1,
+        }
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'source': aggregate.get('source'),
+        'sections': sections,
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as fout:
+        json.dump(manifest, fout, sort_keys=True, indent=4)
+
+    return manifest
+
+
+def read_section(directory: str, name: str):
+    """Loads a single section previously written by `write_sharded`."""
+    with open(os.path.join(directory, MANIFEST_NAME), 'r') as fin:
+        manifest = json.load(fin)
+    info = manifest['sections'][name]
+    with open(os.path.join(directory, info['file']), 'r') as fin:
+        return json.load(fin)
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from jawa.transforms import expand_constants, simple_swap
+
+from burger import jarindex, mappings
+from burger.classloader import JarClassLoader
+from burger.jarfile import MappedJar
+
+# The number of worker processes toppings may use, 1 meaning none at all
+JOBS = 1
+
+# The JarClassLoader of the current worker process, opened by _init_worker
+WORKER_CLASSLOADER: Optional[JarClassLoader] = None
+
+
+def set_global_jobs(jobs):
+    global JOBS
+    JOBS = jobs if jobs > 0 else os.cpu_count()
+
+
+def jar_path(classloader) -> Optional[str]:
+    """
+    Returns the path of the jar that `classloader` loads everything from, or
+    None if it was given anything other than a single jar, in which case work
+    can't be handed to worker processes.
+    """
+    jars = {id(entry): entry for entry in classloader.path_map.values()}
+    if len(jars) != 1:
+        return None
+    (jar,) = jars.values()
+    return jar.path if isinstance(jar, MappedJar) else None
+
+
+def _init_worker(path, worker_mappings, index_sha1):
+    global WORKER_CLASSLOADER
+    mappings.set_global_mappings(worker_mappings)
+    WORKER_CLASSLOADER = JarClassLoader(
+        path, max_cache=0, bytecode_transforms=[simple_swap, expand_constants]
+    )
+    if index_sha1 is not None:
+        WORKER_CLASSLOADER.index = jarindex.JarIndex.load(
+            jarindex.index_path(path), index_sha1
+        )
+
+
+def worker_pool(classloader) -> Optional[ProcessPoolExecutor]:
+    """
+    Returns a process pool of JOBS workers that each have their own
+    JarClassLoader for the same jar as `classloader` (in WORKER_CLASSLOADER)
+    and the global mappings, or None if work should stay in this process.
+    """
+    if JOBS <= 1:
+        return None
+    path = jar_path(classloader)
+    if path is None:
+        return None
+
+    index = getattr(classloader, 'index', None)
+    return ProcessPoolExecutor(
+        JOBS,
+        initializer=_init_worker,
+        initargs=(path, mappings.MAPPINGS, index.sha1 if index else None),
+    )
+
+
+def shards(items, count):
+    """
+    Splits `items` into at most `count` contiguous shards, yielding the
+    position of the first item of each shard along with the shard itself.
+    """
+    items = list(items)
+    size = max(-(-len(items) // count), 1)
+    for start in range(0, len(items), size):
+        yield start, items[start : start + size]
@@ -0,0 +1,39 @@
+from array import array
+from bisect import bisect_left
+
+
+class PathIndex:
+    """
+    The paths of a classloader's entries, sorted so that the entries under a
+    prefix can be found with a binary search instead of checking every path.
+    Results are still given in jar order, so output doesn't depend on it.
+    """
+
+    def __init__(self, paths):
+        paths = list(paths)
+        order = sorted(range(len(paths)), key=paths.__getitem__)
+        self._sorted = [paths[position] for position in order]
+        # The jar position of each path in _sorted
+        self._positions = array('I', order)
+        # Class names (without .class), in jar order
+        self.classes = tuple(
+            path[: -len('.class')] for path in paths if path.endswith('.class')
+        )
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def find(self, prefix: str = '', suffix: str = ''):
+        """
+        Returns the paths that start with `prefix` and end with `suffix`, in
+        jar order.  Only the paths under `prefix` are looked at.
+        """
+        start = bisect_left(self._sorted, prefix)
+        if prefix:
+            # The first path after every path that starts with prefix
+            end = bisect_left(self._sorted, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        else:
+            end = len(self._sorted)
+        found = [i for i in range(start, end) if self._sorted[i].endswith(suffix)]
+        found.sort(key=self._positions.__getitem__)
+        return [self._sorted[i] for i in found]
@@ -0,0 +1,95 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class ToppingProfiler:
+    """
+    Records wall time, CPU time, peak memory, class loader activity and
+    dependency wait time for every topping that is run.
+
+    The dependency wait time of a topping is the time between the moment all
+    of its dependencies became available and the moment it actually started.
+    """
+
+    def __init__(self, classloader):
+        self.classloader = classloader
+        self.records = []
+        self.start_time = time.perf_counter()
+        self.available_at = {}
+        tracemalloc.start()
+
+    def mark_available(self, provides):
+        now = time.perf_counter()
+        for provide in provides:
+            self.available_at.setdefault(provide, now)
+
+    @contextmanager
+    def profile(self, topping):
+        started = time.perf_counter()
+        ready = max(
+            (self.available_at.get(dep, started) for dep in topping.DEPENDS),
+            default=self.start_time,
+        )
+        stats_before = self.classloader.stats.copy()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        cpu_before = time.process_time()
+
+        record = {
+            'topping': topping.__name__,
+            'succeeded': False,
+        }
+        try:
+            yield record
+            record['succeeded'] = True
+        finally:
+            cpu_after = time.process_time()
+            memory_after, peak = tracemalloc.get_traced_memory()
+            stats = self.classloader.stats - stats_before
+            record.update(
+                {
+                    'wall_time': time.perf_counter() - started,
+                    'cpu_time': cpu_after - cpu_before,
+                    'peak_memory': peak - memory_before,
+                    'memory_delta': memory_after - memory_before,
+                    'class_loads': stats['loads'],
+                    'class_parses': stats['parses'],
+                    'constant_pool_scans': stats['constant_pool_scans'],
+                    'dependency_wait': started - ready,
+                }
+            )
+            self.records.append(record)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def to_json(self):
+        return {
+            'total_time': time.perf_counter() - self.start_time,
+            'toppings': self.records,
+        }
+
+    def write_json(self, path: str):
+        with open(path, 'w') as fout:
+            json.dump(self.to_json(), fout, indent=4)
+
+    def format_table(self) -> str:
+        header = (
+            f'{"topping":<28} {"wall (s)":>9} {"cpu (s)":>9} {"peak (MiB)":>11}'
+            f' {"parses":>7} {"cp scans":>9} {"wait (s)":>9}  status'
+        )
+        lines = [header, '-' * len(header)]
+        for record in sorted(self.records, key=lambda r: -r['wall_time']):
+            lines.append(
+                f'{record["topping"]:<28} {record["wall_time"]:>9.3f}'
+                f' {record["cpu_time"]:>9.3f}'
+                f' {record["peak_memory"] / (1024 * 1024):>11.2f}'
+                f' {record["class_parses"]:>7} {record["constant_pool_scans"]:>9}'
+                f' {record["dependency_wait"]:>9.3f}'
+                f'  {"ok" if record["succeeded"] else "FAILED"}'
+            )
+        lines.append('-' * len(header))
+        lines.append(f'total: {time.perf_counter() - self.start_time:.3f}s')
+        return '\n'.join(lines)
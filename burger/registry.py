@@ -0,0 +1,140 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+
+TOPPINGS_DIR = os.path.join(os.path.dirname(__file__), 'toppings')
+
+# The name, docstring, PROVIDES and DEPENDS of every topping, so that toppings
+# can be listed and planned without importing them.  Rebuilt with
+# `python -m burger.registry` whenever any topping module changes.
+MANIFEST_PATH = os.path.join(TOPPINGS_DIR, 'manifest.json')
+
+
+def topping_modules():
+    """Returns the names of the modules in the toppings directory."""
+    modules = []
+    for root, dirs, files in os.walk(TOPPINGS_DIR):
+        for file_ in files:
+            if not file_.endswith('.py'):
+                continue
+            elif file_.startswith('__'):
+                continue
+            elif file_ == 'topping.py':
+                continue
+
+            modules.append(file_[:-3])
+    return modules
+
+
+def import_toppings():
+    """
+    Imports every topping, returning them by the name of their module.
+    """
+    from burger.toppings.topping import Topping
+
+    toppings = {}
+    for topping in topping_modules():
+        module = importlib.import_module(f'burger.toppings.{topping}')
+        # Looked up by module rather than by what each import added, so that
+        # toppings that were already imported are still found
+        subclasses = [
+            o for o in Topping.__subclasses__() if o.__module__ == module.__name__
+        ]
+        if len(subclasses) == 0:
+            logging.error(f"Topping '{topping}' contains no topping")
+        elif len(subclasses) >= 2:
+            logging.error(f"Topping '{topping}' contains more than one topping")
+        else:
+            toppings[topping] = subclasses[0]
+
+    return toppings
+
+
+class ToppingInfo:
+    """
+    Stands in for a topping that hasn't been imported yet, with the same
+    PROVIDES, DEPENDS and docstring.  load() imports the topping itself.
+    """
+
+    def __init__(self, name, class_name, doc, provides, depends):
+        self.name = name
+        self.class_name = class_name
+        self.__doc__ = doc
+        self.PROVIDES = provides
+        self.DEPENDS = depends
+
+    def __repr__(self):
+        return f'<topping {self.name}>'
+
+    def load(self):
+        module = importlib.import_module(f'burger.toppings.{self.name}')
+        return getattr(module, self.class_name)
+
+
+def _digest(modules):
+    digest = hashlib.sha1()
+    for name in modules:
+        digest.update(name.encode() + b'\0')
+        with open(os.path.join(TOPPINGS_DIR, name + '.py'), 'rb') as fin:
+            digest.update(fin.read())
+    return digest.hexdigest()
+
+
+def build_manifest(modules):
+    toppings = import_toppings()
+    return {
+        'digest': _digest(modules),
+        'toppings': {
+            name: {
+                'class': topping.__name__,
+                'doc': topping.__doc__,
+                'provides': topping.PROVIDES,
+                'depends': topping.DEPENDS,
+            }
+            for name, topping in toppings.items()
+        },
+    }
+
+
+def write_manifest():
+    """Rebuilds the manifest and writes it to MANIFEST_PATH."""
+    manifest = build_manifest(sorted(topping_modules()))
+    with open(MANIFEST_PATH, 'w') as fout:
+        json.dump(manifest, fout, indent=4)
+        fout.write('\n')
+
+
+def load_toppings():
+    """
+    Returns a ToppingInfo for every topping, by the name of its module.  They
+    are read from the manifest, or if it is missing or any topping has
+    changed since it was written, found by importing every topping instead.
+    The manifest itself is only written by write_manifest().
+    """
+    modules = sorted(topping_modules())
+    manifest = None
+    try:
+        with open(MANIFEST_PATH, 'r') as fin:
+            manifest = json.load(fin)
+    except (OSError, ValueError):
+        pass
+
+    if manifest is None or manifest.get('digest') != _digest(modules):
+        logging.debug(
+            'The topping manifest is out of date, so every topping is imported; '
+            'run `python -m burger.registry` to rebuild it'
+        )
+        manifest = build_manifest(modules)
+
+    return {
+        name: ToppingInfo(
+            name, info['class'], info['doc'], info['provides'], info['depends']
+        )
+        for name, info in manifest['toppings'].items()
+    }
+
+
+if __name__ == '__main__':
+    write_manifest()
@@ -0,0 +1,73 @@
+"""
+Reading the data and asset files of a jar (tags, recipes, language files and
+so on) in bulk.  The entries under a prefix are found with the classloader's
+path index, and are inflated and parsed together on a thread pool rather than
+one at a time by each topping.  Inflating releases the GIL, and the results
+don't have to be sent between processes, so threads are enough.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from burger import tracing
+
+# The number of threads resources are read with; None lets the executor pick
+THREADS = None
+
+
+class ResourceTable:
+    def __init__(self, classloader):
+        self.classloader = classloader
+
+    def paths(self, prefix: str = '', suffix: str = ''):
+        """
+        Returns the paths of the jar's resources (everything but classes)
+        that start with `prefix` and end with `suffix`, in jar order.
+        """
+        return [
+            path
+            for path in self.classloader.paths.find(prefix, suffix)
+            if not path.endswith('.class')
+        ]
+
+    def _map(self, function, paths, name):
+        with tracing.span(name, 'resources', count=len(paths)):
+            if len(paths) <= 1:
+                return {path: function(path) for path in paths}
+            with ThreadPoolExecutor(THREADS) as executor:
+                return dict(zip(paths, executor.map(function, paths), strict=True))
+
+    def _read(self, path):
+        return bytes(self.classloader.read(path))
+
+    def _read_json(self, path):
+        return json.loads(self._read(path))
+
+    def _try_read(self, path):
+        try:
+            return self._read(path)
+        except Exception as e:
+            logging.debug(f"Can't read file {path} in jar: {e!r}")
+            return None
+
+    def contents(self, paths):
+        """
+        Returns the contents of each of `paths` that is in the jar, as bytes,
+        by path.  Paths that aren't in the jar or can't be read are left out.
+        """
+        paths = [path for path in paths if path in self.classloader.path_map]
+        contents = self._map(self._try_read, paths, ', '.join(paths))
+        return {path: data for path, data in contents.items() if data is not None}
+
+    def read_all(self, prefix: str, suffix: str = ''):
+        """Returns the contents of every resource under `prefix`, by path."""
+        return self._map(self._read, self.paths(prefix, suffix), prefix)
+
+    def json(self, prefix: str, suffix: str = '.json'):
+        """
+        Returns every JSON resource under `prefix`, parsed, by path.  Nothing
+        is kept between calls, so callers are free to change what they get.
+        Raises the first error hit reading or parsing an entry.
+        """
+        return self._map(self._read_json, self.paths(prefix, suffix), prefix)
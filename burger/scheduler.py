@@ -0,0 +1,156 @@
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from burger.transaction import Transaction
+
+# The scheduler currently running toppings, which publish() reports to
+SCHEDULER: Optional['ToppingScheduler'] = None
+
+
+def publish(*provides):
+    """
+    Marks some of the running topping's PROVIDES as available before it has
+    finished, so that toppings depending only on those can start.  Whatever
+    the topping has changed in the aggregate so far is committed, so it
+    becomes visible to them and is kept even if the topping fails later on.
+    """
+    if SCHEDULER is not None:
+        SCHEDULER.publish(provides)
+
+
+class ToppingScheduler:
+    """
+    Runs toppings once their dependencies are available, up to `concurrency`
+    at a time (in threads).  With a concurrency of 1, toppings run one after
+    another in the given order, exactly as they always have.
+
+    Every topping's changes to the aggregate are kept in a Transaction, which
+    is committed if the topping succeeds and rolled back if it fails.  Other
+    toppings don't see the changes until they are committed.
+
+    `run(topping, aggregate)` is called to run each topping, and should call
+    its act method.  `on_available(provides)` is called whenever provides
+    become available.
+    """
+
+    def __init__(self, toppings, aggregate, run, concurrency=1, on_available=None):
+        self.toppings = list(toppings)
+        self.aggregate = aggregate
+        self.run_topping = run
+        self.concurrency = concurrency
+        self.on_available = on_available
+        self.available = set()
+        self._changed = threading.Condition()
+        self._local = threading.local()
+
+    def publish(self, provides):
+        with self._changed:
+            transaction = getattr(self._local, 'transaction', None)
+            if transaction is not None:
+                transaction.commit()
+            self._make_available(provides)
+
+    def _make_available(self, provides):
+        self.available.update(provides)
+        if self.on_available:
+            self.on_available(provides)
+        self._changed.notify_all()
+
+    def _run(self, topping) -> bool:
+        # Commits go through the same lock as the scheduler's own state
+        transaction = Transaction(self._changed)
+        self._local.transaction = transaction
+        try:
+            self.run_topping(topping, transaction.wrap(self.aggregate))
+        except Exception:
+            # If the topping failed, don't leave things in an incomplete state
+            logging.debug(f'Failed to run {topping}')
+            if logging.root.isEnabledFor(logging.DEBUG):
+                traceback.print_exc()
+            transaction.rollback()
+            return False
+        finally:
+            self._local.transaction = None
+
+        with self._changed:
+            transaction.commit()
+            self._make_available(topping.PROVIDES)
+        return True
+
+    def run(self):
+        global SCHEDULER
+        SCHEDULER = self
+        try:
+            if self.concurrency <= 1:
+                self._run_serially()
+            else:
+                self._run_concurrently()
+        finally:
+            SCHEDULER = None
+
+    def _run_serially(self):
+        for topping in self.toppings:
+            missing = [dep for dep in topping.DEPENDS if dep not in self.available]
+            if len(missing) != 0:
+                logging.debug(f'Dependencies failed for {topping}: Missing {missing}')
+                continue
+            self._run(topping)
+
+    def _run_concurrently(self):
+        pending = list(self.toppings)
+        # The number of toppings that could still provide each provide
+        providers = {}
+        for topping in pending:
+            for provide in topping.PROVIDES:
+                providers[provide] = providers.get(provide, 0) + 1
+        running = set()
+
+        def finished(topping):
+            with self._changed:
+                running.discard(topping)
+                for provide in topping.PROVIDES:
+                    providers[provide] -= 1
+                self._changed.notify_all()
+
+        def run(topping):
+            try:
+                self._run(topping)
+            finally:
+                finished(topping)
+
+        def skip(topping, missing):
+            logging.debug(f'Dependencies failed for {topping}: Missing {missing}')
+            pending.remove(topping)
+            for provide in topping.PROVIDES:
+                providers[provide] -= 1
+
+        with ThreadPoolExecutor(self.concurrency) as executor, self._changed:
+            while pending or running:
+                # Skipping a topping can leave earlier ones without any
+                # remaining providers too, so go over them until nothing
+                # changes
+                changed = True
+                while changed:
+                    changed = False
+                    for topping in list(pending):
+                        missing = [
+                            dep for dep in topping.DEPENDS if dep not in self.available
+                        ]
+                        if not missing:
+                            pending.remove(topping)
+                            running.add(topping)
+                            executor.submit(run, topping)
+                        elif any(providers.get(dep, 0) == 0 for dep in missing):
+                            # Nothing left can provide them
+                            skip(topping, missing)
+                            changed = True
+
+                if running:
+                    self._changed.wait()
+                else:
+                    # Can only happen with a dependency cycle
+                    for topping in list(pending):
+                        skip(topping, topping.DEPENDS)
@@ -0,0 +1,124 @@
+from fnmatch import fnmatchcase
+
+# Where provides are stored in the aggregate, for those that aren't stored at
+# the path their name suggests.  identify.<key> is stored at classes.<key>.
+PROVIDE_PATHS = {
+    'blocks.states': [
+        'blocks.block.*.states',
+        'blocks.block.*.num_states',
+        'blocks.block.*.min_state_id',
+        'blocks.block.*.max_state_id',
+    ],
+    'entities.entity': ['entities.entity', 'entities.info'],
+    'entities.metadata': ['entities.entity.*.metadata', 'entities.dataserializers'],
+    'entities.object': ['entities.object', 'entities.info'],
+    'packets.ids': ['packets'],
+    'packets.classes': ['packets'],
+    'packets.directions': ['packets'],
+    'packets.instructions': ['packets.packet.*.instructions'],
+    'recipes.index': ['recipe_index'],
+    'stats.achievements': ['achievements'],
+    'tags.ids': ['tag_ids'],
+    'tileentities.list': ['tileentity'],
+    'tileentities.tags': ['tileentity'],
+    'tileentities.networkids': ['tileentity'],
+}
+
+# Sections added by munch itself rather than by a topping
+BUILTIN_SECTIONS = ('source',)
+
+_MISSING = object()
+
+
+def provide_paths(provide: str):
+    if provide in PROVIDE_PATHS:
+        return PROVIDE_PATHS[provide]
+    if provide.startswith('identify.'):
+        return ['classes.' + provide[len('identify.') :]]
+    return [provide]
+
+
+def overlaps(path: str, other: str) -> bool:
+    """
+    Checks whether one path is within the other, or the other way around.
+    Segments may contain wildcards on either side.
+    """
+    return all(
+        fnmatchcase(segment, other_segment) or fnmatchcase(other_segment, segment)
+        for segment, other_segment in zip(path.split('.'), other.split('.'))
+    )
+
+
+def selected_provides(paths, all_toppings):
+    """
+    Returns the provides that store anything at (or within) one of `paths`.
+    """
+    provides = []
+    for path in paths:
+        found = False
+        for topping in all_toppings.values():
+            for provide in topping.PROVIDES:
+                if any(overlaps(path, p) for p in provide_paths(provide)):
+                    found = True
+                    if provide not in provides:
+                        provides.append(provide)
+        if not found and path.split('.')[0] not in BUILTIN_SECTIONS:
+            raise Exception(f"Nothing provides '{path}'")
+    return provides
+
+
+def _select(value, segments):
+    if not segments:
+        return value
+
+    segment, rest = segments[0], segments[1:]
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            name = str(key)
+            if fnmatchcase(name, segment):
+                selected = _select(child, rest)
+            elif '.' in name:
+                # Keys like block.list contain dots themselves
+                length = name.count('.') + 1
+                if not fnmatchcase(name, '.'.join(segments[:length])):
+                    continue
+                selected = _select(child, segments[length:])
+            else:
+                continue
+            if selected is not _MISSING:
+                result[key] = selected
+        return result if result else _MISSING
+
+    if isinstance(value, list):
+        if segment == '*':
+            result = [_select(child, rest) for child in value]
+            result = [child for child in result if child is not _MISSING]
+            return result if result else _MISSING
+        if segment.isdigit() and int(segment) < len(value):
+            selected = _select(value[int(segment)], rest)
+            return [selected] if selected is not _MISSING else _MISSING
+
+    return _MISSING
+
+
+def _merge(target, source):
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def select(aggregate, paths):
+    """
+    Returns only the parts of `aggregate` at the given paths.  Paths are
+    dotted, and each segment may be a wildcard pattern, as in
+    blocks.block.*.states or tags.items/*.
+    """
+    result = {}
+    for path in paths:
+        selected = _select(aggregate, path.split('.'))
+        if selected is not _MISSING:
+            _merge(result, selected)
+    return result
@@ -0,0 +1,283 @@
+"""
+A dense table of every block state, for turning global block state ids into
+blocks and property values (and back) without walking the blocks section.
+
+Every state id maps to the index of its block (in ordered_blocks) and to its
+packed property values: the state's offset from the block's min_state_id.
+Like Minecraft, properties are ordered by name, and the last one varies the
+fastest, so each property value index is (packed // stride) % radix.
+
+The many-state methods use NumPy arrays when NumPy is installed, and lists
+otherwise.
+"""
+
+import json
+import logging
+import sys
+from array import array
+from struct import calcsize, pack, unpack_from
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b'BRST'
+FORMAT = 1
+
+# Magic, format, and the number of blocks, properties and states
+_HEADER = '<4sHIII'
+
+
+def _array(values=()):
+    # 'I' is 4 bytes on every platform Burger runs on
+    return array('I', values)
+
+
+def property_values(prop):
+    """
+    Returns the values of a property from blocks.block.*.states, in the order
+    Minecraft numbers them.
+    """
+    if prop['type'] == 'bool':
+        return [True, False]
+    elif prop['type'] == 'int':
+        return list(range(prop['min'], prop['max'] + 1))
+    else:
+        return list(prop['values'])
+
+
+class StateTable:
+    def __init__(self):
+        # Block text ids, by block index
+        self.blocks = []
+        self._block_indices = {}
+        # (name, values) of each block's properties, by block index
+        self.properties = []
+        # By block index: the first state id, and where its properties start
+        # in the stride and radix arrays
+        self.base = _array()
+        self.first = _array()
+        self.count = _array()
+        self.stride = _array()
+        self.radix = _array()
+        # By state id
+        self.state_block = _array()
+        self.state_packed = _array()
+        self._numpy = None
+
+    def __len__(self):
+        return len(self.state_block)
+
+    @staticmethod
+    def build(blocks) -> 'StateTable':
+        """
+        Builds the table from the blocks section of the aggregate, once the
+        blockstates topping has run.
+        """
+        table = StateTable()
+        for text_id in blocks['ordered_blocks']:
+            block = blocks['block'][text_id]
+            properties = sorted(
+                (prop['name'], property_values(prop)) for prop in block['states']
+            )
+            num_states = 1
+            for _, values in properties:
+                num_states *= len(values)
+            if num_states != block['num_states']:
+                # Pre-flattening versions give every block 16 states
+                logging.warning(
+                    f"The properties of {text_id} don't add up to its {block['num_states']} states; leaving them out of the state table"
+                )
+                properties = []
+
+            index = len(table.blocks)
+            table._block_indices[text_id] = index
+            table.blocks.append(text_id)
+            table.properties.append(properties)
+            table.base.append(block['min_state_id'])
+            table.first.append(len(table.stride))
+            table.count.append(len(properties))
+
+            stride = 1
+            strides = []
+            for _, values in reversed(properties):
+                strides.append(stride)
+                stride *= len(values)
+            table.stride.extend(reversed(strides))
+            table.radix.extend(len(values) for _, values in properties)
+
+            assert len(table.state_block) == block['min_state_id']
+            table.state_block.extend([index] * block['num_states'])
+            table.state_packed.extend(range(block['num_states']))
+        return table
+
+    def block_index(self, text_id: str) -> int:
+        return self._block_indices[text_id]
+
+    def decode(self, state_id: int):
+        """Returns the block text id and property values of a state."""
+        index = self.state_block[state_id]
+        packed = self.state_packed[state_id]
+        first = self.first[index]
+        values = {}
+        for offset, (name, possible) in enumerate(self.properties[index]):
+            position = first + offset
+            values[name] = possible[
+                (packed // self.stride[position]) % self.radix[position]
+            ]
+        return self.blocks[index], values
+
+    def encode(self, text_id: str, values) -> int:
+        """
+        Returns the state id of a block with the given property values, all
+        of which have to be given.
+        """
+        index = self._block_indices[text_id]
+        first = self.first[index]
+        state_id = self.base[index]
+        for offset, (name, possible) in enumerate(self.properties[index]):
+            state_id += possible.index(values[name]) * self.stride[first + offset]
+        return state_id
+
+    def _matrices(self):
+        """
+        Returns the per-state arrays and the strides and radices of every
+        block as NumPy arrays, padded to the largest number of properties.
+        """
+        if self._numpy is None:
+            width = max(self.count, default=0)
+            strides = numpy.ones((len(self.blocks), width), dtype=numpy.int64)
+            radices = numpy.ones((len(self.blocks), width), dtype=numpy.int64)
+            for index in range(len(self.blocks)):
+                first = self.first[index]
+                count = self.count[index]
+                strides[index, :count] = self.stride[first : first + count]
+                radices[index, :count] = self.radix[first : first + count]
+            self._numpy = (
+                numpy.asarray(self.state_block, dtype=numpy.int64),
+                numpy.asarray(self.state_packed, dtype=numpy.int64),
+                numpy.asarray(self.base, dtype=numpy.int64),
+                strides,
+                radices,
+            )
+        return self._numpy
+
+    def decode_many(self, state_ids):
+        """
+        Returns the block index of each state, and the index of each of its
+        property values (in name order, padded with zeros to the largest
+        number of properties).
+        """
+        if numpy is not None:
+            state_block, state_packed, _, strides, radices = self._matrices()
+            state_ids = numpy.asarray(state_ids, dtype=numpy.int64)
+            indices = state_block[state_ids]
+            packed = state_packed[state_ids][:, None]
+            return indices, (packed // strides[indices]) % radices[indices]
+
+        width = max(self.count, default=0)
+        indices = []
+        value_indices = []
+        for state_id in state_ids:
+            index = self.state_block[state_id]
+            packed = self.state_packed[state_id]
+            first = self.first[index]
+            row = [0] * width
+            for offset in range(self.count[index]):
+                position = first + offset
+                row[offset] = (packed // self.stride[position]) % self.radix[position]
+            indices.append(index)
+            value_indices.append(row)
+        return indices, value_indices
+
+    def encode_many(self, block_indices, value_indices):
+        """The reverse of decode_many."""
+        if numpy is not None:
+            _, _, base, strides, _ = self._matrices()
+            block_indices = numpy.asarray(block_indices, dtype=numpy.int64)
+            value_indices = numpy.asarray(value_indices, dtype=numpy.int64)
+            return base[block_indices] + (value_indices * strides[block_indices]).sum(
+                axis=1
+            )
+
+        state_ids = []
+        for index, row in zip(block_indices, value_indices, strict=True):
+            first = self.first[index]
+            state_id = self.base[index]
+            for offset in range(self.count[index]):
+                state_id += row[offset] * self.stride[first + offset]
+            state_ids.append(state_id)
+        return state_ids
+
+    def save(self, path: str):
+        """
+        Writes the table to `path`: a header, the arrays (as little-endian
+        32-bit integers), and then the block and property names as JSON.
+        """
+        arrays = (
+            self.base,
+            self.first,
+            self.count,
+            self.stride,
+            self.radix,
+            self.state_block,
+            self.state_packed,
+        )
+        names = json.dumps({'blocks': self.blocks, 'properties': self.properties})
+        with open(path, 'wb') as fout:
+            fout.write(
+                pack(
+                    _HEADER,
+                    MAGIC,
+                    FORMAT,
+                    len(self.blocks),
+                    len(self.stride),
+                    len(self.state_block),
+                )
+            )
+            for values in arrays:
+                if sys.byteorder == 'big':
+                    values = _array(values)
+                    values.byteswap()
+                fout.write(values.tobytes())
+            fout.write(names.encode('utf-8'))
+
+    @staticmethod
+    def load(path: str) -> 'StateTable':
+        with open(path, 'rb') as fin:
+            data = fin.read()
+        magic, version, num_blocks, num_properties, num_states = unpack_from(
+            _HEADER, data
+        )
+        if magic != MAGIC or version != FORMAT:
+            raise Exception(f'{path} is not a block state table Burger can read')
+
+        table = StateTable()
+        position = calcsize(_HEADER)
+        for name, length in (
+            ('base', num_blocks),
+            ('first', num_blocks),
+            ('count', num_blocks),
+            ('stride', num_properties),
+            ('radix', num_properties),
+            ('state_block', num_states),
+            ('state_packed', num_states),
+        ):
+            values = _array()
+            values.frombytes(data[position : position + 4 * length])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            setattr(table, name, values)
+            position += 4 * length
+
+        names = json.loads(data[position:].decode('utf-8'))
+        table.blocks = names['blocks']
+        table.properties = [
+            [(name, values) for name, values in properties]
+            for properties in names['properties']
+        ]
+        table._block_indices = {
+            text_id: index for index, text_id in enumerate(table.blocks)
+        }
+        return table
@@ -0,0 +1,154 @@
+"""
+Evaluating static initializers, to find out what each static field of a class
+is set to.
+
+Every <clinit> is run once through walk_method, and what is stored into each
+of the class's own static fields is summarized as a JSON value:
+
+- string, int, float and null constants are kept as they are
+- {'new': class, 'args': [...]} for an object that is constructed
+- {'invoke': 'owner.name', 'descriptor': ..., 'args': [...]} for the result
+  of a method call
+- {'field': 'owner.name'} for the value of another static field
+- {'dynamic': 'owner::name'} for a lambda or method reference
+- a list for an array
+
+Arguments are summarized the same way.  If the walk fails partway through, the
+fields stored after that are paired with the last string constant loaded
+before them instead, as toppings used to do by hand.  Summaries are kept in the jar index
+(if there is one), so later runs against the same jar don't evaluate anything
+again.
+"""
+
+import json
+import logging
+import threading
+
+from jawa.constants import String
+
+from burger import tracing
+from burger.util import InvokeDynamicInfo, WalkerCallback, walk_method
+
+
+class _Summarizer(WalkerCallback):
+    def __init__(self, cf):
+        self.cf = cf
+        self.fields = {}
+
+    def on_new(self, ins, const):
+        return {'new': const.name.value, 'args': []}
+
+    def on_invoke(self, ins, const, obj, args):
+        name = const.name_and_type.name.value
+        if name == '<init>' and isinstance(obj, dict) and 'new' in obj:
+            obj['args'] = args
+            return None
+        return {
+            'invoke': f'{const.class_.name.value}.{name}',
+            'descriptor': const.name_and_type.descriptor.value,
+            'args': args,
+        }
+
+    def on_get_field(self, ins, const, obj):
+        return {'field': f'{const.class_.name.value}.{const.name_and_type.name.value}'}
+
+    def on_put_field(self, ins, const, obj, value):
+        if (
+            ins.mnemonic == 'putstatic'
+            and const.class_.name.value == self.cf.this.name.value
+        ):
+            self.fields[const.name_and_type.name.value] = value
+
+    def on_invokedynamic(self, ins, const, args):
+        return {'dynamic': str(InvokeDynamicInfo.create(ins, self.cf))}
+
+
+def _scan_strings(cf, method, fields):
+    """
+    Adds each static field of `cf` that `method` stores into, but that isn't
+    in `fields` yet, paired with the last string constant loaded before it.
+    """
+    this = cf.this.name.value
+    string = None
+    for ins in method.code.disassemble():
+        if ins.mnemonic in ('ldc', 'ldc_w') and isinstance(ins.operands[0], String):
+            string = ins.operands[0].string.value
+        elif ins.mnemonic == 'putstatic':
+            const = ins.operands[0]
+            if const.class_.name.value == this:
+                fields.setdefault(const.name_and_type.name.value, string)
+
+
+def first_string(summary):
+    """
+    Returns the first string constant in `summary` (searching arguments depth
+    first), or None.  For a field like `STONE = createKey("stone")`, this is
+    "stone".
+    """
+    if isinstance(summary, str):
+        return summary
+    if isinstance(summary, dict):
+        summary = summary.get('args', ())
+    if isinstance(summary, list):
+        for value in summary:
+            found = first_string(value)
+            if found is not None:
+                return found
+    return None
+
+
+class StaticTable:
+    """
+    What the static initializer of each class stores in its static fields,
+    evaluated the first time a class is asked about.
+    """
+
+    def __init__(self, classloader):
+        self.classloader = classloader
+        # Class name -> {field name: summary}, in the order they are stored
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def fields(self, class_name: str):
+        """
+        Returns the summary of every static field that the <clinit> of
+        `class_name` sets, by field name.  Fields set after something the
+        evaluator can't follow (such as a loop) are summarized as the last
+        string constant loaded before them, or None.
+        """
+        fields = self._classes.get(class_name)
+        if fields is not None:
+            return fields
+
+        index = self.classloader.index
+        if index is not None and class_name in index.statics:
+            fields = json.loads(index.statics[class_name])
+        else:
+            # Round-tripped so that summaries are the same whether or not they
+            # came from the index
+            encoded = json.dumps(self._evaluate(class_name), default=repr)
+            fields = json.loads(encoded)
+            if index is not None:
+                index.add_statics(class_name, encoded)
+
+        with self._lock:
+            return self._classes.setdefault(class_name, fields)
+
+    def _evaluate(self, class_name):
+        cf = self.classloader[class_name]
+        summarizer = _Summarizer(cf)
+        with tracing.span(class_name, 'class.statics'):
+            for method in cf.methods.find(name='<clinit>'):
+                try:
+                    walk_method(cf, method, summarizer)
+                except Exception as e:
+                    logging.debug(
+                        f'Stopped evaluating the static initializer of {class_name} '
+                        f'({e!r}), scanning the rest for string constants'
+                    )
+                    _scan_strings(cf, method, summarizer.fields)
+        return summarizer.fields
+
+    def value(self, class_name: str, field: str):
+        """Returns the summary of one static field, or None."""
+        return self.fields(class_name).get(field)
@@ -0,0 +1,110 @@
+"""
+Tag membership by registry id.  Each flattened tag is kept as a bitset over
+the ids of its registry, so asking whether something is in a tag is a dict
+lookup and a bit test, however large the tag is.
+"""
+
+# Before 1.21, tag directories (and so tag types) were plural
+PLURAL_TAG_TYPES = {'blocks': 'block', 'items': 'item', 'entity_types': 'entity_type'}
+
+
+def _namespaced(name):
+    return name if ':' in name else 'minecraft:' + name
+
+
+def registry_ids(aggregate):
+    """
+    Returns the id of every entry of the registries tags can be checked
+    against, by tag type (under both the singular and the older plural
+    spelling) and then by namespaced name.  Registries that weren't found are
+    left out.
+    """
+    registries = {}
+    if 'blocks' in aggregate:
+        registries['block'] = {
+            _namespaced(text_id): block['numeric_id']
+            for text_id, block in aggregate['blocks']['block'].items()
+        }
+    if 'items' in aggregate:
+        registries['item'] = {
+            _namespaced(text_id): item['numeric_id']
+            for text_id, item in aggregate['items']['item'].items()
+        }
+    if 'entities' in aggregate:
+        registries['entity_type'] = {
+            _namespaced(name): entity['id']
+            for name, entity in aggregate['entities']['entity'].items()
+            if 'id' in entity
+        }
+    for plural, singular in PLURAL_TAG_TYPES.items():
+        if singular in registries:
+            registries[plural] = registries[singular]
+    return registries
+
+
+def tag_ids(tag, registry):
+    """
+    Returns the sorted registry ids of the values of a flattened tag, leaving
+    out values that aren't in the registry.
+    """
+    return sorted({registry[value] for value in tag['values'] if value in registry})
+
+
+class TagIndex:
+    def __init__(self, tags, registries, ids=None):
+        """
+        `tags` is the tags section of the aggregate (once flattened),
+        `registries` is what registry_ids() returns, and `ids` is the
+        tag_ids section, if there is one.
+        """
+        ids_by_tag = ids or {}
+        self.registries = registries
+        # Tag name -> (tag type, bitset of registry ids)
+        self._tags = {}
+        for name, tag in tags.items():
+            registry = registries.get(tag['type'])
+            if registry is None:
+                continue
+            ids = ids_by_tag[name] if name in ids_by_tag else tag_ids(tag, registry)
+            bits = bytearray((max(ids, default=-1) >> 3) + 1)
+            for id in ids:
+                bits[id >> 3] |= 1 << (id & 7)
+            self._tags[name] = (tag['type'], bytes(bits))
+
+    @staticmethod
+    def from_aggregate(aggregate) -> 'TagIndex':
+        return TagIndex(
+            aggregate['tags'], registry_ids(aggregate), aggregate.get('tag_ids')
+        )
+
+    def __contains__(self, name):
+        return name in self._tags
+
+    def contains_id(self, name: str, id: int) -> bool:
+        """Checks whether the registry id `id` is in the tag `name`."""
+        bits = self._tags[name][1]
+        index = id >> 3
+        return index < len(bits) and bool(bits[index] & (1 << (id & 7)))
+
+    def contains(self, name: str, value: str) -> bool:
+        """
+        Checks whether `value` (such as 'minecraft:stone', or just 'stone')
+        is in the tag `name` (such as 'block/mineable/pickaxe').
+        """
+        type, bits = self._tags[name]
+        id = self.registries[type].get(_namespaced(value))
+        if id is None:
+            return False
+        index = id >> 3
+        return index < len(bits) and bool(bits[index] & (1 << (id & 7)))
+
+    def ids(self, name: str):
+        """Returns the registry ids in the tag `name`, in order."""
+        bits = self._tags[name][1]
+        return [
+            index * 8 + bit
+            for index, byte in enumerate(bits)
+            if byte
+            for bit in range(8)
+            if byte & (1 << bit)
+        ]
@@ -5,6 +5,7 @@ from jawa.classloader import ClassLoader
 from jawa.util.descriptor import method_descriptor
 
 from burger.mappings import MAPPINGS
+from burger.statics import first_string
 from burger.util import WalkerCallback, try_eval_lambda, walk_method
 
 from .topping import Topping
@@ -18,12 +19,35 @@ class BlocksTopping(Topping):
     DEPENDS = [
         'identify.block.register',
         'identify.block.list',
+        'identify.block.references',
         'identify.identifier',
+        'identify.resourcekey',
         'language',
         'version.data',
         'version.is_flattened',
     ]
 
+    @staticmethod
+    def find_caller(classloader, cf, method, args):
+        """
+        Returns the last method of `cf` taking `args` (a descriptor prefix)
+        that calls `method`.
+        """
+        sites = [
+            site
+            for site in classloader.xrefs.callers(
+                method.name.value, method.descriptor.value, within=cf.this.name.value
+            )
+            if site.method_descriptor.startswith(args)
+        ]
+        if not sites:
+            return None
+        site = sites[-1]
+        return cf.methods.find_one(
+            name=site.method_name,
+            f=lambda m: m.descriptor.value == site.method_descriptor,
+        )
+
     @staticmethod
     def list_super_classes(class_name, superclass, classloader):
         super_classes = []
@@ -70,16 +94,10 @@ class BlocksTopping(Topping):
         references_class = aggregate['classes'].get('block.references')
         references_class_fields_to_block_ids = {}
         if references_class:
-            # process the references class
-            references_cf = classloader[references_class]
-            for method in references_cf.methods.find(name='<clinit>'):
-                block_id = None
-                for ins in method.code.disassemble():
-                    if ins.mnemonic == 'ldc':
-                        block_id = ins.operands[0].string.value
-                    if ins.mnemonic == 'putstatic':
-                        field = ins.operands[0].name_and_type.name.value
-                        references_class_fields_to_block_ids[field] = block_id
+            # process the references class, whose fields are all like
+            # STONE = createKey("stone")
+            for field, value in classloader.statics.fields(references_class).items():
+                references_class_fields_to_block_ids[field] = first_string(value)
 
         # Figure out what the builder class is
         ctor = cf.methods.find_one(name='<init>')
@@ -89,32 +107,14 @@ class BlocksTopping(Topping):
         # Sets hardness and resistance
         hardness_setter = builder_cf.methods.find_one(args='FF')
         # There's also one that sets both to the same value
-        hardness_setter_2 = None
-        for method in builder_cf.methods.find(args='F'):
-            for ins in method.code.disassemble():
-                if ins.mnemonic == 'invokevirtual':
-                    const = ins.operands[0]
-                    if (
-                        const.name_and_type.name.value == hardness_setter.name.value
-                        and const.name_and_type.descriptor.value
-                        == hardness_setter.descriptor.value
-                    ):
-                        hardness_setter_2 = method
-                        break
+        hardness_setter_2 = BlocksTopping.find_caller(
+            classloader, builder_cf, hardness_setter, '(F)'
+        )
         assert hardness_setter_2 is not None
         # ... and one that sets them both to 0
-        hardness_setter_3 = None
-        for method in builder_cf.methods.find(args=''):
-            for ins in method.code.disassemble():
-                if ins.mnemonic == 'invokevirtual':
-                    const = ins.operands[0]
-                    if (
-                        const.name_and_type.name.value == hardness_setter_2.name.value
-                        and const.name_and_type.descriptor.value
-                        == hardness_setter_2.descriptor.value
-                    ):
-                        hardness_setter_3 = method
-                        break
+        hardness_setter_3 = BlocksTopping.find_caller(
+            classloader, builder_cf, hardness_setter_2, '()'
+        )
         assert hardness_setter_3 is not None
 
         block_behavior_cf = MAPPINGS.get_class_from_classloader(
@@ -3,11 +3,14 @@
 
 import logging
 import traceback
+from contextlib import nullcontext
+from typing import NamedTuple, Optional
 
 import six
 from jawa.constants import ConstantClass, String
 from jawa.util.descriptor import field_descriptor, method_descriptor
 
+from burger import parallel
 from burger.util import InvokeDynamicInfo, REF_invokeStatic, get_enum_constants
 
 from .topping import Topping
@@ -28,8 +31,845 @@ PLANES = {'HORIZONTAL': HORIZONTAL, 'VERTICAL': VERTICAL}
 PREDICATE_CLASSES = ('com/google/common/base/Predicate', 'java/util/function/Predicate')
 
 
+class Settings(NamedTuple):
+    """What a BlockStateExtractor needs to know about the jar."""
+
+    blockstatecontainer: str
+    block_superclass: str
+    # The name and descriptor of the method blocks register their states in
+    base_name: str
+    base_descriptor: str
+    is_18w19a: bool
+    plane: str
+    sounds_list: Optional[str]
+
+
+class BlockStateExtractor:
+    """
+    Finds the properties each block class registers (part 1), and what the
+    static fields they're read from are set to (part 2).  Every class is read
+    at most once, as the results for each are kept.
+    """
+
+    def __init__(self, classloader, settings: Settings):
+        self.classloader = classloader
+        self.settings = settings
+        # Properties that are used by each block class
+        self.properties_by_class = {}
+        # The types of every property seen in part 1
+        self.found_property_types = set()
+        # Type name -> 'bool', 'int', 'enum' or 'direction'; needed by part 2
+        self.property_types = {}
+        self.is_enum_cache = {}
+        self.fields_by_class = {}
+
+    def matches(self, other_method):
+        return (
+            other_method.name.value == self.settings.base_name
+            and other_method.descriptor.value == self.settings.base_descriptor
+        )
+
+    def process_superclass_invokespecial(self, name):
+        """
+        glow_lichen, sculk_vein, and cave_vines all call the superclass's
+        block state registration method with an invokespecial instruction,
+        and then add their own states. cave_vines can just call it directly,
+        but glow_lichen and sculk_vein have complicated logic involving
+        a Map of properties, which is easier to manually handle.
+
+        Returns a tuple containing a copy of the properties (which the
+        caller can safely mutate) and a tuple of (method_descriptor, name)
+        for a function (useDirection) that the caller needs to verify does
+        not exist in the calling class (that tuple is None for cave_vines,
+        in which case no checking is needed).
+        """
+
+        cf = self.classloader[name]
+        method = cf.methods.find_one(f=self.matches)
+        assert method is not None
+
+        for ins in method.code.disassemble():
+            if ins == 'astore' and ins.operands[0].value == 2:
+                # This instruction (astore_2) only appears in glow_lichen
+                # and sculk_vein (and not in cave_vines).
+                break
+        else:
+            # This is cave_vines, so we can just use the normal logic.
+            return (list(self.process_class(name)), None)
+
+        # The code in question looks like this:
+        """
+        private static final Map<EnumFacing, BoolProperty> PROPERTY_BY_FACING = MultidirectionalBlock.PROPERTY_BY_FACING;
+        protected static final EnumFacing[] ENUMFACING_VALUES = EnumFacing.values();
+        protected boolean useDirection(EnumFacing dir) {
+            return true;  // this code assumes nothing overrides this function
+        }
+        @Override
+        public void registerStates(BlockStateContainer container) {
+            for (EnumFacing dir : ENUMFACING_VALUES) {
+                if (useDirection(dir)) {
+                    container.register(getProperty(dir));
+                }
+            }
+        }
+        public static BoolProperty getProperty(EnumFacing dir) {
+            return PROPERTY_BY_FACING.get(dir);
+        }
+        """
+        # where getProperty is the call we find below.
+        # MultidirectionalBlock is NOT a parent of these multiface blocks
+        # (glow_lichen/sculk_vein) but is a parent of chorus plant.
+        # useDirection fortunately is unused in all actual implementations.
+
+        for ins in method.code.disassemble():
+            if ins == 'invokestatic':
+                const = ins.operands[0]
+                desc = method_descriptor(const.name_and_type.descriptor.value)
+                method2 = cf.methods.find_one(
+                    name=const.name_and_type.name, args=desc.args_descriptor
+                )
+                enumfacing = method2.args[0].name
+                break
+        else:
+            raise Exception('Failed to find invokestatic instruction')
+
+        # Note: the invokevirtual comes before the invokestatic, but we want to know
+        # what enumfacing is to verify that method_that_should_not_exist is correct.
+        for ins in method.code.disassemble():
+            if ins == 'invokevirtual':
+                const = ins.operands[0]
+                method_that_should_not_exist_desc = method_descriptor(
+                    const.name_and_type.descriptor.value
+                )
+                method_that_should_not_exist_name = const.name_and_type.name.value
+                assert method_that_should_not_exist_desc.returns.name == 'boolean'
+                assert len(method_that_should_not_exist_desc.args) == 1
+                assert method_that_should_not_exist_desc.args[0].name == enumfacing
+                break
+        else:
+            raise Exception('Failed to find invokevirtual instruction')
+
+        for ins2 in method2.code.disassemble():
+            if ins2 == 'getstatic':
+                const2 = ins2.operands[0]
+                assert const2.class_.name == name
+                property_by_facing_field = cf.fields.find_one(
+                    name=const2.name_and_type.name.value
+                )
+                assert property_by_facing_field is not None
+                break
+        else:
+            raise Exception('Failed to find getstatic instruction')
+
+        method3 = cf.methods.find_one(name='<clinit>')
+        source_ins = None
+        for ins3 in method3.code.disassemble():
+            if ins3 == 'getstatic':
+                source_ins = ins3
+            elif ins3 == 'putstatic':
+                if ins3.operands[0].name_and_type.name == property_by_facing_field.name:
+                    assert source_ins is not None
+                    # Note: using source_ins, not ins3, here
+                    multidirectional_cf = self.classloader[
+                        source_ins.operands[0].class_.name.value
+                    ]
+                    real_property_by_facing_field = multidirectional_cf.fields.find_one(
+                        name=source_ins.operands[0].name_and_type.name.value
+                    )
+                    assert real_property_by_facing_field is not None
+                    break
+        else:
+            raise Exception(
+                'Failed to find putfield corresponding to '
+                + property_by_facing_field.name.value
+            )
+
+        # Now we need to deal with a lambda...
+        """
+        public static final Map<EnumFacing, BoolProperty> PROPERTY_BY_FACING =
+                ImutableMap.copyOf(Util.make(Maps.newEnumMap(EnumFacing.class),
+                        (map) -> {
+                                map.put(EnumFacing.NORTH, NORTH);
+                                map.put(EnumFacing.EAST, EAST);
+                                map.put(EnumFacing.SOUTH, SOUTH);
+                                map.put(EnumFacing.WEST, WEST);
+                                map.put(EnumFacing.UP, UP);
+                                map.put(EnumFacing.DOWN, DOWN);
+                        }));
+        """
+        method4 = multidirectional_cf.methods.find_one(name='<clinit>')
+        next_is_lambda = False
+        for ins4 in method4.code.disassemble():
+            if ins4 == 'invokestatic':
+                if ins4.operands[0].name_and_type.name == 'newEnumMap':
+                    next_is_lambda = True
+            elif next_is_lambda:
+                info = InvokeDynamicInfo.create(ins4, multidirectional_cf)
+                assert info.ref_kind == REF_invokeStatic
+                assert info.method_class == multidirectional_cf.this.name
+                lambda_method = multidirectional_cf.methods.find_one(
+                    name=info.method_name,
+                    args=info.method_desc.args_descriptor,
+                    returns=info.method_desc.returns_descriptor,
+                )
+                assert lambda_method is not None
+                break
+        else:
+            raise Exception('Failed to find lambda')
+
+        property_by_facing = {}
+        stack5 = []
+        for ins5 in lambda_method.code.disassemble():
+            if ins5 == 'getstatic':
+                const5 = ins5.operands[0]
+                prop = {
+                    'field_name': const5.name_and_type.name.value,
+                    'field_class': const5.class_.name.value,
+                }
+                stack5.append(prop)
+            elif ins5 == 'invokevirtual':
+                value = stack5.pop()
+                key = stack5.pop()['field_name']
+                property_by_facing[key] = value
+
+        enumfacing_members = get_enum_constants(self.classloader[enumfacing])
+        assert len(property_by_facing) == len(enumfacing_members)
+        properties = []
+        for facing in enumfacing_members.values():
+            properties.append(property_by_facing[facing['field']])
+        return properties, (
+            method_that_should_not_exist_desc,
+            method_that_should_not_exist_name,
+        )
+
+    def process_class(self, name):
+        """
+        Gets the properties for the given block class, checking the parent
+        class if none are defined.  Returns the properties, and also adds
+        them to properties_by_class
+        """
+        is_18w19a = self.settings.is_18w19a
+        blockstatecontainer = self.settings.blockstatecontainer
+
+        if name in self.properties_by_class:
+            # Caching - avoid reading the same class multiple times
+            return self.properties_by_class[name]
+
+        cf = self.classloader[name]
+        method = cf.methods.find_one(f=self.matches)
+
+        if not method:
+            properties = self.process_class(cf.super_.name.value)
+            self.properties_by_class[name] = properties
+            return properties
+
+        properties = None
+        if_pos = None
+        stack = []
+
+        for ins in method.code.disassemble():
+            # This could _almost_ just be checking for getstatic, but
+            # brewing stands use an array of properties as the field,
+            # so we need some stupid extra logic.
+            if ins == 'new':
+                assert not is_18w19a  # In 18w19a this should be a parameter
+                const = ins.operands[0]
+                type_name = const.name.value
+                assert type_name == blockstatecontainer
+                stack.append(object())
+            elif ins == 'aload' and ins.operands[0].value == 1:
+                assert is_18w19a  # The parameter is only used in 18w19a and above
+                stack.append(object())
+            elif ins in ('sipush', 'bipush'):
+                stack.append(ins.operands[0].value)
+            elif ins in ('anewarray', 'newarray'):
+                length = stack.pop()
+                val = [None] * length
+                stack.append(val)
+            elif ins == 'getstatic':
+                const = ins.operands[0]
+                desc = field_descriptor(const.name_and_type.descriptor.value)
+                if desc.name == 'java/util/List':
+                    # Special-casing for chiseled bookshelves in 22w46a,
+                    # which use a list for slot_0_occupied through slot_5_occupied.
+                    # This code is very brittle and hacky.
+                    init = cf.methods.find_one(name='<clinit>')
+                    stack2 = []
+                    for ins2 in init.code.disassemble():
+                        # return appears too, but we break before it
+                        assert ins2 in ('getstatic', 'invokestatic', 'putstatic')
+                        if ins2 == 'getstatic':
+                            const2 = ins2.operands[0]
+                            prop = {
+                                'field_name': const2.name_and_type.name.value,
+                                'field_class': const2.class_.name.value,
+                            }
+                            desc2 = field_descriptor(
+                                const2.name_and_type.descriptor.value
+                            )
+                            self.found_property_types.add(desc2.name)
+                            stack2.append(prop)
+                        elif ins2 == 'invokestatic':
+                            assert ins2.operands[0].class_.name == 'java/util/List'
+                            assert ins2.operands[0].name_and_type.name == 'of'
+                            assert (
+                                ins2.operands[0].name_and_type.descriptor
+                                == '(Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;)Ljava/util/List;'
+                            )
+                            # Put the last 6 items onto the stack as an array
+                            # (this should be equivalent to stack2 = [stack2] in practice)
+                            stack2 = stack2[:-6] + [stack2[-6:]]
+                        elif ins2 == 'putstatic':
+                            # We should be storing to the same field as the one we're searching for
+                            assert ins2.operands[0] == const
+                            # So, we can treat this as handling the original getfield.
+                            stack.append(stack2.pop())
+                            break
+                    else:
+                        raise Exception(
+                            'Failed to hackily find list for getfield ins ' + str(ins)
+                        )
+                else:
+                    # The normal path for everything else
+                    prop = {
+                        'field_name': const.name_and_type.name.value,
+                        'field_class': const.class_.name.value,
+                    }
+                    if desc.dimensions == 0:
+                        # Dimensions are nonzero for brewing stands and glow_lichen/sculk_vein
+                        # The latter two use EnumFacing, which is a problem since that's not a
+                        # property. We could add the one for brewing stands, but it's already
+                        # been added by other blocks.
+                        self.found_property_types.add(desc.name)
+                    stack.append(prop)
+            elif ins == 'aaload':
+                index = stack.pop()
+                array = stack.pop()
+                prop = array.copy()
+                prop['array_index'] = index
+                stack.append(prop)
+            elif ins == 'aastore':
+                value = stack.pop()
+                index = stack.pop()
+                array = stack.pop()
+                array[index] = value
+            elif ins == 'dup':
+                stack.append(stack[-1])
+            elif ins == 'invokespecial':
+                const = ins.operands[0]
+                desc = method_descriptor(const.name_and_type.descriptor.value)
+                if const.name_and_type.name == '<init>':
+                    # This constructor call is only used in 1.12 and earlier; it isn't used in 1.13.
+                    assert not is_18w19a
+                    assert len(desc.args) == 2
+
+                    # Normally this constructor call would return nothing, but
+                    # in this case we'd rather remove the object it's called on
+                    # and keep the properties array (its parameter)
+                    arg = stack.pop()
+                    stack.pop()  # Block
+                    stack.pop()  # Invocation target
+                    stack.append(arg)
+                else:
+                    # glow_lichen, sculk_vein, and cave_vines all call the superclass's
+                    # block state registration method
+                    assert const.class_.name == cf.super_.name
+                    assert const.name_and_type.name.value == self.settings.base_name
+                    assert (
+                        const.name_and_type.descriptor.value
+                        == self.settings.base_descriptor
+                    )
+                    assert properties is None
+                    properties, method_that_should_not_exist = (
+                        self.process_superclass_invokespecial(cf.super_.name.value)
+                    )
+
+                    if method_that_should_not_exist is not None:
+                        (
+                            method_that_should_not_exist_desc,
+                            method_that_should_not_exist_name,
+                        ) = method_that_should_not_exist
+                        assert (
+                            cf.methods.find_one(
+                                name=method_that_should_not_exist_name,
+                                args=method_that_should_not_exist_desc.args_descriptor,
+                                returns=method_that_should_not_exist_desc.returns_descriptor,
+                            )
+                            is None
+                        )
+
+                    assert is_18w19a
+                    stack.pop()  # blockstatecontainer instance
+                    stack.pop()  # this
+            elif ins == 'invokevirtual':
+                # Two possibilities (both only present pre-flattening):
+                # 1. It's isDouble() for a slab.  Two different sets of
+                #    properties in that case.
+                # 2. It's getTypeProperty() for flowers.  Only one
+                #    set of properties, but other hacking is needed.
+                # We can differentiate these cases based off of the return
+                # type.
+                # There is a third option post 18w19a:
+                # 3. It's calling the state container's register method.
+                # We can check this just by the type.
+                const = ins.operands[0]
+                desc = method_descriptor(const.name_and_type.descriptor.value)
+
+                if const.class_.name == blockstatecontainer:
+                    # Case 3.
+                    # Note that the register method actually adds multiple
+                    # states. The only block that calls it multiple times
+                    # is Chain in 1.16.2-pre1+ though, with everything else
+                    # using only 1 varargs call.  (There also are no calls
+                    # to the superclass' register states method.)
+                    if properties is None:
+                        properties = stack.pop()
+                    else:
+                        properties.extend(stack.pop())
+                    assert desc.returns.name == blockstatecontainer
+                    # Don't pop anything, since we'd just pop and re-add the builder
+                elif desc.returns.name == 'boolean':
+                    # Case 2.
+                    properties = [None, None]
+                    stack.pop()  # Target object
+                    # XXX shouldn't something be returned here?
+                else:
+                    # Case 1.
+                    # Assume that the return type is the base interface
+                    # for properties
+                    stack.pop()  # Target object
+                    stack.append(None)
+            elif ins == 'ifeq':
+                assert if_pos is None
+                if_pos = ins.pos + ins.operands[0].value
+            elif ins == 'pop':
+                stack.pop()
+            elif ins == 'areturn':
+                assert not is_18w19a  # In 18w19a we don't return a container
+                if if_pos is None:
+                    assert properties is None
+                    properties = stack.pop()
+                else:
+                    assert isinstance(properties, list)
+                    index = 0 if ins.pos < if_pos else 1
+                    assert properties[index] is None
+                    properties[index] = stack.pop()
+            elif ins == 'return':
+                assert is_18w19a  # We only return void in 18w19a
+            elif ins == 'aload':
+                assert ins.operands[0].value == 0  # Should be aload_0 (this)
+                stack.append(object())
+            elif ins == 'invokestatic':
+                # Added in 22w46a: the chiseled bookshelf uses a list to store
+                # slot_0_occupied through slot_5_occupied, and also checks that the
+                # object block states are being registered to is non-null for some reason
+                # (_after_ already using it? This seems to be automatic for lambdas, I guess?)
+                assert ins.operands[0].class_.name == 'java/util/Objects'
+                assert ins.operands[0].name_and_type.name == 'requireNonNull'
+                assert (
+                    ins.operands[0].name_and_type.descriptor
+                    == '(Ljava/lang/Object;)Ljava/lang/Object;'
+                )
+                # requireNonNull just returns its parameter, so we don't need to do anything
+            elif ins == 'invokedynamic':
+                # As implied above, this is used in 22w46a for chiseled bookshelves,
+                # as something like this:
+                """
+                void registerStates(BlockStateContainer instance) {
+                    instance.register(BlockStates.LAST_INTERACTION_BOOK_SLOT)
+                            .register(BlockAbstractBookshelf.FACING);
+                    // compiler-generated for instance::register some reason, and like this and
+                    // not making use of requireNonNull's return value.
+                    Objects.requireNonNull(instance);
+                    BlockChiseledBookshelf.SLOT_OCCUPIED.forEach(instance::register);
+                }
+                """
+                # We can just ignore this and assume any invokedynamic is for this purpose.
+                desc = method_descriptor(ins.operands[0].name_and_type.descriptor.value)
+                assert ins.operands[0].name_and_type.name == 'accept'
+                assert desc.returns.name == 'java/util/function/Consumer'
+            elif ins == 'invokeinterface':
+                # This is the forEach in 22w46a for chiseled bookshelves.
+                assert ins.operands[0].class_.name == 'java/util/List'
+                assert ins.operands[0].name_and_type.name == 'forEach'
+                assert (
+                    ins.operands[0].name_and_type.descriptor
+                    == '(Ljava/util/function/Consumer;)V'
+                )
+                stack.pop()  # removing the consumer argument
+                properties.extend(stack.pop())  # And this is the field.
+            else:
+                logging.debug(
+                    f'{name} createBlockState contains unimplemented ins {ins}'
+                )
+
+        if properties is None:
+            # If we never set properties, warn; however, this is normal for
+            # the base implementation in Block in 18w19a
+            if name != self.settings.block_superclass:
+                logging.debug(f"Didn't find anything that set properties for {name}")
+            properties = []
+        self.properties_by_class[name] = properties
+        return properties
+
+    def class_properties(self, cls):
+        """
+        Returns the properties of a block class, or an empty list if they
+        couldn't be found.
+        """
+        try:
+            return self.process_class(cls)
+        except Exception:
+            logging.debug(f'Failed to process properties for {cls}')
+            if logging.root.isEnabledFor(logging.DEBUG):
+                traceback.print_exc()
+            self.properties_by_class[cls] = []
+            return []
+
+    def is_enum(self, cls):
+        """
+        Checks if the given class is an enum.
+        This needs to be recursive due to inner classes for enums.
+        """
+        if cls in self.is_enum_cache:
+            return self.is_enum_cache[cls]
+        if cls not in self.classloader:
+            self.is_enum_cache[cls] = False
+            return False
+
+        cf = self.classloader[cls]
+        super = cf.super_.name.value
+        if super == 'java/lang/Enum':
+            self.is_enum_cache[cls] = True
+        elif super == 'java/lang/Object':
+            self.is_enum_cache[cls] = False
+        else:
+            self.is_enum_cache[cls] = self.is_enum(super)
+
+        return self.is_enum_cache[cls]
+
+    def find_field(self, cls, field_name):
+        """
+        This function exists to deal with a javac quirk: static fields in superclasses
+        are treated as if they were static fields in the current class. This also
+        applies to invokestatic, but it's particularly weird for fields. For example:
+
+        ```java
+        interface Iface {
+            public static final Object FOO = "foo";  // Note: Object to prevent inlining
+        }
+        class Parent implements Iface {
+            public static final Object BAR = "bar";
+        }
+        class Child extends Parent implements Iface {
+            public static void test() {
+                System.out.println(FOO);  // getstatic uses Child.FOO
+                System.out.println(Iface.FOO);  // uses Iface.FOO
+                System.out.println(Parent.FOO);  // uses Parent.FOO
+                System.out.println(Child.FOO);  // uses Child.FOO
+                System.out.println(BAR);  // uses Child.BAR
+                System.out.println(Parent.BAR);  // uses Parent.BAR
+                System.out.println(Child.BAR);  // uses Child.BAR
+            }
+        }
+        ```
+
+        As a practical example:
+
+        ```java
+        public class Block { /* ... */ }
+        public abstract class BlockHorizontal extends Block {
+            public static final Property FACING = Properties.FACING;
+            // ... also supports mirroring and rotating ...
+        }
+        public class BlockCocoaBeans {
+            public static final Property AGE = Properties.AGE_0_TO_2;
+            @Override
+            void registerProperties(BlockStateContainer container) {
+                container.register(FACING, AGE);
+                // looks the same bytecode-wise as:
+                // container.register(BlockCocoaBeans.FACING, BlockCocoaBeans.AGE);
+            }
+        }
+        ```
+
+        99% of blocks register without using a specific class name, and thus use getstatic
+        on the current class. The exceptions are infested deepslate, which uses the same
+        AXIS field used by regular deepslate (and other pillar-like blocks) but does not
+        directly inherit the same class, and the chiseled bookshelf in 22w46a+ which uses
+        a list that contains direct references to the class containing all block state
+        properties without re-declaring them in its own class.
+
+        cls: name of the class
+        field_name: name of the field to find.  If None, returns all fields
+        """
+        if cls in self.fields_by_class:
+            if field_name is not None:
+                if field_name not in self.fields_by_class[cls]:
+                    logging.debug(
+                        f"Requested field {cls}.{field_name} but that wasn't found last time"
+                    )
+                return self.fields_by_class[cls][field_name]
+            else:
+                return self.fields_by_class[cls]
+        elif cls == self.settings.sounds_list:
+            # If we already know what the sounds list class is, just ignore it
+            # as going through it would take a while for no reason
+            return object()
+
+        cf = self.classloader[cls]
+
+        self.fields_by_class[cls] = {}
+        super_name = cf.super_.name.value
+        if not super_name.startswith('java/'):
+            # Add fields from superclass
+            self.fields_by_class[cls].update(self.find_field(super_name, None))
+        for iface in cf.interfaces:
+            # Relevant for cave vines (glowberries), which have separate blocks for cave_vines
+            # and cave_vines_plant, but the berries property is declared in a shared interface.
+            iface_name = iface.name.value
+            if not iface_name.startswith('java/') and not iface_name.startswith(
+                'com/google/'
+            ):
+                self.fields_by_class[cls].update(self.find_field(iface_name, None))
+
+        init = cf.methods.find_one(name='<clinit>')
+        if not init:
+            if field_name is not None:
+                return self.fields_by_class[cls][field_name]
+            else:
+                return self.fields_by_class[cls]
+
+        stack = []
+        locals = {}
+
+        for ins in init.code.disassemble():
+            if ins == 'putstatic':
+                const = ins.operands[0]
+                name = const.name_and_type.name.value
+                value = stack.pop()
+
+                if isinstance(value, dict) and 'class' in value:
+                    if 'declared_in' not in value:
+                        # If there's already a declared_in, this is a field
+                        # loaded with getstatic, and we don't want to change
+                        # the true location of it
+                        value['declared_in'] = cls
+                    if value['class'] == self.settings.plane:
+                        # Convert to an instance of Plane
+                        # Now is the easiest time to do this, and for
+                        # Plane itself it doesn't matter since it's never
+                        # used on the stack
+                        assert 'enum_name' in value
+                        assert value['enum_name'] in PLANES
+                        value = PLANES[value['enum_name']]
+                self.fields_by_class[cls][name] = value
+            elif ins == 'getstatic':
+                const = ins.operands[0]
+                target = const.class_.name.value
+                name = const.name_and_type.name.value
+                if not target.startswith('java/'):
+                    stack.append(self.find_field(target, name))
+                else:
+                    stack.append(object())
+            elif ins in ('ldc', 'ldc_w', 'ldc2_w'):
+                const = ins.operands[0]
+
+                if isinstance(const, ConstantClass):
+                    stack.append('%s.class' % const.name.value)
+                elif isinstance(const, String):
+                    stack.append(const.string.value)
+                else:
+                    stack.append(const.value)
+            elif ins.mnemonic.startswith('dconst'):
+                stack.append(float(ins.mnemonic[-1]))
+            elif ins in ('bipush', 'sipush'):
+                stack.append(ins.operands[0].value)
+            elif ins == 'aconst_null':
+                stack.append(None)
+            elif ins in ('anewarray', 'newarray'):
+                length = stack.pop()
+                stack.append([None] * length)
+            elif ins in ('aaload', 'iaload'):
+                index = stack.pop()
+                array = stack.pop()
+                prop = array[index].copy()
+                prop['array_index'] = index
+                stack.append(prop)
+            elif ins in ('aastore', 'iastore'):
+                value = stack.pop()
+                index = stack.pop()
+                array = stack.pop()
+                array[index] = value
+            elif ins == 'arraylength':
+                array = stack.pop()
+                stack.append(len(array))
+            elif ins == 'dup':
+                stack.append(stack[-1])
+            elif ins == 'invokedynamic':
+                # Try to get the class that's being created
+                const = ins.operands[0]
+                desc = method_descriptor(const.name_and_type.descriptor.value)
+                stack.append({'dynamic_class': desc.returns.name, 'class': cls})
+            elif ins.mnemonic.startswith('invoke'):
+                const = ins.operands[0]
+                desc = method_descriptor(const.name_and_type.descriptor.value)
+                num_args = len(desc.args)
+                args = [stack.pop() for _ in range(num_args)]
+                args.reverse()
+
+                if ins == 'invokestatic':
+                    obj = None
+                else:
+                    obj = stack.pop()
+
+                if desc.returns.name in self.property_types:
+                    prop = {
+                        'class': desc.returns.name,
+                        'type': self.property_types[desc.returns.name],
+                        'args': args,
+                    }
+                    stack.append(prop)
+                elif const.name_and_type.name == '<init>':
+                    if obj['is_enum']:
+                        obj['enum_name'] = args[0]
+                        obj['enum_ordinal'] = args[1]
+                    else:
+                        obj['args'] = args
+                elif const.name_and_type.name == 'values':
+                    # Enum values
+                    fields = self.find_field(const.class_.name.value, None)
+                    stack.append(
+                        [
+                            fld
+                            for fld in fields
+                            if isinstance(fld, dict) and fld['is_enum']
+                        ]
+                    )
+                elif desc.returns.name != 'void':
+                    if isinstance(obj, Plane):
+                        # One special case, where EnumFacing.Plane is used
+                        # to get a list of directions
+                        stack.append(obj.directions)
+                    elif (
+                        isinstance(obj, dict)
+                        and obj['is_enum']
+                        and desc.returns.name == 'int'
+                    ):
+                        # Assume it's the enum ordinal, even if it really
+                        # isn't
+                        stack.append(obj['enum_ordinal'])
+                    else:
+                        o = object()
+                        stack.append(o)
+            elif ins in ('istore', 'lstore', 'fstore', 'dstore', 'astore'):
+                # Store other than array store
+                locals[ins.operands[0].value] = stack.pop()
+            elif ins in ('iload', 'lload', 'fload', 'dload', 'aload'):
+                # Load other than array load
+                stack.append(locals[ins.operands[0].value])
+            elif ins == 'new':
+                const = ins.operands[0]
+                type_name = const.name.value
+                obj = {'class': type_name, 'is_enum': self.is_enum(type_name)}
+                stack.append(obj)
+            elif ins == 'checkcast':
+                # We don't have type information, so no checking or casting
+                pass
+            elif ins == 'return':
+                break
+            elif ins == 'if_icmpge':
+                # Code in stairs that loops over state combinations for hitboxes
+                break
+            elif ins == 'iadd':
+                # used for skulls - we don't care about the result in practice
+                stack.append({'add': [stack.pop(), stack.pop()]})
+            else:
+                logging.debug(f'{cls} initializer contains unimplemented ins {ins}')
+
+        if field_name is not None:
+            return self.fields_by_class[cls][field_name]
+        else:
+            return self.fields_by_class[cls]
+
+    def class_fields(self, cls):
+        """
+        Resolves the fields of `cls`, returning them, or None for classes that
+        aren't read.  None is also returned if they couldn't all be resolved,
+        so that the caller resolves them itself (and hits the same error)
+        instead of using only some of them.
+        """
+        try:
+            self.find_field(cls, None)
+        except Exception:
+            logging.debug(
+                f'Failed to resolve the fields of {cls}; leaving them unresolved'
+            )
+            if logging.root.isEnabledFor(logging.DEBUG):
+                traceback.print_exc()
+            return None
+        return self.fields_by_class.get(cls)
+
+
+# The BlockStateExtractor of the current worker process, kept between jobs so
+# that classes shared by many blocks are only read once per worker
+_WORKER_EXTRACTOR: Optional[BlockStateExtractor] = None
+
+
+def _worker_extractor(settings):
+    global _WORKER_EXTRACTOR
+    if _WORKER_EXTRACTOR is None or _WORKER_EXTRACTOR.settings != settings:
+        _WORKER_EXTRACTOR = BlockStateExtractor(parallel.WORKER_CLASSLOADER, settings)
+    return _WORKER_EXTRACTOR
+
+
+def _properties_shard(settings, classes):
+    """Runs part 1 for a shard of block classes in a worker process."""
+    extractor = _worker_extractor(settings)
+    properties = {cls: extractor.class_properties(cls) for cls in classes}
+    return properties, extractor.found_property_types
+
+
+def _fields_shard(settings, property_types, classes):
+    """Runs part 2 for a shard of classes in a worker process."""
+    extractor = _worker_extractor(settings)
+    extractor.property_types = property_types
+    fields = {}
+    for cls in classes:
+        found = extractor.class_fields(cls)
+        if found is not None:
+            fields[cls] = found
+    return fields
+
+
+def _run_shards(pool, function, args, classes):
+    """
+    Splits `classes` into shards for `function` and yields the results of
+    each shard in order.
+    """
+    futures = [
+        pool.submit(function, *args, shard)
+        for _, shard in parallel.shards(classes, parallel.JOBS * 4)
+    ]
+    for future in futures:
+        yield future.result()
+
+
+def _property_field_classes(properties_by_class):
+    """Returns the classes that the fields of every property are read from."""
+    classes = {}
+    for properties in properties_by_class.values():
+        for property in properties:
+            if isinstance(property, dict):
+                classes[property['field_class']] = None
+            elif isinstance(property, list):
+                for real_property in property:
+                    classes[real_property['field_class']] = None
+    return list(classes)
+
+
 class BlockStateTopping(Topping):
-    """Gets tile entity (block entity) types."""
+    """Gets the block states of each block."""
 
     PROVIDES = ['blocks.states']
 
@@ -52,7 +892,6 @@ class BlockStateTopping(Topping):
 
         blockstatecontainer = aggregate['classes']['blockstatecontainer']
         block_cf = classloader[aggregate['classes']['block.superclass']]
-        plane = aggregate['classes']['enumfacing.plane']
 
         # Part 1: build up a list of property fields, by class.  Also build a set of property types.
         # 18w19a and above use a builder to register states; before that they just directly returned a container.
@@ -68,769 +907,73 @@ class BlockStateTopping(Topping):
                 returns='L' + blockstatecontainer + ';', args='', f=is_protected
             )
 
-        def matches(other_method):
-            return (
-                other_method.name.value == base_method.name.value
-                and other_method.descriptor.value == base_method.descriptor.value
+        settings = Settings(
+            blockstatecontainer,
+            aggregate['classes']['block.superclass'],
+            base_method.name.value,
+            base_method.descriptor.value,
+            is_18w19a,
+            aggregate['classes']['enumfacing.plane'],
+            aggregate['classes'].get('sounds.list'),
+        )
+        extractor = BlockStateExtractor(classloader, settings)
+
+        # Each block class is handled separately, in worker processes if
+        # parallel.JOBS allows it.  Results are merged in block order, so the
+        # output is the same either way.
+        block_classes = list(
+            dict.fromkeys(
+                block['class'] for block in six.itervalues(aggregate['blocks']['block'])
             )
-
-        _property_types = set()
-        # Properties that are used by each block class
-        properties_by_class = {}
-
-        def process_superclass_invokespecial(name):
-            """
-            glow_lichen, sculk_vein, and cave_vines all call the superclass's
-            block state registration method with an invokespecial instruction,
-            and then add their own states. cave_vines can just call it directly,
-            but glow_lichen and sculk_vein have complicated logic involving
-            a Map of properties, which is easier to manually handle.
-
-            Returns a tuple containing a copy of the properties (which the
-            caller can safely mutate) and a tuple of (method_descriptor, name)
-            for a function (useDirection) that the caller needs to verify does
-            not exist in the calling class (that tuple is None for cave_vines,
-            in which case no checking is needed).
-            """
-
-            cf = classloader[name]
-            method = cf.methods.find_one(f=matches)
-            assert method is not None
-
-            for ins in method.code.disassemble():
-                if ins == 'astore' and ins.operands[0].value == 2:
-                    # This instruction (astore_2) only appears in glow_lichen
-                    # and sculk_vein (and not in cave_vines).
-                    break
-            else:
-                # This is cave_vines, so we can just use the normal logic.
-                return (list(process_class(name)), None)
-
-            # The code in question looks like this:
-            """
-            private static final Map<EnumFacing, BoolProperty> PROPERTY_BY_FACING = MultidirectionalBlock.PROPERTY_BY_FACING;
-            protected static final EnumFacing[] ENUMFACING_VALUES = EnumFacing.values();
-            protected boolean useDirection(EnumFacing dir) {
-                return true;  // this code assumes nothing overrides this function
-            }
-            @Override
-            public void registerStates(BlockStateContainer container) {
-                for (EnumFacing dir : ENUMFACING_VALUES) {
-                    if (useDirection(dir)) {
-                        container.register(getProperty(dir));
-                    }
-                }
-            }
-            public static BoolProperty getProperty(EnumFacing dir) {
-                return PROPERTY_BY_FACING.get(dir);
-            }
-            """
-            # where getProperty is the call we find below.
-            # MultidirectionalBlock is NOT a parent of these multiface blocks
-            # (glow_lichen/sculk_vein) but is a parent of chorus plant.
-            # useDirection fortunately is unused in all actual implementations.
-
-            for ins in method.code.disassemble():
-                if ins == 'invokestatic':
-                    const = ins.operands[0]
-                    desc = method_descriptor(const.name_and_type.descriptor.value)
-                    method2 = cf.methods.find_one(
-                        name=const.name_and_type.name, args=desc.args_descriptor
-                    )
-                    enumfacing = method2.args[0].name
-                    break
-            else:
-                raise Exception('Failed to find invokestatic instruction')
-
-            # Note: the invokevirtual comes before the invokestatic, but we want to know
-            # what enumfacing is to verify that method_that_should_not_exist is correct.
-            for ins in method.code.disassemble():
-                if ins == 'invokevirtual':
-                    const = ins.operands[0]
-                    method_that_should_not_exist_desc = method_descriptor(
-                        const.name_and_type.descriptor.value
-                    )
-                    method_that_should_not_exist_name = const.name_and_type.name.value
-                    assert method_that_should_not_exist_desc.returns.name == 'boolean'
-                    assert len(method_that_should_not_exist_desc.args) == 1
-                    assert method_that_should_not_exist_desc.args[0].name == enumfacing
-                    break
-            else:
-                raise Exception('Failed to find invokevirtual instruction')
-
-            for ins2 in method2.code.disassemble():
-                if ins2 == 'getstatic':
-                    const2 = ins2.operands[0]
-                    assert const2.class_.name == name
-                    property_by_facing_field = cf.fields.find_one(
-                        name=const2.name_and_type.name.value
-                    )
-                    assert property_by_facing_field is not None
-                    break
-            else:
-                raise Exception('Failed to find getstatic instruction')
-
-            method3 = cf.methods.find_one(name='<clinit>')
-            source_ins = None
-            for ins3 in method3.code.disassemble():
-                if ins3 == 'getstatic':
-                    source_ins = ins3
-                elif ins3 == 'putstatic':
-                    if (
-                        ins3.operands[0].name_and_type.name
-                        == property_by_facing_field.name
-                    ):
-                        assert source_ins is not None
-                        # Note: using source_ins, not ins3, here
-                        multidirectional_cf = classloader[
-                            source_ins.operands[0].class_.name.value
-                        ]
-                        real_property_by_facing_field = (
-                            multidirectional_cf.fields.find_one(
-                                name=source_ins.operands[0].name_and_type.name.value
-                            )
-                        )
-                        assert real_property_by_facing_field is not None
-                        break
-            else:
-                raise Exception(
-                    'Failed to find putfield corresponding to '
-                    + property_by_facing_field.name.value
-                )
-
-            # Now we need to deal with a lambda...
-            """
-            public static final Map<EnumFacing, BoolProperty> PROPERTY_BY_FACING =
-                    ImutableMap.copyOf(Util.make(Maps.newEnumMap(EnumFacing.class),
-                            (map) -> {
-                                    map.put(EnumFacing.NORTH, NORTH);
-                                    map.put(EnumFacing.EAST, EAST);
-                                    map.put(EnumFacing.SOUTH, SOUTH);
-                                    map.put(EnumFacing.WEST, WEST);
-                                    map.put(EnumFacing.UP, UP);
-                                    map.put(EnumFacing.DOWN, DOWN);
-                            }));
-            """
-            method4 = multidirectional_cf.methods.find_one(name='<clinit>')
-            next_is_lambda = False
-            for ins4 in method4.code.disassemble():
-                if ins4 == 'invokestatic':
-                    if ins4.operands[0].name_and_type.name == 'newEnumMap':
-                        next_is_lambda = True
-                elif next_is_lambda:
-                    info = InvokeDynamicInfo.create(ins4, multidirectional_cf)
-                    assert info.ref_kind == REF_invokeStatic
-                    assert info.method_class == multidirectional_cf.this.name
-                    lambda_method = multidirectional_cf.methods.find_one(
-                        name=info.method_name,
-                        args=info.method_desc.args_descriptor,
-                        returns=info.method_desc.returns_descriptor,
-                    )
-                    assert lambda_method is not None
-                    break
+        )
+        pool = parallel.worker_pool(classloader)
+        with pool if pool is not None else nullcontext():
+            properties_by_class = {}
+            _property_types = set()
+            if pool is None:
+                for cls in block_classes:
+                    properties_by_class[cls] = extractor.class_properties(cls)
+                _property_types = extractor.found_property_types
             else:
-                raise Exception('Failed to find lambda')
-
-            property_by_facing = {}
-            stack5 = []
-            for ins5 in lambda_method.code.disassemble():
-                if ins5 == 'getstatic':
-                    const5 = ins5.operands[0]
-                    prop = {
-                        'field_name': const5.name_and_type.name.value,
-                        'field_class': const5.class_.name.value,
-                    }
-                    stack5.append(prop)
-                elif ins5 == 'invokevirtual':
-                    value = stack5.pop()
-                    key = stack5.pop()['field_name']
-                    property_by_facing[key] = value
-
-            enumfacing_members = get_enum_constants(classloader[enumfacing])
-            assert len(property_by_facing) == len(enumfacing_members)
-            properties = []
-            for facing in enumfacing_members.values():
-                properties.append(property_by_facing[facing['field']])
-            return properties, (
-                method_that_should_not_exist_desc,
-                method_that_should_not_exist_name,
-            )
-
-        def process_class(name):
-            """
-            Gets the properties for the given block class, checking the parent
-            class if none are defined.  Returns the properties, and also adds
-            them to properties_by_class
-            """
-            if name in properties_by_class:
-                # Caching - avoid reading the same class multiple times
-                return properties_by_class[name]
-
-            cf = classloader[name]
-            method = cf.methods.find_one(f=matches)
-
-            if not method:
-                properties = process_class(cf.super_.name.value)
-                properties_by_class[name] = properties
-                return properties
-
-            properties = None
-            if_pos = None
-            stack = []
-
-            for ins in method.code.disassemble():
-                # This could _almost_ just be checking for getstatic, but
-                # brewing stands use an array of properties as the field,
-                # so we need some stupid extra logic.
-                if ins == 'new':
-                    assert not is_18w19a  # In 18w19a this should be a parameter
-                    const = ins.operands[0]
-                    type_name = const.name.value
-                    assert type_name == blockstatecontainer
-                    stack.append(object())
-                elif ins == 'aload' and ins.operands[0].value == 1:
-                    assert is_18w19a  # The parameter is only used in 18w19a and above
-                    stack.append(object())
-                elif ins in ('sipush', 'bipush'):
-                    stack.append(ins.operands[0].value)
-                elif ins in ('anewarray', 'newarray'):
-                    length = stack.pop()
-                    val = [None] * length
-                    stack.append(val)
-                elif ins == 'getstatic':
-                    const = ins.operands[0]
-                    desc = field_descriptor(const.name_and_type.descriptor.value)
-                    if desc.name == 'java/util/List':
-                        # Special-casing for chiseled bookshelves in 22w46a,
-                        # which use a list for slot_0_occupied through slot_5_occupied.
-                        # This code is very brittle and hacky.
-                        init = cf.methods.find_one(name='<clinit>')
-                        stack2 = []
-                        for ins2 in init.code.disassemble():
-                            # return appears too, but we break before it
-                            assert ins2 in ('getstatic', 'invokestatic', 'putstatic')
-                            if ins2 == 'getstatic':
-                                const2 = ins2.operands[0]
-                                prop = {
-                                    'field_name': const2.name_and_type.name.value,
-                                    'field_class': const2.class_.name.value,
-                                }
-                                desc2 = field_descriptor(
-                                    const2.name_and_type.descriptor.value
-                                )
-                                _property_types.add(desc2.name)
-                                stack2.append(prop)
-                            elif ins2 == 'invokestatic':
-                                assert ins2.operands[0].class_.name == 'java/util/List'
-                                assert ins2.operands[0].name_and_type.name == 'of'
-                                assert (
-                                    ins2.operands[0].name_and_type.descriptor
-                                    == '(Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;Ljava/lang/Object;)Ljava/util/List;'
-                                )
-                                # Put the last 6 items onto the stack as an array
-                                # (this should be equivalent to stack2 = [stack2] in practice)
-                                stack2 = stack2[:-6] + [stack2[-6:]]
-                            elif ins2 == 'putstatic':
-                                # We should be storing to the same field as the one we're searching for
-                                assert ins2.operands[0] == const
-                                # So, we can treat this as handling the original getfield.
-                                stack.append(stack2.pop())
-                                break
-                        else:
-                            raise Exception(
-                                'Failed to hackily find list for getfield ins '
-                                + str(ins)
-                            )
-                    else:
-                        # The normal path for everything else
-                        prop = {
-                            'field_name': const.name_and_type.name.value,
-                            'field_class': const.class_.name.value,
-                        }
-                        if desc.dimensions == 0:
-                            # Dimensions are nonzero for brewing stands and glow_lichen/sculk_vein
-                            # The latter two use EnumFacing, which is a problem since that's not a
-                            # property. We could add the one for brewing stands, but it's already
-                            # been added by other blocks.
-                            _property_types.add(desc.name)
-                        stack.append(prop)
-                elif ins == 'aaload':
-                    index = stack.pop()
-                    array = stack.pop()
-                    prop = array.copy()
-                    prop['array_index'] = index
-                    stack.append(prop)
-                elif ins == 'aastore':
-                    value = stack.pop()
-                    index = stack.pop()
-                    array = stack.pop()
-                    array[index] = value
-                elif ins == 'dup':
-                    stack.append(stack[-1])
-                elif ins == 'invokespecial':
-                    const = ins.operands[0]
-                    desc = method_descriptor(const.name_and_type.descriptor.value)
-                    if const.name_and_type.name == '<init>':
-                        # This constructor call is only used in 1.12 and earlier; it isn't used in 1.13.
-                        assert not is_18w19a
-                        assert len(desc.args) == 2
-
-                        # Normally this constructor call would return nothing, but
-                        # in this case we'd rather remove the object it's called on
-                        # and keep the properties array (its parameter)
-                        arg = stack.pop()
-                        stack.pop()  # Block
-                        stack.pop()  # Invocation target
-                        stack.append(arg)
-                    else:
-                        # glow_lichen, sculk_vein, and cave_vines all call the superclass's
-                        # block state registration method
-                        assert const.class_.name == cf.super_.name
-                        assert const.name_and_type.name.value == base_method.name.value
-                        assert (
-                            const.name_and_type.descriptor.value
-                            == base_method.descriptor.value
-                        )
-                        assert properties is None
-                        properties, method_that_should_not_exist = (
-                            process_superclass_invokespecial(cf.super_.name.value)
-                        )
-
-                        if method_that_should_not_exist is not None:
-                            (
-                                method_that_should_not_exist_desc,
-                                method_that_should_not_exist_name,
-                            ) = method_that_should_not_exist
-                            assert (
-                                cf.methods.find_one(
-                                    name=method_that_should_not_exist_name,
-                                    args=method_that_should_not_exist_desc.args_descriptor,
-                                    returns=method_that_should_not_exist_desc.returns_descriptor,
-                                )
-                                is None
-                            )
-
-                        assert is_18w19a
-                        stack.pop()  # blockstatecontainer instance
-                        stack.pop()  # this
-                elif ins == 'invokevirtual':
-                    # Two possibilities (both only present pre-flattening):
-                    # 1. It's isDouble() for a slab.  Two different sets of
-                    #    properties in that case.
-                    # 2. It's getTypeProperty() for flowers.  Only one
-                    #    set of properties, but other hacking is needed.
-                    # We can differentiate these cases based off of the return
-                    # type.
-                    # There is a third option post 18w19a:
-                    # 3. It's calling the state container's register method.
-                    # We can check this just by the type.
-                    const = ins.operands[0]
-                    desc = method_descriptor(const.name_and_type.descriptor.value)
-
-                    if const.class_.name == blockstatecontainer:
-                        # Case 3.
-                        # Note that the register method actually adds multiple
-                        # states. The only block that calls it multiple times
-                        # is Chain in 1.16.2-pre1+ though, with everything else
-                        # using only 1 varargs call.  (There also are no calls
-                        # to the superclass' register states method.)
-                        if properties is None:
-                            properties = stack.pop()
-                        else:
-                            properties.extend(stack.pop())
-                        assert desc.returns.name == blockstatecontainer
-                        # Don't pop anything, since we'd just pop and re-add the builder
-                    elif desc.returns.name == 'boolean':
-                        # Case 2.
-                        properties = [None, None]
-                        stack.pop()  # Target object
-                        # XXX shouldn't something be returned here?
-                    else:
-                        # Case 1.
-                        # Assume that the return type is the base interface
-                        # for properties
-                        stack.pop()  # Target object
-                        stack.append(None)
-                elif ins == 'ifeq':
-                    assert if_pos is None
-                    if_pos = ins.pos + ins.operands[0].value
-                elif ins == 'pop':
-                    stack.pop()
-                elif ins == 'areturn':
-                    assert not is_18w19a  # In 18w19a we don't return a container
-                    if if_pos is None:
-                        assert properties is None
-                        properties = stack.pop()
-                    else:
-                        assert isinstance(properties, list)
-                        index = 0 if ins.pos < if_pos else 1
-                        assert properties[index] is None
-                        properties[index] = stack.pop()
-                elif ins == 'return':
-                    assert is_18w19a  # We only return void in 18w19a
-                elif ins == 'aload':
-                    assert ins.operands[0].value == 0  # Should be aload_0 (this)
-                    stack.append(object())
-                elif ins == 'invokestatic':
-                    # Added in 22w46a: the chiseled bookshelf uses a list to store
-                    # slot_0_occupied through slot_5_occupied, and also checks that the
-                    # object block states are being registered to is non-null for some reason
-                    # (_after_ already using it? This seems to be automatic for lambdas, I guess?)
-                    assert ins.operands[0].class_.name == 'java/util/Objects'
-                    assert ins.operands[0].name_and_type.name == 'requireNonNull'
-                    assert (
-                        ins.operands[0].name_and_type.descriptor
-                        == '(Ljava/lang/Object;)Ljava/lang/Object;'
-                    )
-                    # requireNonNull just returns its parameter, so we don't need to do anything
-                elif ins == 'invokedynamic':
-                    # As implied above, this is used in 22w46a for chiseled bookshelves,
-                    # as something like this:
-                    """
-                    void registerStates(BlockStateContainer instance) {
-                        instance.register(BlockStates.LAST_INTERACTION_BOOK_SLOT)
-                                .register(BlockAbstractBookshelf.FACING);
-                        // compiler-generated for instance::register some reason, and like this and
-                        // not making use of requireNonNull's return value.
-                        Objects.requireNonNull(instance);
-                        BlockChiseledBookshelf.SLOT_OCCUPIED.forEach(instance::register);
-                    }
-                    """
-                    # We can just ignore this and assume any invokedynamic is for this purpose.
-                    desc = method_descriptor(
-                        ins.operands[0].name_and_type.descriptor.value
-                    )
-                    assert ins.operands[0].name_and_type.name == 'accept'
-                    assert desc.returns.name == 'java/util/function/Consumer'
-                elif ins == 'invokeinterface':
-                    # This is the forEach in 22w46a for chiseled bookshelves.
-                    assert ins.operands[0].class_.name == 'java/util/List'
-                    assert ins.operands[0].name_and_type.name == 'forEach'
-                    assert (
-                        ins.operands[0].name_and_type.descriptor
-                        == '(Ljava/util/function/Consumer;)V'
-                    )
-                    stack.pop()  # removing the consumer argument
-                    properties.extend(stack.pop())  # And this is the field.
+                for properties, types in _run_shards(
+                    pool, _properties_shard, (settings,), block_classes
+                ):
+                    properties_by_class.update(properties)
+                    _property_types |= types
+
+            assert len(_property_types) == 5
+            property_types = {}
+            for type in _property_types:
+                cf = classloader[type]
+
+                attribute = cf.attributes.find_one(name='Signature')
+                signature = attribute.signature.value
+                # Somewhat ugly behavior until an actual parser is added for these
+                if 'Enum' in signature:
+                    property_types[type] = 'enum'
+                elif 'Integer' in signature:
+                    property_types[type] = 'int'
+                elif 'Boolean' in signature:
+                    property_types[type] = 'bool'
                 else:
                     logging.debug(
-                        f'{name} createBlockState contains unimplemented ins {ins}'
-                    )
-
-            if properties is None:
-                # If we never set properties, warn; however, this is normal for
-                # the base implementation in Block in 18w19a
-                if name != aggregate['classes']['block.superclass']:
-                    logging.debug(
-                        f"Didn't find anything that set properties for {name}"
+                        f'Unknown property type {type} with signature {signature}'
                     )
-                properties = []
-            properties_by_class[name] = properties
-            return properties
-
-        for block in six.itervalues(aggregate['blocks']['block']):
-            cls = block['class']
-            try:
-                process_class(cls)
-            except Exception:
-                logging.debug(
-                    'Failed to process properties for %s (for %s)'
-                    % (cls, block['text_id'])
-                )
-                if logging.root.isEnabledFor(logging.DEBUG):
-                    traceback.print_exc()
-                properties_by_class[cls] = []
-
-        assert len(_property_types) == 5
-        property_types = {}
-        for type in _property_types:
-            cf = classloader[type]
-
-            attribute = cf.attributes.find_one(name='Signature')
-            signature = attribute.signature.value
-            # Somewhat ugly behavior until an actual parser is added for these
-            if 'Enum' in signature:
-                property_types[type] = 'enum'
-            elif 'Integer' in signature:
-                property_types[type] = 'int'
-            elif 'Boolean' in signature:
-                property_types[type] = 'bool'
-            else:
-                logging.debug(
-                    f'Unknown property type {type} with signature {signature}'
-                )
-                property_types[type] = 'direction'
-
-        # Part 2: figure out what each field is.
-        is_enum_cache = {}
-
-        def is_enum(cls):
-            """
-            Checks if the given class is an enum.
-            This needs to be recursive due to inner classes for enums.
-            """
-            if cls in is_enum_cache:
-                return is_enum_cache[cls]
-            if cls not in classloader:
-                is_enum_cache[cls] = False
-                return False
-
-            cf = classloader[cls]
-            super = cf.super_.name.value
-            if super == 'java/lang/Enum':
-                is_enum_cache[cls] = True
-            elif super == 'java/lang/Object':
-                is_enum_cache[cls] = False
-            else:
-                is_enum_cache[cls] = is_enum(super)
-
-            return is_enum_cache[cls]
-
-        fields_by_class = {}
-
-        def find_field(cls, field_name):
-            """
-            This function exists to deal with a javac quirk: static fields in superclasses
-            are treated as if they were static fields in the current class. This also
-            applies to invokestatic, but it's particularly weird for fields. For example:
-
-            ```java
-            interface Iface {
-                public static final Object FOO = "foo";  // Note: Object to prevent inlining
-            }
-            class Parent implements Iface {
-                public static final Object BAR = "bar";
-            }
-            class Child extends Parent implements Iface {
-                public static void test() {
-                    System.out.println(FOO);  // getstatic uses Child.FOO
-                    System.out.println(Iface.FOO);  // uses Iface.FOO
-                    System.out.println(Parent.FOO);  // uses Parent.FOO
-                    System.out.println(Child.FOO);  // uses Child.FOO
-                    System.out.println(BAR);  // uses Child.BAR
-                    System.out.println(Parent.BAR);  // uses Parent.BAR
-                    System.out.println(Child.BAR);  // uses Child.BAR
-                }
-            }
-            ```
-
-            As a practical example:
-
-            ```java
-            public class Block { /* ... */ }
-            public abstract class BlockHorizontal extends Block {
-                public static final Property FACING = Properties.FACING;
-                // ... also supports mirroring and rotating ...
-            }
-            public class BlockCocoaBeans {
-                public static final Property AGE = Properties.AGE_0_TO_2;
-                @Override
-                void registerProperties(BlockStateContainer container) {
-                    container.register(FACING, AGE);
-                    // looks the same bytecode-wise as:
-                    // container.register(BlockCocoaBeans.FACING, BlockCocoaBeans.AGE);
-                }
-            }
-            ```
-
-            99% of blocks register without using a specific class name, and thus use getstatic
-            on the current class. The exceptions are infested deepslate, which uses the same
-            AXIS field used by regular deepslate (and other pillar-like blocks) but does not
-            directly inherit the same class, and the chiseled bookshelf in 22w46a+ which uses
-            a list that contains direct references to the class containing all block state
-            properties without re-declaring them in its own class.
-
-            cls: name of the class
-            field_name: name of the field to find.  If None, returns all fields
-            """
-            if cls in fields_by_class:
-                if field_name is not None:
-                    if field_name not in fields_by_class[cls]:
-                        logging.debug(
-                            f"Requested field {cls}.{field_name} but that wasn't found last time"
-                        )
-                    return fields_by_class[cls][field_name]
-                else:
-                    return fields_by_class[cls]
-            elif cls == aggregate['classes'].get('sounds.list'):
-                # If we already know what the sounds list class is, just ignore it
-                # as going through it would take a while for no reason
-                return object()
-
-            cf = classloader[cls]
-
-            fields_by_class[cls] = {}
-            super_name = cf.super_.name.value
-            if not super_name.startswith('java/'):
-                # Add fields from superclass
-                fields_by_class[cls].update(find_field(super_name, None))
-            for iface in cf.interfaces:
-                # Relevant for cave vines (glowberries), which have separate blocks for cave_vines
-                # and cave_vines_plant, but the berries property is declared in a shared interface.
-                iface_name = iface.name.value
-                if not iface_name.startswith('java/') and not iface_name.startswith(
-                    'com/google/'
+                    property_types[type] = 'direction'
+            extractor.property_types = property_types
+
+            # Part 2: figure out what each field is.  Fields that aren't
+            # resolved here (such as the constants of enum properties) are
+            # resolved as part 3 needs them.
+            if pool is not None:
+                for fields in _run_shards(
+                    pool,
+                    _fields_shard,
+                    (settings, property_types),
+                    _property_field_classes(properties_by_class),
                 ):
-                    fields_by_class[cls].update(find_field(iface_name, None))
-
-            init = cf.methods.find_one(name='<clinit>')
-            if not init:
-                if field_name is not None:
-                    return fields_by_class[cls][field_name]
-                else:
-                    return fields_by_class[cls]
-
-            stack = []
-            locals = {}
-
-            for ins in init.code.disassemble():
-                if ins == 'putstatic':
-                    const = ins.operands[0]
-                    name = const.name_and_type.name.value
-                    value = stack.pop()
-
-                    if isinstance(value, dict) and 'class' in value:
-                        if 'declared_in' not in value:
-                            # If there's already a declared_in, this is a field
-                            # loaded with getstatic, and we don't want to change
-                            # the true location of it
-                            value['declared_in'] = cls
-                        if value['class'] == plane:
-                            # Convert to an instance of Plane
-                            # Now is the easiest time to do this, and for
-                            # Plane itself it doesn't matter since it's never
-                            # used on the stack
-                            assert 'enum_name' in value
-                            assert value['enum_name'] in PLANES
-                            value = PLANES[value['enum_name']]
-                    fields_by_class[cls][name] = value
-                elif ins == 'getstatic':
-                    const = ins.operands[0]
-                    target = const.class_.name.value
-                    name = const.name_and_type.name.value
-                    if not target.startswith('java/'):
-                        stack.append(find_field(target, name))
-                    else:
-                        stack.append(object())
-                elif ins in ('ldc', 'ldc_w', 'ldc2_w'):
-                    const = ins.operands[0]
-
-                    if isinstance(const, ConstantClass):
-                        stack.append('%s.class' % const.name.value)
-                    elif isinstance(const, String):
-                        stack.append(const.string.value)
-                    else:
-                        stack.append(const.value)
-                elif ins.mnemonic.startswith('dconst'):
-                    stack.append(float(ins.mnemonic[-1]))
-                elif ins in ('bipush', 'sipush'):
-                    stack.append(ins.operands[0].value)
-                elif ins == 'aconst_null':
-                    stack.append(None)
-                elif ins in ('anewarray', 'newarray'):
-                    length = stack.pop()
-                    stack.append([None] * length)
-                elif ins in ('aaload', 'iaload'):
-                    index = stack.pop()
-                    array = stack.pop()
-                    prop = array[index].copy()
-                    prop['array_index'] = index
-                    stack.append(prop)
-                elif ins in ('aastore', 'iastore'):
-                    value = stack.pop()
-                    index = stack.pop()
-                    array = stack.pop()
-                    array[index] = value
-                elif ins == 'arraylength':
-                    array = stack.pop()
-                    stack.append(len(array))
-                elif ins == 'dup':
-                    stack.append(stack[-1])
-                elif ins == 'invokedynamic':
-                    # Try to get the class that's being created
-                    const = ins.operands[0]
-                    desc = method_descriptor(const.name_and_type.descriptor.value)
-                    stack.append({'dynamic_class': desc.returns.name, 'class': cls})
-                elif ins.mnemonic.startswith('invoke'):
-                    const = ins.operands[0]
-                    desc = method_descriptor(const.name_and_type.descriptor.value)
-                    num_args = len(desc.args)
-                    args = [stack.pop() for _ in range(num_args)]
-                    args.reverse()
-
-                    if ins == 'invokestatic':
-                        obj = None
-                    else:
-                        obj = stack.pop()
-
-                    if desc.returns.name in property_types:
-                        prop = {
-                            'class': desc.returns.name,
-                            'type': property_types[desc.returns.name],
-                            'args': args,
-                        }
-                        stack.append(prop)
-                    elif const.name_and_type.name == '<init>':
-                        if obj['is_enum']:
-                            obj['enum_name'] = args[0]
-                            obj['enum_ordinal'] = args[1]
-                        else:
-                            obj['args'] = args
-                    elif const.name_and_type.name == 'values':
-                        # Enum values
-                        fields = find_field(const.class_.name.value, None)
-                        stack.append(
-                            [
-                                fld
-                                for fld in fields
-                                if isinstance(fld, dict) and fld['is_enum']
-                            ]
-                        )
-                    elif desc.returns.name != 'void':
-                        if isinstance(obj, Plane):
-                            # One special case, where EnumFacing.Plane is used
-                            # to get a list of directions
-                            stack.append(obj.directions)
-                        elif (
-                            isinstance(obj, dict)
-                            and obj['is_enum']
-                            and desc.returns.name == 'int'
-                        ):
-                            # Assume it's the enum ordinal, even if it really
-                            # isn't
-                            stack.append(obj['enum_ordinal'])
-                        else:
-                            o = object()
-                            stack.append(o)
-                elif ins in ('istore', 'lstore', 'fstore', 'dstore', 'astore'):
-                    # Store other than array store
-                    locals[ins.operands[0].value] = stack.pop()
-                elif ins in ('iload', 'lload', 'fload', 'dload', 'aload'):
-                    # Load other than array load
-                    stack.append(locals[ins.operands[0].value])
-                elif ins == 'new':
-                    const = ins.operands[0]
-                    type_name = const.name.value
-                    obj = {'class': type_name, 'is_enum': is_enum(type_name)}
-                    stack.append(obj)
-                elif ins == 'checkcast':
-                    # We don't have type information, so no checking or casting
-                    pass
-                elif ins == 'return':
-                    break
-                elif ins == 'if_icmpge':
-                    # Code in stairs that loops over state combinations for hitboxes
-                    break
-                elif ins == 'iadd':
-                    # used for skulls - we don't care about the result in practice
-                    stack.append({'add': [stack.pop(), stack.pop()]})
-                else:
-                    logging.debug(f'{cls} initializer contains unimplemented ins {ins}')
-
-            if field_name is not None:
-                return fields_by_class[cls][field_name]
-            else:
-                return fields_by_class[cls]
+                    for cls, found in fields.items():
+                        extractor.fields_by_class.setdefault(cls, found)
 
         # Part 3: convert those fields into actual well-formed properties.
         # Property handlers.
@@ -890,7 +1033,7 @@ class BlockStateTopping(Topping):
             if len(args) == 2:
                 values = [
                     c['enum_name']
-                    for c in six.itervalues(find_field(class_name, None))
+                    for c in six.itervalues(extractor.find_field(class_name, None))
                     if isinstance(c, dict) and c['is_enum']
                 ]
             elif isinstance(args[2], list):
@@ -917,7 +1060,7 @@ class BlockStateTopping(Topping):
                     # Will be trimmed later
                     values = [
                         c['enum_name']
-                        for c in six.itervalues(find_field(class_name, None))
+                        for c in six.itervalues(extractor.find_field(class_name, None))
                         if isinstance(c, dict) and c['is_enum']
                     ]
                 else:
@@ -992,7 +1135,7 @@ class BlockStateTopping(Topping):
             field_name = property['field_name']
             field_class = property['field_class']
             try:
-                field = find_field(field_class, field_name)
+                field = extractor.find_field(field_class, field_name)
                 if 'array_index' in property:
                     field = field[property['array_index']]
                 property['field'] = field
@@ -1093,11 +1236,14 @@ class BlockStateTopping(Topping):
                         'golden_rail',
                         'detector_rail',
                     ):
-                        predicate = lambda v: v not in (
-                            'NORTH_EAST',
-                            'NORTH_WEST',
-                            'SOUTH_EAST',
-                            'SOUTH_WEST',
+                        predicate = lambda v: (
+                            v
+                            not in (
+                                'NORTH_EAST',
+                                'NORTH_WEST',
+                                'SOUTH_EAST',
+                                'SOUTH_WEST',
+                            )
                         )
                     elif (
                         prop['field']['declared_in']
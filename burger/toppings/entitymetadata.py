@@ -6,6 +6,7 @@ from jawa.cf import ClassFile
 from jawa.classloader import ClassLoader
 from jawa.constants import ConstantClass, String
 
+from burger.opcodes import Pattern
 from burger.util import (
     InvokeDynamicInfo,
     LambdaInvokeDynamicInfo,
@@ -16,6 +17,23 @@ from burger.util import (
 
 from .topping import Topping
 
+# The start of `boolean getFlag(int)`, which looks something like this:
+# `return ((Byte)this.R.a(bo) & var1) != 0;`
+GET_FLAG_PATTERN = Pattern(
+    'aload',
+    'getfield',
+    'getstatic',
+    'invokevirtual',
+    'checkcast',
+    'invokevirtual',
+    'iload',
+    'iand',
+    'ifeq',
+    'bipush',
+    'goto',
+    ('bipush', lambda ins: ins.operands[0].value == 0),
+)
+
 
 class EntityMetadataTopping(Topping):
     PROVIDES = ['entities.metadata']
@@ -350,33 +368,9 @@ class EntityMetadataTopping(Topping):
 
             # find if the class has a `boolean getFlag(int)` method
             for method in cf.methods.find(args='I', returns='Z'):
-                previous_operators = []
-                for ins in method.code.disassemble():
-                    if ins.mnemonic == 'bipush':
-                        # check for a series of operators that looks something like this
-                        # `return ((Byte)this.R.a(bo) & var1) != 0;`
-                        operator_matcher = [
-                            'aload',
-                            'getfield',
-                            'getstatic',
-                            'invokevirtual',
-                            'checkcast',
-                            'invokevirtual',
-                            'iload',
-                            'iand',
-                            'ifeq',
-                            'bipush',
-                            'goto',
-                        ]
-                        previous_operators_match = (
-                            previous_operators == operator_matcher
-                        )
-
-                        if previous_operators_match and ins.operands[0].value == 0:
-                            # store the method name as the result for later
-                            get_flag_method = method.name.value
-
-                    previous_operators.append(ins.mnemonic)
+                if GET_FLAG_PATTERN.match(method):
+                    # store the method name as the result for later
+                    get_flag_method = method.name.value
 
             bitfields = []
 
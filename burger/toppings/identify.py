@@ -3,6 +3,7 @@ import logging
 from jawa.classloader import ClassLoader
 from jawa.constants import ConstantClass, String
 
+from burger import demand, incremental, parallel, scheduler
 from burger.mappings import MAPPINGS
 
 from .topping import Topping
@@ -86,6 +87,88 @@ IGNORE_DUPLICATES = [
 ]
 
 
+# Keys that are filled in from another key when they aren't found, since the
+# registration class is also the list class in some versions
+FILLED_IN = {
+    'sounds.list': 'sounds.event',
+    'block.list': 'block.register',
+    'item.list': 'item.register',
+    'biome.list': 'biome.register',
+}
+
+# The deobfuscated names of the classes that identify() recognizes as each
+# key, which lets most keys be found through the mappings without scanning the
+# jar.  Each candidate is still checked with identify(), which for particle
+# returns a different class than the one checked.  Keys missing here only
+# existed in versions older than the mappings, are filled in from other keys,
+# or are in IGNORE_DUPLICATES: those keep the first match in jar order, which
+# only a scan can tell.  Anything not found here is scanned for.
+KNOWN_CLASSES = (
+    ('anvilchunkloader', ['net.minecraft.server.level.ChunkMap']),
+    ('block.list', ['net.minecraft.world.level.block.Blocks']),
+    ('block.references', ['net.minecraft.references.Blocks']),
+    (
+        'blockstatecontainer',
+        [
+            'net.minecraft.world.level.block.state.StateDefinition$Builder',
+            'net.minecraft.world.level.block.state.StateDefinition',
+        ],
+    ),
+    ('chatcomponent', ['net.minecraft.network.chat.Component']),
+    ('entity.list', ['net.minecraft.world.entity.EntityType']),
+    ('entity.trackerentry', ['net.minecraft.server.level.ServerEntity']),
+    ('enumfacing.plane', ['net.minecraft.core.Direction$Plane']),
+    (
+        'identifier',
+        [
+            'net.minecraft.resources.Identifier',
+            'net.minecraft.resources.ResourceLocation',
+        ],
+    ),
+    ('idmap', ['net.minecraft.core.IdMap']),
+    ('item.list', ['net.minecraft.world.item.Items']),
+    ('item.references', ['net.minecraft.references.Items']),
+    ('itemstack', ['net.minecraft.world.item.ItemStack']),
+    ('nbtcompound', ['net.minecraft.nbt.CompoundTag']),
+    (
+        'nethandler.handshake',
+        ['net.minecraft.server.network.ServerHandshakePacketListenerImpl'],
+    ),
+    (
+        'nethandler.server',
+        ['net.minecraft.server.network.ServerGamePacketListenerImpl'],
+    ),
+    ('packet.connectionstate', ['net.minecraft.network.ConnectionProtocol']),
+    (
+        'packet.list.common',
+        ['net.minecraft.network.protocol.common.CommonPacketTypes'],
+    ),
+    (
+        'packet.list.cookie',
+        ['net.minecraft.network.protocol.cookie.CookiePacketTypes'],
+    ),
+    ('packet.list.game', ['net.minecraft.network.protocol.game.GamePacketTypes']),
+    (
+        'packet.list.handshake',
+        ['net.minecraft.network.protocol.handshake.HandshakePacketTypes'],
+    ),
+    ('packet.list.login', ['net.minecraft.network.protocol.login.LoginPacketTypes']),
+    ('packet.list.ping', ['net.minecraft.network.protocol.ping.PingPacketTypes']),
+    (
+        'packet.list.status',
+        ['net.minecraft.network.protocol.status.StatusPacketTypes'],
+    ),
+    ('particle', ['net.minecraft.commands.arguments.ParticleArgument']),
+    ('position', ['net.minecraft.core.BlockPos']),
+    ('resourcekey', ['net.minecraft.resources.ResourceKey']),
+    ('sounds.event', ['net.minecraft.sounds.SoundEvents']),
+    (
+        'tileentity.superclass',
+        ['net.minecraft.world.level.block.entity.BlockEntity'],
+    ),
+)
+
+
 def check_match(value, match_list):
     exact = False
     if isinstance(match_list, tuple):
@@ -118,222 +201,350 @@ def identify(classloader: ClassLoader, path):
         return 'chatcomponent', path
 
     possible_match = None
-    for c in classloader.search_constant_pool(path=path, type_=(String, ConstantClass)):
-        if isinstance(c, String):
-            value = c.string.value
-
-            for match_list, match_name in MATCHES:
-                if check_match(value, match_list):
-                    class_file = classloader[path]
-                    return match_name, class_file.this.name.value
-
-            for match_list, match_name in MAYBE_MATCHES:
-                if check_match(value, match_list):
-                    class_file = classloader[path]
-                    possible_match = (match_name, class_file.this.name.value)
-                    # Continue searching through the other constants in the class
-
-            if value == 'ambient.cave':
-                # This is found in both the sounds list class and sounds event class.
-                # However, the sounds list class also has a constant specific to it.
-                # Note that this method will not work in 1.8, but the list class doesn't exist then either.
+    for value in classloader.strings(path):
+        for match_list, match_name in MATCHES:
+            if check_match(value, match_list):
                 class_file = classloader[path]
+                return match_name, class_file.this.name.value
 
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == 'Accessed Sounds before Bootstrap!':
-                        return 'sounds.list', class_file.this.name.value
-                else:
-                    return 'sounds.event', class_file.this.name.value
-
-            if value == 'piston_head':
-                # piston_head is a technical block, which is important as that means it has no item form.
-                # This constant is found in both the block list class and the class containing block registrations.
+        for match_list, match_name in MAYBE_MATCHES:
+            if check_match(value, match_list):
                 class_file = classloader[path]
+                possible_match = (match_name, class_file.this.name.value)
+                # Continue searching through the other constants in the class
+
+        if value == 'ambient.cave':
+            # This is found in both the sounds list class and sounds event class.
+            # However, the sounds list class also has a constant specific to it.
+            # Note that this method will not work in 1.8, but the list class doesn't exist then either.
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == 'Accessed Sounds before Bootstrap!':
+                    return 'sounds.list', class_file.this.name.value
+            else:
+                return 'sounds.event', class_file.this.name.value
+
+        if value == 'piston_head':
+            # piston_head is a technical block, which is important as that means it has no item form.
+            # This constant is found in both the block list class and the class containing block registrations.
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == 'doTileDrops':
+                    # not in the list, only in registry
+                    return 'block.register', class_file.this.name.value
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == 'Tesselating block in world':
+                    # Rendering code, which we don't care about
+                    return
+            for c2 in class_file.constants.find(type_=ConstantClass):
+                if c2.name == 'com/mojang/serialization/MapCodec':
+                    # In 23w40a (1.20.3), a BlockTypes class was added that handles the codec for blocks,
+                    # which duplicates all of the block identifier strings. As a pretty awful
+                    # heuristic, ignore classes that reference the codec. Note that the codec
+                    # system isn't obfuscated.
+                    return
+            return 'block.list', class_file.this.name.value
+
+        if value == 'diamond_pickaxe':
+            # Similarly, diamond_pickaxe is only an item.  This exists in 3 classes, though:
+            # - The actual item registration code
+            # - The item list class
+            # - The item renderer class (until 1.13), which we don't care about
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == 'textures/misc/enchanted_item_glint.png':
+                    # Item renderer, which we don't care about
+                    return
+
+                if c2 == 'CB3F55D3-645C-4F38-A497-9C13A33DB5CF':
+                    # Item registry always contains this uuid for
+                    # "BASE_ATTACK_DAMAGE_UUID"
+                    return 'item.register', class_file.this.name.value
+            else:
+                return 'item.list', class_file.this.name.value
+
+        if value == 'attached_pumpkin_stem':
+            # 23w40a (1.20.3) adds a references/Blocks class with entries that look like:
+            # public static final ResourceKey<Block> ATTACHED_PUMPKIN_STEM = createKey("attached_pumpkin_stem");
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                # make sure it's not the normal block list class
+                if c2 == 'air':
+                    return
+
+            return 'block.references', class_file.this.name.value
+
+        if value == 'pumpkin_seeds':
+            # the items list is similar, but with items instead of blocks:
+            # public static final ResourceKey<Item> PUMPKIN_SEEDS = createKey("pumpkin_seeds");
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                # again, this is to make sure it's not the normal item list class
+
+                # note that this might break in the future if the "diamond_pickaxe" string is moved
+                # to the references class
+                if c2 == 'diamond_pickaxe':
+                    return
+
+            return 'item.references', class_file.this.name.value
+
+        if value in ('Ice Plains', 'mutated_ice_flats', 'ice_spikes'):
+            # Finally, biomes. There's several different names that were used for this one biome
+            # Only classes are the list class and the one with registration. Note that the list didn't exist in 1.8.
+            class_file = classloader[path]
+
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == 'Accessed Biomes before Bootstrap!':
+                    return 'biome.list', class_file.this.name.value
+            else:
+                return 'biome.register', class_file.this.name.value
+
+        if value == 'minecraft':
+            class_file = classloader[path]
+
+            # Look for two protected/private final strings
+            def is_protected_final_or_private_final(m):
+                # 22w42a/1.19.3+ makes it private instead of protected
+                return (
+                    m.access_flags.acc_protected or m.access_flags.acc_private
+                ) and m.access_flags.acc_final
+
+            find_args = {
+                'type_': 'Ljava/lang/String;',
+                'f': is_protected_final_or_private_final,
+            }
+            fields = class_file.fields.find(**find_args)
+
+            if len(list(fields)) == 2:
+                return 'identifier', class_file.this.name.value
+
+        if value == 'The two directions cannot be on the same axis':
+            cf = classloader[path]
+            if cf:
+                return 'position', cf.this.name.value
+
+        if value == 'Getting block state':
+            # This message is found in Chunk, in the method getBlockState.
+            # We could also theoretically identify BlockPos from this method,
+            # but currently identify only allows marking one class at a time.
+            class_file = classloader[path]
+
+            for method in class_file.methods:
+                for ins in method.code.disassemble():
+                    if ins.mnemonic in ('ldc', 'ldc_w'):
+                        if ins.operands[0] == 'Getting block state':
+                            return 'blockstate', method.returns.name
+            else:
+                logging.debug(
+                    f"Found chunk as {path}, but didn't find the method that returns blockstate"
+                )
+
+        if value == 'particle.notFound':
+            # This is in ParticleArgument, which is used for commands and
+            # implements brigadier's ArgumentType<IParticleData>.
+            class_file = classloader[path]
 
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == 'doTileDrops':
-                        # not in the list, only in registry
-                        return 'block.register', class_file.this.name.value
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == 'Tesselating block in world':
-                        # Rendering code, which we don't care about
-                        return
-                for c2 in class_file.constants.find(type_=ConstantClass):
-                    if c2.name == 'com/mojang/serialization/MapCodec':
-                        # In 23w40a (1.20.3), a BlockTypes class was added that handles the codec for blocks,
-                        # which duplicates all of the block identifier strings. As a pretty awful
-                        # heuristic, ignore classes that reference the codec. Note that the codec
-                        # system isn't obfuscated.
-                        return
-                return 'block.list', class_file.this.name.value
-
-            if value == 'diamond_pickaxe':
-                # Similarly, diamond_pickaxe is only an item.  This exists in 3 classes, though:
-                # - The actual item registration code
-                # - The item list class
-                # - The item renderer class (until 1.13), which we don't care about
-                class_file = classloader[path]
+            if (
+                len(class_file.interfaces) == 1
+                and class_file.interfaces[0].name
+                == 'com/mojang/brigadier/arguments/ArgumentType'
+            ):
+                sig = class_file.attributes.find_one(name='Signature').signature.value
+                inner_type = sig[sig.index('<') + 1 : sig.rindex('>')][1:-1]
+                return 'particle', inner_type
+            else:
+                logging.debug(
+                    f"Found ParticleArgument as {path}, but it didn't implement the expected interface"
+                )
+
+        if value == 'HORIZONTAL':
+            # In 22w43a, there is a second enum with HORIZONTAL and VERTICAL as members (used in UI
+            # code), not just enumfacing.plane. They can be differentiated by the constructors.
+            # This constructor was added in 1.13.
+            # Prior to 1.13, the string "Someone's been tampering with the universe!" indicates
+            # enumfacing.plane. After, it instead indicates the x/y/z axis. So, if we don't find
+            # a matching constructor, check for that string constant instead. That string constant
+            # was removed entirely in 1.18 (it existed in 1.17). I'm not sure of which specific
+            # snapshots this was changed in.
+            class_file = classloader[path]
+
+            def is_enumfacing_plane_constructor(m):
+                # We're looking for EnumFacing$Plane(EnumFacing[], EnumFacing$Axis[]).
+                # Java synthetically adds parameters for enum name and ordinal, so that constructor
+                # has 4 parameters, with the last 2 being arrays.
+                return (
+                    len(m.args) == 4
+                    and m.args[2].dimensions == 1
+                    and m.args[3].dimensions == 1
+                )
 
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == 'textures/misc/enchanted_item_glint.png':
-                        # Item renderer, which we don't care about
-                        return
-
-                    if c2 == 'CB3F55D3-645C-4F38-A497-9C13A33DB5CF':
-                        # Item registry always contains this uuid for
-                        # "BASE_ATTACK_DAMAGE_UUID"
-                        return 'item.register', class_file.this.name.value
-                else:
-                    return 'item.list', class_file.this.name.value
-
-            if value == 'attached_pumpkin_stem':
-                # 23w40a (1.20.3) adds a references/Blocks class with entries that look like:
-                # public static final ResourceKey<Block> ATTACHED_PUMPKIN_STEM = createKey("attached_pumpkin_stem");
-                class_file = classloader[path]
+            if (
+                len(
+                    list(
+                        class_file.methods.find(
+                            name='<init>', f=is_enumfacing_plane_constructor
+                        )
+                    )
+                )
+                != 0
+            ):
+                return 'enumfacing.plane', class_file.this.name.value
+            for c2 in class_file.constants.find(type_=String):
+                if c2 == "Someone's been tampering with the universe!":
+                    return 'enumfacing.plane', class_file.this.name.value
 
-                for c2 in class_file.constants.find(type_=String):
-                    # make sure it's not the normal block list class
-                    if c2 == 'air':
-                        return
+        if (
+            'Outdated server!' in value
+            or 'multiplayer.disconnect.outdated_client' in value
+        ):
+            # 1.7.7 and 1.7.8 both have a similar message on the client nethandler, which we are not interested in
+            if 'to be 1.7.' in value:
+                continue
 
-                return 'block.references', class_file.this.name.value
+            class_file = classloader[path]
 
-            if value == 'pumpkin_seeds':
-                # the items list is similar, but with items instead of blocks:
-                # public static final ResourceKey<Item> PUMPKIN_SEEDS = createKey("pumpkin_seeds");
-                class_file = classloader[path]
+            return 'nethandler.handshake', class_file.this.name.value
 
-                for c2 in class_file.constants.find(type_=String):
-                    # again, this is to make sure it's not the normal item list class
+    # May (will usually) be None
+    return possible_match
 
-                    # note that this might break in the future if the "diamond_pickaxe" string is moved
-                    # to the references class
-                    if c2 == 'diamond_pickaxe':
-                        return
 
-                return 'item.references', class_file.this.name.value
+def demanded_keys():
+    """
+    Returns the keys that are needed by the toppings being run (see
+    burger.demand), including those that keys filled in from other keys
+    rely on.
+    """
+    keys = {
+        provide[len('identify.') :]
+        for provide in IdentifyTopping.PROVIDES
+        if demand.demanded(provide)
+    }
+    keys.update([FILLED_IN[key] for key in keys if key in FILLED_IN])
+    return keys
 
-            if value in ('Ice Plains', 'mutated_ice_flats', 'ice_spikes'):
-                # Finally, biomes. There's several different names that were used for this one biome
-                # Only classes are the list class and the one with registration. Note that the list didn't exist in 1.8.
-                class_file = classloader[path]
 
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == 'Accessed Biomes before Bootstrap!':
-                        return 'biome.list', class_file.this.name.value
-                else:
-                    return 'biome.register', class_file.this.name.value
+def known_candidates(keys):
+    """
+    Returns the deobfuscated names of the classes each of `keys` is expected
+    to be: the class found by the previous run first, if there was one, and
+    then the classes in KNOWN_CLASSES.  Keys in IGNORE_DUPLICATES are left
+    out, as only a scan can tell which class comes first in jar order.
+    """
+    candidates = {key: list(names) for key, names in KNOWN_CLASSES if key in keys}
 
-            if value == 'minecraft':
-                class_file = classloader[path]
+    previous = incremental.PREVIOUS_CLASSES or {}
+    for key, name in previous.items():
+        if key not in keys or key in IGNORE_DUPLICATES:
+            # Added by another topping, not needed, or has to be scanned for
+            continue
+        if key in FILLED_IN and name == previous.get(FILLED_IN[key]):
+            # Copied from another key rather than identified
+            continue
+        names = candidates.setdefault(key, [])
+        if name in names:
+            names.remove(name)
+        names.insert(0, name)
 
-                # Look for two protected/private final strings
-                def is_protected_final_or_private_final(m):
-                    # 22w42a/1.19.3+ makes it private instead of protected
-                    return (
-                        m.access_flags.acc_protected or m.access_flags.acc_private
-                    ) and m.access_flags.acc_final
-
-                find_args = {
-                    'type_': 'Ljava/lang/String;',
-                    'f': is_protected_final_or_private_final,
-                }
-                fields = class_file.fields.find(**find_args)
-
-                if len(list(fields)) == 2:
-                    return 'identifier', class_file.this.name.value
-
-            if value == 'The two directions cannot be on the same axis':
-                cf = classloader[path]
-                if cf:
-                    return 'position', cf.this.name.value
-
-            if value == 'Getting block state':
-                # This message is found in Chunk, in the method getBlockState.
-                # We could also theoretically identify BlockPos from this method,
-                # but currently identify only allows marking one class at a time.
-                class_file = classloader[path]
+    return candidates
 
-                for method in class_file.methods:
-                    for ins in method.code.disassemble():
-                        if ins.mnemonic in ('ldc', 'ldc_w'):
-                            if ins.operands[0] == 'Getting block state':
-                                return 'blockstate', method.returns.name
-                else:
-                    logging.debug(
-                        f"Found chunk as {path}, but didn't find the method that returns blockstate"
-                    )
 
-            if value == 'particle.notFound':
-                # This is in ParticleArgument, which is used for commands and
-                # implements brigadier's ArgumentType<IParticleData>.
-                class_file = classloader[path]
+def scan_keys(missing, known):
+    """
+    Returns the keys in `missing` that are worth scanning the jar for, and
+    the ones among those that the scan has to keep going until it finds.
+
+    Without anything found through the mappings, that's every missing key.
+    Otherwise the jar is a version the mappings cover, where the keys in
+    IGNORE_DUPLICATES still need a scan (for their first match in jar order),
+    as do KNOWN_CLASSES keys whose known classes didn't match.  The rest only
+    exist in older versions: they're taken if the scan happens to come across
+    them, unless the key they're filled in from or for (see FILLED_IN) is
+    already known.
+    """
+    if not known:
+        return set(missing), set(missing)
 
-                if (
-                    len(class_file.interfaces) == 1
-                    and class_file.interfaces[0].name
-                    == 'com/mojang/brigadier/arguments/ArgumentType'
-                ):
-                    sig = class_file.attributes.find_one(
-                        name='Signature'
-                    ).signature.value
-                    inner_type = sig[sig.index('<') + 1 : sig.rindex('>')][1:-1]
-                    return 'particle', inner_type
-                else:
-                    logging.debug(
-                        f"Found ParticleArgument as {path}, but it didn't implement the expected interface"
-                    )
+    known_keys = {key for key, _ in KNOWN_CLASSES}
+    required = {key for key in missing if key in IGNORE_DUPLICATES or key in known_keys}
+    wanted = set(required)
+    filled_in_from = {source: key for key, source in FILLED_IN.items()}
+    for key in missing:
+        partner = FILLED_IN.get(key, filled_in_from.get(key))
+        if partner not in known:
+            wanted.add(key)
+    return wanted, required
 
-            if value == 'HORIZONTAL':
-                # In 22w43a, there is a second enum with HORIZONTAL and VERTICAL as members (used in UI
-                # code), not just enumfacing.plane. They can be differentiated by the constructors.
-                # This constructor was added in 1.13.
-                # Prior to 1.13, the string "Someone's been tampering with the universe!" indicates
-                # enumfacing.plane. After, it instead indicates the x/y/z axis. So, if we don't find
-                # a matching constructor, check for that string constant instead. That string constant
-                # was removed entirely in 1.18 (it existed in 1.17). I'm not sure of which specific
-                # snapshots this was changed in.
-                class_file = classloader[path]
 
-                def is_enumfacing_plane_constructor(m):
-                    # We're looking for EnumFacing$Plane(EnumFacing[], EnumFacing$Axis[]).
-                    # Java synthetically adds parameters for enum name and ordinal, so that constructor
-                    # has 4 parameters, with the last 2 being arrays.
-                    return (
-                        len(m.args) == 4
-                        and m.args[2].dimensions == 1
-                        and m.args[3].dimensions == 1
-                    )
+def identify_known(classloader, keys):
+    """
+    Finds the classes from known_candidates() through the mappings, checking
+    each one with identify().  Returns the classes that were found, and the
+    keys that weren't (including those without any known class).
+    """
+    found = {}
+    for key, candidates in known_candidates(keys).items():
+        for deobfuscated_name in candidates:
+            if '/' in deobfuscated_name:
+                # Not obfuscated in the first place
+                path = deobfuscated_name
+            else:
+                path = MAPPINGS.obfuscate_class_name(deobfuscated_name)
+            if path is None or path not in classloader:
+                continue
+            result = identify(classloader, path)
+            if result and result[0] == key:
+                found[key] = result[1]
+                break
+    return found, sorted(keys - found.keys())
 
-                if (
-                    len(
-                        list(
-                            class_file.methods.find(
-                                name='<init>', f=is_enumfacing_plane_constructor
-                            )
-                        )
-                    )
-                    != 0
-                ):
-                    return 'enumfacing.plane', class_file.this.name.value
-                for c2 in class_file.constants.find(type_=String):
-                    if c2 == "Someone's been tampering with the universe!":
-                        return 'enumfacing.plane', class_file.this.name.value
 
-            if (
-                'Outdated server!' in value
-                or 'multiplayer.disconnect.outdated_client' in value
-            ):
-                # 1.7.7 and 1.7.8 both have a similar message on the client nethandler, which we are not interested in
-                if 'to be 1.7.' in value:
-                    continue
+def _identify_shard(paths):
+    """Identifies a shard of class paths in a worker process."""
+    classloader = parallel.WORKER_CLASSLOADER
+    results = []
+    for path in paths:
+        result = identify(classloader, path[: -len('.class')])
+        if result:
+            results.append(result)
+    return results
 
-                class_file = classloader[path]
 
-                return 'nethandler.handshake', class_file.this.name.value
+def _identify_all(classloader):
+    """
+    Yields the result of identify for every class in the jar that matched
+    something, in jar order.  Classes are identified in worker processes if
+    parallel.JOBS allows it.
+    """
+    paths = [f'{name}.class' for name in classloader.classes]
 
-    # May (will usually) be None
-    return possible_match
+    pool = parallel.worker_pool(classloader)
+    if pool is None:
+        for path in paths:
+            result = identify(classloader, path[: -len('.class')])
+            if result:
+                yield result
+        return
+
+    # More shards than workers, so that a shard full of large classes doesn't
+    # hold everything else up
+    with pool:
+        futures = [
+            pool.submit(_identify_shard, shard)
+            for _, shard in parallel.shards(paths, parallel.JOBS * 4)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Nothing after an early stop is needed
+            for future in futures:
+                future.cancel()
 
 
 class IdentifyTopping(Topping):
@@ -387,39 +598,55 @@ class IdentifyTopping(Topping):
     @staticmethod
     def act(aggregate, classloader):
         classes = aggregate.setdefault('classes', {})
-        for path in classloader.path_map.keys():
-            if not path.endswith('.class'):
-                continue
-
-            result = identify(classloader, path[: -len('.class')])
-            if result:
-                if result[0] in classes:
-                    if result[0] in IGNORE_DUPLICATES:
-                        continue
-                    raise Exception(
-                        'Already registered %(value)s to %(old_class)s! '
-                        "Can't overwrite it with %(new_class)s"
-                        % {
-                            'value': result[0],
-                            'old_class': classes[result[0]],
-                            'new_class': result[1],
-                        }
-                    )
-                classes[result[0]] = result[1]
-                if len(classes) == len(IdentifyTopping.PROVIDES):
-                    # If everything has been found, we don't need to keep
-                    # searching, so stop early for performance
-                    break
+        keys = demanded_keys()
+
+        known, missing = identify_known(classloader, keys)
+        classes.update(known)
+        # Let toppings that only need these start while the jar is scanned
+        scheduler.publish(*(f'identify.{key}' for key in known))
+        wanted, required = scan_keys(missing, known)
+        if required:
+            logging.debug(
+                f'Scanning the jar, since mappings did not find {sorted(required)}'
+            )
+            IdentifyTopping._scan(classes, wanted, required, classloader)
 
         # Add classes that might not be recognized in some versions
-        # since the registration class is also the list class
-        if 'sounds.list' not in classes and 'sounds.event' in classes:
-            classes['sounds.list'] = classes['sounds.event']
-        if 'block.list' not in classes and 'block.register' in classes:
-            classes['block.list'] = classes['block.register']
-        if 'item.list' not in classes and 'item.register' in classes:
-            classes['item.list'] = classes['item.register']
-        if 'biome.list' not in classes and 'biome.register' in classes:
-            classes['biome.list'] = classes['biome.register']
+        for key, source in FILLED_IN.items():
+            if key not in classes and source in classes:
+                classes[key] = classes[source]
 
         logging.debug(f'Identify classes: {classes}')
+
+    @staticmethod
+    def _scan(classes, wanted, required, classloader):
+        # Other toppings may add their own classes once some have been
+        # published, so keep track of what's left to find separately
+        remaining = set(required)
+
+        # Results are merged in jar order even when identified in parallel, so
+        # that duplicates and early stopping behave the same either way
+        for result in _identify_all(classloader):
+            if result[0] not in wanted:
+                # Already found through the mappings, not needed, or only in
+                # older versions
+                continue
+            if result[0] in classes:
+                if result[0] in IGNORE_DUPLICATES:
+                    continue
+                raise Exception(
+                    'Already registered %(value)s to %(old_class)s! '
+                    "Can't overwrite it with %(new_class)s"
+                    % {
+                        'value': result[0],
+                        'old_class': classes[result[0]],
+                        'new_class': result[1],
+                    }
+                )
+            classes[result[0]] = result[1]
+            scheduler.publish(f'identify.{result[0]}')
+            remaining.discard(result[0])
+            if not remaining:
+                # If everything has been found, we don't need to keep
+                # searching, so stop early for performance
+                break
@@ -3,6 +3,7 @@ import logging
 from jawa.classloader import ClassLoader
 from jawa.util.descriptor import method_descriptor
 
+from burger.statics import first_string
 from burger.util import WalkerCallback, walk_method
 
 from .topping import Topping
@@ -18,6 +19,8 @@ class ItemsTopping(Topping):
         'identify.block.list',
         'identify.item.register',
         'identify.item.list',
+        'identify.item.references',
+        'identify.resourcekey',
         'language',
         'blocks',
         'version.protocol',
@@ -52,16 +55,10 @@ class ItemsTopping(Topping):
         references_class = aggregate['classes'].get('item.references')
         references_class_fields_to_item_ids = {}
         if references_class:
-            # process the references class
-            references_cf = classloader[references_class]
-            for method in references_cf.methods.find(name='<clinit>'):
-                item_id = None
-                for ins in method.code.disassemble():
-                    if ins.mnemonic == 'ldc':
-                        item_id = ins.operands[0].string.value
-                    if ins.mnemonic == 'putstatic':
-                        field = ins.operands[0].name_and_type.name.value
-                        references_class_fields_to_item_ids[field] = item_id
+            # process the references class, whose fields are all like
+            # STONE = createKey("stone")
+            for field, value in classloader.statics.fields(references_class).items():
+                references_class_fields_to_item_ids[field] = first_string(value)
 
         # Figure out what the builder class is
         ctor = cf.methods.find_one(name='<init>')
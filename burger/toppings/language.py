@@ -2,10 +2,18 @@ import json
 import logging
 
 import six
-from jawa.classloader import ClassLoader
 
 from .topping import Topping
 
+# The language files that are read, in order, and whether they are JSON
+LANGUAGE_FILES = (
+    ('lang/stats_US.lang', False),
+    ('lang/en_US.lang', False),
+    ('assets/minecraft/lang/en_US.lang', False),
+    ('assets/minecraft/lang/en_us.lang', False),
+    ('assets/minecraft/lang/en_us.json', True),
+)
+
 
 class LanguageTopping(Topping):
     """Provides the contents of the English language files."""
@@ -17,27 +25,20 @@ class LanguageTopping(Topping):
     @staticmethod
     def act(aggregate, classloader):
         aggregate['language'] = {}
-        LanguageTopping.load_language(aggregate, classloader, 'lang/stats_US.lang')
-        LanguageTopping.load_language(aggregate, classloader, 'lang/en_US.lang')
-        LanguageTopping.load_language(
-            aggregate, classloader, 'assets/minecraft/lang/en_US.lang'
-        )
-        LanguageTopping.load_language(
-            aggregate, classloader, 'assets/minecraft/lang/en_us.lang'
-        )
-        LanguageTopping.load_language(
-            aggregate, classloader, 'assets/minecraft/lang/en_us.json', True
-        )
+        files = classloader.resources.contents(path for path, _ in LANGUAGE_FILES)
+        for path, is_json in LANGUAGE_FILES:
+            if path not in files:
+                logging.debug(f"Can't find file {path} in jar")
+                continue
+            try:
+                contents = files[path].decode('utf-8')
+            except Exception as e:
+                logging.debug(f"Can't decode file {path} in jar: {e!r}")
+                continue
+            LanguageTopping.load_language(aggregate, contents, is_json)
 
     @staticmethod
-    def load_language(aggregate, classloader: ClassLoader, path, is_json: bool = False):
-        try:
-            with classloader.open(path) as fin:
-                contents = fin.read().decode('utf-8')
-        except Exception:
-            logging.debug(f"Can't find file {path} in jar")
-            return
-
+    def load_language(aggregate, contents: str, is_json: bool = False):
         for category, name, value in LanguageTopping.parse_lang(contents, is_json):
             cat = aggregate['language'].setdefault(category, {})
             cat[name] = value
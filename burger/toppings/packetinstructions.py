@@ -10,6 +10,8 @@ from jawa.constants import UTF8, ConstantClass, Double, Float, Integer, Long, St
 from jawa.transforms import simple_swap
 from jawa.util.descriptor import field_descriptor, method_descriptor, parse_descriptor
 
+from burger import tracing
+from burger.opcodes import Pattern
 from burger.util import InvokeDynamicInfo, REF_invokeStatic, get_enum_constants
 
 from .topping import Topping
@@ -19,6 +21,29 @@ PACKETBUF_NAME = (
     'packetbuffer'  # Used to specially identify the PacketBuffer we care about
 )
 
+# A thunk that calls the same function on the ByteBuf the PacketBuffer wraps
+# (see list_thunks)
+BYTEBUF_THUNK_PATTERN = Pattern(
+    'aload',
+    (
+        'getfield',
+        lambda ins: (
+            ins.operands[0].name_and_type.descriptor.value
+            == 'Lio/netty/buffer/ByteBuf;'
+        ),
+    ),
+    '*',
+    (
+        'invokevirtual',
+        lambda ins: ins.operands[0].name_and_type.descriptor.value.endswith(
+            'Lio/netty/buffer/ByteBuf;'
+        ),
+    ),
+    'pop',
+    'aload',
+    'areturn',
+)
+
 
 class PacketInstructionsTopping(Topping):
     """Provides the instructions used to construct network packets."""
@@ -34,6 +59,7 @@ class PacketInstructionsTopping(Topping):
         'identify.idmap',
         'identify.chatcomponent',
         'identify.metadata',
+        'identify.position',
     ]
 
     TYPES = {
@@ -106,9 +132,10 @@ class PacketInstructionsTopping(Topping):
             operations = None
             try:
                 classname = packet['class'][: -len('.class')]
-                operations = _PIT.class_operations(
-                    classloader, classname, aggregate['classes'], thunks
-                )
+                with tracing.span(key, 'packet', class_name=classname):
+                    operations = _PIT.class_operations(
+                        classloader, classname, aggregate['classes'], thunks
+                    )
                 packet.update(_PIT.format(operations))
             except Exception as e:
                 if logging.root.isEnabledFor(logging.DEBUG):
@@ -165,30 +192,10 @@ class PacketInstructionsTopping(Topping):
         cf = classloader[packetbuffer_class]
         thunks = {}
         for method in cf.methods.find(returns='L' + packetbuffer_class + ';'):
-            insts = list(method.code.disassemble())
-            if len(insts) < 6:
-                continue
-            # NOTE: simple_swap transform (from classloader configuration in munch.py) changes aload_0 to aload
-            if insts[0].mnemonic != 'aload' or insts[1].mnemonic != 'getfield':
-                continue
-            if (
-                insts[-4].mnemonic != 'invokevirtual'
-                or insts[-3].mnemonic != 'pop'
-                or insts[-2].mnemonic != 'aload'
-                or insts[-1].mnemonic != 'areturn'
-            ):
-                continue
-            if (
-                insts[1].operands[0].name_and_type.descriptor.value
-                != 'Lio/netty/buffer/ByteBuf;'
-            ):
-                continue
-            if (
-                not insts[-4]
-                .operands[0]
-                .name_and_type.descriptor.value.endswith('Lio/netty/buffer/ByteBuf;')
-            ):
+            match = BYTEBUF_THUNK_PATTERN.fullmatch(method)
+            if match is None:
                 continue
+            insts = match.instructions
 
             def is_expected_load(i, inst):
                 # iload_2 becomes iload 2 due to simple_swap
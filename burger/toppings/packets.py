@@ -14,7 +14,17 @@ class PacketsTopping(Topping):
 
     PROVIDES = ['packets.ids', 'packets.classes', 'packets.directions']
 
-    DEPENDS = ['identify.packet.connectionstate', 'identify.packet.packetbuffer']
+    DEPENDS = [
+        'identify.packet.connectionstate',
+        'identify.packet.packetbuffer',
+        'identify.packet.list.handshake',
+        'identify.packet.list.status',
+        'identify.packet.list.login',
+        'identify.packet.list.cookie',
+        'identify.packet.list.common',
+        'identify.packet.list.ping',
+        'identify.packet.list.game',
+    ]
 
     @staticmethod
     def act(aggregate, classloader: ClassLoader):
@@ -0,0 +1,37 @@
+from jawa.classloader import ClassLoader
+
+from .topping import Topping
+
+
+def _ingredients(recipe):
+    """Yields the name of every item a recipe uses, once each."""
+    if recipe['type'] == 'shape':
+        items = recipe['raw']['subs'].values()
+    else:
+        items = recipe['ingredients']
+    names = {}
+    for item in items:
+        if isinstance(item, dict) and 'name' in item:
+            names[item['name']] = None
+    yield from names
+
+
+class RecipeIndexTopping(Topping):
+    """Provides the recipes that use and make each item"""
+
+    PROVIDES = ['recipes.index']
+    DEPENDS = ['recipes']
+
+    @staticmethod
+    def act(aggregate, classloader: ClassLoader):
+        # Recipes are referred to as [item, index], meaning
+        # recipes[item][index] (where item is what the recipe makes)
+        consumes = {}
+        produces = {}
+        for makes, recipes in aggregate['recipes'].items():
+            for index, recipe in enumerate(recipes):
+                produces.setdefault(makes, []).append([makes, index])
+                for name in _ingredients(recipe):
+                    consumes.setdefault(name, []).append([makes, index])
+
+        aggregate['recipe_index'] = {'consumes': consumes, 'produces': produces}
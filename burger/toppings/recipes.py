@@ -1,5 +1,4 @@
 import copy
-import json
 import logging
 
 import six
@@ -17,6 +16,7 @@ class RecipesTopping(Topping):
         'identify.recipe.superclass',
         'identify.block.list',
         'identify.item.list',
+        'identify.itemstack',
         'blocks',
         'items',
         'tags',
@@ -48,6 +48,9 @@ class RecipesTopping(Topping):
         logging.debug('Extracting recipes from JSON')
 
         recipes = []
+        # Tag name -> its values as parsed items, which every recipe that uses
+        # the tag gets its own copy of
+        tag_items = {}
 
         def parse_item(blob, allow_lists=True):
             """
@@ -62,13 +65,15 @@ class RecipesTopping(Topping):
                     raise Exception('A list of items is not allowed in this context')
             elif 'tag' in blob:
                 if allow_lists:
-                    res = []
                     tag = blob['tag']
                     if tag.startswith('minecraft:'):
                         tag = tag[len('minecraft:') :]
-                    for id in aggregate['tags']['items/' + tag]['values']:
-                        res.append(parse_item({'item': id}))
-                    return res
+                    if tag not in tag_items:
+                        tag_items[tag] = [
+                            parse_item({'item': id})
+                            for id in aggregate['tags']['items/' + tag]['values']
+                        ]
+                    return [item.copy() for item in tag_items[tag]]
                 else:
                     raise Exception('A tag is not allowed in this context')
             # There's some wierd stuff regarding 0 or 32767 here; I'm not worrying about it though
@@ -94,104 +99,90 @@ class RecipesTopping(Topping):
 
             return result
 
-        for name in classloader.path_map.keys():
-            if name.startswith(prefix) and name.endswith('.json'):
-                recipe_id = 'minecraft:' + name[len(prefix) : -len('.json')]
-                try:
-                    with classloader.open(name) as fin:
-                        data = json.load(fin)
-
-                    assert 'type' in data
-                    recipe_type = data['type']
-                    if recipe_type.startswith('minecraft:'):
-                        recipe_type = recipe_type[len('minecraft:') :]
-
-                    if recipe_type not in ('crafting_shaped', 'crafting_shapeless'):
-                        # We only care about regular recipes, not furnace/loom/whatever ones.
-                        continue
-
-                    recipe = {}
-                    recipe['id'] = recipe_id  # new for 1.12, but used ingame
-
-                    if 'group' in data:
-                        recipe['group'] = data['group']
-
-                    assert 'result' in data
-                    recipe['makes'] = parse_item(data['result'], False)
-                    if 'count' not in recipe['makes']:
-                        recipe['makes']['count'] = (
-                            1  # default, TODO should we keep specifying this?
-                        )
+        for name, data in classloader.resources.json(prefix).items():
+            recipe_id = 'minecraft:' + name[len(prefix) : -len('.json')]
+            try:
+                assert 'type' in data
+                recipe_type = data['type']
+                if recipe_type.startswith('minecraft:'):
+                    recipe_type = recipe_type[len('minecraft:') :]
+
+                if recipe_type not in ('crafting_shaped', 'crafting_shapeless'):
+                    # We only care about regular recipes, not furnace/loom/whatever ones.
+                    continue
+
+                recipe = {}
+                recipe['id'] = recipe_id  # new for 1.12, but used ingame
+
+                if 'group' in data:
+                    recipe['group'] = data['group']
+
+                assert 'result' in data
+                recipe['makes'] = parse_item(data['result'], False)
+                if 'count' not in recipe['makes']:
+                    recipe['makes']['count'] = (
+                        1  # default, TODO should we keep specifying this?
+                    )
+
+                matching_recipes = [recipe]
+
+                if recipe_type == 'crafting_shapeless':
+                    recipe['type'] = 'shapeless'
+
+                    assert 'ingredients' in data
+
+                    recipe['ingredients'] = []
+                    for ingredient in data['ingredients']:
+                        item = parse_item(ingredient)
+                        if isinstance(item, list):
+                            tmp = []
+                            for recipe_choice in matching_recipes:
+                                for real_item in item:
+                                    recipe_choice_work = copy.deepcopy(recipe_choice)
+                                    recipe_choice_work['ingredients'].append(real_item)
+                                    tmp.append(recipe_choice_work)
+                            matching_recipes = tmp
+                        else:
+                            for recipe_choice in matching_recipes:
+                                recipe_choice['ingredients'].append(item)
+                elif recipe_type == 'crafting_shaped':
+                    recipe['type'] = 'shape'
+
+                    assert 'pattern' in data
+                    assert 'key' in data
+
+                    pattern = data['pattern']
+                    recipe['raw'] = {'rows': pattern, 'subs': {}}
+                    for id, value in six.iteritems(data['key']):
+                        item = parse_item(value)
+                        if isinstance(item, list):
+                            tmp = []
+                            for recipe_choice in matching_recipes:
+                                for real_item in item:
+                                    recipe_choice_work = copy.deepcopy(recipe_choice)
+                                    recipe_choice_work['raw']['subs'][id] = real_item
+                                    tmp.append(recipe_choice_work)
+                            matching_recipes = tmp
+                        else:
+                            for recipe_choice in matching_recipes:
+                                recipe_choice['raw']['subs'][id] = item
+
+                    for recipe_choice in matching_recipes:
+                        shape = []
+                        for row in recipe_choice['raw']['rows']:
+                            shape_row = []
+                            for char in row:
+                                if not char.isspace():
+                                    shape_row.append(recipe_choice['raw']['subs'][char])
+                                else:
+                                    shape_row.append(None)
+                            shape.append(shape_row)
+                        recipe_choice['shape'] = shape
 
-                    matching_recipes = [recipe]
-
-                    if recipe_type == 'crafting_shapeless':
-                        recipe['type'] = 'shapeless'
-
-                        assert 'ingredients' in data
-
-                        recipe['ingredients'] = []
-                        for ingredient in data['ingredients']:
-                            item = parse_item(ingredient)
-                            if isinstance(item, list):
-                                tmp = []
-                                for recipe_choice in matching_recipes:
-                                    for real_item in item:
-                                        recipe_choice_work = copy.deepcopy(
-                                            recipe_choice
-                                        )
-                                        recipe_choice_work['ingredients'].append(
-                                            real_item
-                                        )
-                                        tmp.append(recipe_choice_work)
-                                matching_recipes = tmp
-                            else:
-                                for recipe_choice in matching_recipes:
-                                    recipe_choice['ingredients'].append(item)
-                    elif recipe_type == 'crafting_shaped':
-                        recipe['type'] = 'shape'
-
-                        assert 'pattern' in data
-                        assert 'key' in data
-
-                        pattern = data['pattern']
-                        recipe['raw'] = {'rows': pattern, 'subs': {}}
-                        for id, value in six.iteritems(data['key']):
-                            item = parse_item(value)
-                            if isinstance(item, list):
-                                tmp = []
-                                for recipe_choice in matching_recipes:
-                                    for real_item in item:
-                                        recipe_choice_work = copy.deepcopy(
-                                            recipe_choice
-                                        )
-                                        recipe_choice_work['raw']['subs'][id] = (
-                                            real_item
-                                        )
-                                        tmp.append(recipe_choice_work)
-                                matching_recipes = tmp
-                            else:
-                                for recipe_choice in matching_recipes:
-                                    recipe_choice['raw']['subs'][id] = item
-
-                        for recipe_choice in matching_recipes:
-                            shape = []
-                            for row in recipe_choice['raw']['rows']:
-                                shape_row = []
-                                for char in row:
-                                    if not char.isspace():
-                                        shape_row.append(
-                                            recipe_choice['raw']['subs'][char]
-                                        )
-                                    else:
-                                        shape_row.append(None)
-                                shape.append(shape_row)
-                            recipe_choice['shape'] = shape
-
-                    recipes.extend(matching_recipes)
-                except Exception as e:
-                    logging.warning(f'Failed to parse {recipe_id}: {e}')
-                    raise e
+                recipes.extend(matching_recipes)
+            except Exception as e:
+                logging.warning(f'Failed to parse {recipe_id}: {e}')
+                raise e
 
         return recipes
 
@@ -211,9 +202,11 @@ class RecipesTopping(Topping):
         # This method's second parameter is an array of objects.
         setters = list(
             cf.methods.find(
-                f=lambda m: len(m.args) == 2
-                and m.args[1].dimensions == 1
-                and m.args[1].name == 'java/lang/Object'
+                f=lambda m: (
+                    len(m.args) == 2
+                    and m.args[1].dimensions == 1
+                    and m.args[1].name == 'java/lang/Object'
+                )
             )
         )
 
@@ -6,6 +6,7 @@ import urllib.request
 import six
 
 from burger import website
+from burger.statics import first_string
 
 from .topping import Topping
 
@@ -121,19 +122,10 @@ class SoundTopping(Topping):
 
         # Get fields now
         soundlist = aggregate['classes']['sounds.list']
-        lcf = classloader[soundlist]
-
-        method = lcf.methods.find_one(name='<clinit>')
-        for ins in method.code.disassemble():
-            if ins in ('ldc', 'ldc_w'):
-                const = ins.operands[0]
-                sound_name = const.string.value
-            elif ins == 'putstatic':
-                if (
-                    sound_name is None
-                    or sound_name == 'Accessed Sounds before Bootstrap!'
-                ):
-                    continue
-                const = ins.operands[0]
-                field = const.name_and_type.name.value
-                sounds[sound_name]['field'] = field
+        for field, value in classloader.statics.fields(soundlist).items():
+            sound_name = first_string(value)
+            if sound_name not in sounds:
+                # Not set to a sound, such as the message thrown when sounds
+                # are accessed before bootstrap
+                continue
+            sounds[sound_name]['field'] = field
@@ -0,0 +1,23 @@
+from jawa.classloader import ClassLoader
+
+from burger.tagindex import registry_ids, tag_ids
+
+from .topping import Topping
+
+
+class TagIdsTopping(Topping):
+    """Provides the registry ids of the blocks, items and entities in each tag"""
+
+    PROVIDES = ['tags.ids']
+    DEPENDS = ['tags', 'blocks', 'items', 'entities.entity']
+
+    @staticmethod
+    def act(aggregate, classloader: ClassLoader):
+        # Kept out of the tags section, so that selecting only tags doesn't
+        # need every registry
+        registries = registry_ids(aggregate)
+        ids = aggregate.setdefault('tag_ids', {})
+        for name, tag in aggregate['tags'].items():
+            registry = registries.get(tag['type'])
+            if registry is not None:
+                ids[name] = tag_ids(tag, registry)
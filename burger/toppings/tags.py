@@ -1,4 +1,3 @@
-import json
 import logging
 
 from jawa.classloader import ClassLoader
@@ -17,19 +16,17 @@ class TagsTopping(Topping):
         tags = aggregate.setdefault('tags', {})
         prefix = 'data/minecraft/tags/'
         suffix = '.json'
-        for path in classloader.path_map:
-            if not path.startswith(prefix) or not path.endswith(suffix):
-                continue
+        for path, data in classloader.resources.json(prefix, suffix).items():
             key = path[len(prefix) : -len(suffix)]
             idx = key.find('/')
             type, name = key[:idx], key[idx + 1 :]
-            with classloader.open(path) as fin:
-                data = json.load(fin)
             data['type'] = type
             data['name'] = name
             tags[key] = data
 
-        # Tags can reference other tags -- flatten that out.
+        # Tags can reference other tags -- flatten that out.  Each tag is
+        # flattened once, and values it gets from several places (such as two
+        # tags that share a tag) are only kept the first time.
         flattening = set()
         flattened = set()
 
@@ -46,7 +43,7 @@ class TagsTopping(Topping):
 
             tag = tags[name]
             values = tag['values']
-            new_values = []
+            new_values = {}
             for entry in values:
                 if entry.startswith('#'):
                     assert entry.startswith('#minecraft:')
@@ -56,10 +53,12 @@ class TagsTopping(Topping):
                     if 'worldgen' in referenced_tag_name:
                         continue
                     flatten_tag(referenced_tag_name)
-                    new_values.extend(tags[referenced_tag_name]['values'])
+                    new_values.update(
+                        dict.fromkeys(tags[referenced_tag_name]['values'])
+                    )
                 else:
-                    new_values.append(entry)
-            tag['values'] = new_values
+                    new_values[entry] = None
+            tag['values'] = list(new_values)
 
             flattening.discard(name)
             flattened.add(name)
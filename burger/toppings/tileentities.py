@@ -25,6 +25,8 @@ class TileEntityTopping(Topping):
     DEPENDS = [
         'identify.tileentity.superclass',
         'identify.block.superclass',
+        'identify.nbtcompound',
+        'identify.nethandler.client',
         'packets.classes',
         'blocks',
     ]
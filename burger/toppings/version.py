@@ -21,7 +21,11 @@ class VersionTopping(Topping):
         'version.netty_rewrite',
     ]
 
-    DEPENDS = ['identify.nethandler.handshake', 'identify.anvilchunkloader']
+    DEPENDS = [
+        'identify.nethandler.handshake',
+        'identify.nethandler.client',
+        'identify.anvilchunkloader',
+    ]
 
     @staticmethod
     def act(aggregate, classloader: ClassLoader):
@@ -92,7 +96,7 @@ class VersionTopping(Topping):
             # If it's a server-specific file, we can just look for any netty class
             # Any version prior to 15w51a (93) is guaranteed to have their dependencies shaded directly on the jar file
             aggregate['version']['netty_rewrite'] = (
-                'io/netty/buffer/ByteBuf' in classloader.classes
+                'io/netty/buffer/ByteBuf' in classloader
             )
         elif 'nethandler.client' in aggregate['classes']:
             # If it's anything else, it's likely to be the client, and have the client nethandler available
@@ -109,26 +113,15 @@ class VersionTopping(Topping):
 
     @staticmethod
     def get_distribution(classloader: ClassLoader):
-        found_client = False
-        found_server = False
-
-        for class_name in classloader.classes:
-            if class_name == 'net/minecraft/server/MinecraftServer':
-                # Since 12w17a, the codebases have been merged, and the client has both client and server related information
-                # If we find the server startup class, we need to keep looking for the possibility of finding the client one too
-                found_server = True
-            elif (
-                class_name == 'net/minecraft/client/Minecraft'
-                or class_name == 'net/minecraft/client/main/Main'
-            ):
-                # If we happen to find the client startup class, it's guaranteed to be the client distribution, so we can stop looking
-                found_client = True
-                break
-
-        # Since both client/server can possibly have the server startup class, the client class check takes precendence
-        if found_client:
+        # Since 12w17a, the codebases have been merged, and the client has both
+        # client and server related information.  So the client startup class
+        # takes precedence over the server one.
+        if (
+            'net/minecraft/client/Minecraft' in classloader
+            or 'net/minecraft/client/main/Main' in classloader
+        ):
             return 'client'
-        elif found_server:
+        elif 'net/minecraft/server/MinecraftServer' in classloader:
             return 'server'
         else:
             # This SHOULD never happen
@@ -176,10 +169,7 @@ class VersionTopping(Topping):
                                     # Older versions don't specify the name on the disconnect message
                                     # We can get it from the server startup messages
                                     for class_name in classloader.classes:
-                                        for const in classloader.search_constant_pool(
-                                            path=class_name, type_=String
-                                        ):
-                                            value = const.string.value
+                                        for value in classloader.strings(class_name):
                                             if (
                                                 'Starting integrated minecraft server version '
                                                 in value
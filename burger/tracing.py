@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+TRACER: Optional['Tracer'] = None
+
+
+def set_global_tracer(tracer):
+    global TRACER
+    TRACER = tracer
+
+
+def span(name: str, category: str, **args):
+    """
+    Returns a context manager recording a span with the global tracer, or a
+    no-op context manager if tracing isn't enabled.
+    """
+    if TRACER is None:
+        return nullcontext()
+    return TRACER.span(name, category, **args)
+
+
+class Tracer:
+    """
+    Collects spans and writes them in the Chrome trace-event format, which
+    can be opened in Perfetto or chrome://tracing.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _now():
+        # Trace events use microseconds
+        return time.perf_counter_ns() / 1000
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        start = self._now()
+        try:
+            yield
+        finally:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start,
+                'dur': self._now() - start,
+                'pid': self.pid,
+                'tid': threading.get_ident(),
+            }
+            if args:
+                event['args'] = args
+            with self._lock:
+                self.events.append(event)
+
+    def write(self, path: str):
+        thread_names = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': self.pid,
+                'tid': thread.ident,
+                'args': {'name': thread.name},
+            }
+            for thread in threading.enumerate()
+        ]
+        with open(path, 'w') as fout:
+            json.dump(
+                {
+                    'traceEvents': thread_names + self.events,
+                    'displayTimeUnit': 'ms',
+                },
+                fout,
+            )
@@ -0,0 +1,310 @@
+import copy
+import threading
+from collections.abc import MutableMapping, MutableSequence
+
+
+class Transaction:
+    """
+    Keeps the changes a topping makes to the aggregate to itself until they
+    are committed, so that they can simply be dropped if it fails, and other
+    toppings running at the same time never see them.
+
+    Toppings are given the aggregate through wrap(), and every dict and list
+    reached through it is wrapped as well.  The first change to a dict or list
+    in the aggregate makes a shallow copy of it, which that change and every
+    later read through the wrapper go to instead.  Committing writes the keys
+    that were changed back into the aggregate, appends to lists what was
+    appended to their copies (after anything appended in the meantime), and
+    replaces lists that were changed in any other way.  Rolling back only
+    forgets the copies.  Both cost as much as the changes did, no matter how
+    large the aggregate is.
+
+    Dicts and lists the topping creates itself aren't copied, since nothing
+    else can see them until the one they were stored in is committed.
+
+    Other transactions may commit to the aggregate from other threads.  That
+    only happens while holding `lock`, which is also held while copying from
+    the aggregate (including to iterate over it), so that nothing changes
+    partway through.
+
+    The wrappers pass isinstance checks for the type they wrap, but code that
+    needs the real type (json.dumps without an indent, for instance) has to
+    be given a copy.deepcopy() of them, which is a plain dict or list.
+    """
+
+    def __init__(self, lock=None):
+        self._lock = threading.RLock() if lock is None else lock
+        self._clear()
+
+    def _clear(self):
+        # The copies of dicts and lists in the aggregate that have been
+        # changed, by the id of the original: [original, copy, changed keys]
+        # for dicts, and [original, copy, length] for lists, where length is
+        # the original length if the copy has only been appended to and None
+        # otherwise
+        self._copies = {}
+        # Dicts and lists that the topping stored but that weren't in the
+        # aggregate, and ones in the aggregate that it stored inside of those,
+        # by id (keeping them alive, so that ids aren't reused)
+        self._created = {}
+        self._moved = {}
+        # Wrappers by the id of what they wrap, so that each object has a
+        # single wrapper
+        self._wrappers = {}
+
+    def wrap(self, value, created=False):
+        """
+        Wraps `value` if it is a dict or list.  `created` is whether it was
+        found in a dict or list the topping created, rather than one in the
+        aggregate.
+        """
+        if not isinstance(value, (dict, list)) or type(value) in _WRAPPERS:
+            return value
+        key = id(value)
+        if created and key not in self._moved or key in self._created:
+            self._created[key] = value
+        wrapper = self._wrappers.get(key)
+        if wrapper is None:
+            if isinstance(value, dict):
+                wrapper = TransactionalDict(self, value)
+            else:
+                wrapper = TransactionalList(self, value)
+            self._wrappers[key] = wrapper
+        return wrapper
+
+    def _reading(self, data):
+        """
+        Returns what reads of `data` should go to, and whether the topping
+        created it.
+        """
+        if id(data) in self._created:
+            return data, True
+        entry = self._copies.get(id(data))
+        return (data if entry is None else entry[1]), False
+
+    def _iterating(self, data):
+        """
+        Returns what iterating over `data` should go over, and whether the
+        topping created it.
+        """
+        view, created = self._reading(data)
+        if view is data and not created:
+            with self._lock:
+                view = data.copy()
+        return view, created
+
+    def _store(self, value):
+        """Returns what to store for `value`, noting where it came from."""
+        if type(value) in _WRAPPERS:
+            value = value._data
+            if id(value) not in self._created:
+                self._moved[id(value)] = value
+        elif isinstance(value, (dict, list)):
+            self._created[id(value)] = value
+        return value
+
+    def _dict_for_writing(self, data, key):
+        """Returns what a change to `key` of `data` should go to."""
+        if id(data) in self._created:
+            return data
+        entry = self._copies.get(id(data))
+        if entry is None:
+            with self._lock:
+                entry = [data, data.copy(), set()]
+            self._copies[id(data)] = entry
+        entry[2].add(key)
+        return entry[1]
+
+    def _list_for_writing(self, data, appending=False):
+        """Returns what a change to `data` should go to."""
+        if id(data) in self._created:
+            return data
+        entry = self._copies.get(id(data))
+        if entry is None:
+            with self._lock:
+                entry = [data, data[:], len(data)]
+            self._copies[id(data)] = entry
+        if not appending:
+            entry[2] = None
+        return entry[1]
+
+    def commit(self):
+        """Writes every change made so far into the aggregate."""
+        with self._lock:
+            for data, changed, info in self._copies.values():
+                if isinstance(data, dict):
+                    for key in info:
+                        if key in changed:
+                            data[key] = _unwrap_all(changed[key])
+                        else:
+                            data.pop(key, None)
+                elif info is None:
+                    data[:] = [_unwrap_all(value) for value in changed]
+                else:
+                    data.extend(_unwrap_all(value) for value in changed[info:])
+        self._clear()
+
+    def rollback(self):
+        """Drops every change made since the last commit."""
+        self._clear()
+
+
+def _unwrap_all(value):
+    """
+    Replaces wrappers with what they wrap throughout `value`, which can end up
+    with some if it was built from wrapped values (for instance with dict()).
+    """
+    if type(value) in _WRAPPERS:
+        value = value._data
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(child, (dict, list)):
+                value[key] = _unwrap_all(child)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            if isinstance(child, (dict, list)):
+                value[index] = _unwrap_all(child)
+    return value
+
+
+class TransactionalDict(MutableMapping):
+    """A dict in the aggregate, whose changes are kept by a Transaction."""
+
+    __slots__ = ('_transaction', '_data')
+    __hash__ = None
+
+    def __init__(self, transaction, data):
+        self._transaction = transaction
+        self._data = data
+
+    # Pass isinstance(value, dict) checks, as the wrapped dict would
+    @property
+    def __class__(self):
+        return type(self._data)
+
+    def __getitem__(self, key):
+        data, created = self._transaction._reading(self._data)
+        return self._transaction.wrap(data[key], created)
+
+    def __setitem__(self, key, value):
+        transaction = self._transaction
+        data = transaction._dict_for_writing(self._data, key)
+        data[key] = transaction._store(value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        del self._transaction._dict_for_writing(self._data, key)[key]
+
+    def __contains__(self, key):
+        return key in self._transaction._reading(self._data)[0]
+
+    def __iter__(self):
+        return iter(self._transaction._iterating(self._data)[0])
+
+    def __len__(self):
+        return len(self._transaction._reading(self._data)[0])
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def copy(self):
+        # A plain dict, whose nested dicts and lists are still wrapped so that
+        # changes to them are kept by the transaction
+        return dict(self.items())
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+
+class TransactionalList(MutableSequence):
+    """A list in the aggregate, whose changes are kept by a Transaction."""
+
+    __slots__ = ('_transaction', '_data')
+    __hash__ = None
+
+    def __init__(self, transaction, data):
+        self._transaction = transaction
+        self._data = data
+
+    # Pass isinstance(value, list) checks, as the wrapped list would
+    @property
+    def __class__(self):
+        return type(self._data)
+
+    def __getitem__(self, index):
+        transaction = self._transaction
+        data, created = transaction._reading(self._data)
+        if isinstance(index, slice):
+            return [transaction.wrap(value, created) for value in data[index]]
+        return transaction.wrap(data[index], created)
+
+    def __setitem__(self, index, value):
+        transaction = self._transaction
+        data = transaction._list_for_writing(self._data)
+        if isinstance(index, slice):
+            data[index] = [transaction._store(v) for v in value]
+        else:
+            data[index] = transaction._store(value)
+
+    def __delitem__(self, index):
+        del self._transaction._list_for_writing(self._data)[index]
+
+    def __len__(self):
+        return len(self._transaction._reading(self._data)[0])
+
+    def __iter__(self):
+        transaction = self._transaction
+        data, created = transaction._iterating(self._data)
+        for value in data:
+            yield transaction.wrap(value, created)
+
+    def __eq__(self, other):
+        return list(self) == other
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def insert(self, index, value):
+        transaction = self._transaction
+        appending = index >= len(self)
+        data = transaction._list_for_writing(self._data, appending)
+        data.insert(index, transaction._store(value))
+
+    def append(self, value):
+        transaction = self._transaction
+        data = transaction._list_for_writing(self._data, True)
+        data.append(transaction._store(value))
+
+    def extend(self, values):
+        transaction = self._transaction
+        # Stored first, in case values come from this list
+        values = [transaction._store(value) for value in values]
+        transaction._list_for_writing(self._data, True).extend(values)
+
+    def sort(self, *args, **kwargs):
+        self._transaction._list_for_writing(self._data).sort(*args, **kwargs)
+
+    def copy(self):
+        # A plain list, whose nested dicts and lists are still wrapped so that
+        # changes to them are kept by the transaction
+        return list(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(value, memo) for value in self]
+
+
+_WRAPPERS = (TransactionalDict, TransactionalList)
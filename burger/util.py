@@ -7,6 +7,8 @@ from jawa.constants import ConstantClass, String
 from jawa.util.bytecode import Operand
 from jawa.util.descriptor import method_descriptor
 
+from burger import tracing
+
 # See https://docs.oracle.com/javase/specs/jvms/se8/html/jvms-4.html#jvms-4.4.8
 REF_getField = 1
 REF_getStatic = 2
@@ -554,6 +556,17 @@ def walk_method(cf, method, callback, input_args=None):
     """
     assert isinstance(callback, WalkerCallback)
 
+    if tracing.TRACER is None:
+        return _walk_method(cf, method, callback, input_args)
+
+    with tracing.span(
+        f'{cf.this.name.value}.{method.name.value}{method.descriptor.value}',
+        'walk_method',
+    ):
+        return _walk_method(cf, method, callback, input_args)
+
+
+def _walk_method(cf, method, callback, input_args):
     stack = []
     locals = {}
     cur_index = 0
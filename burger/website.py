@@ -3,6 +3,8 @@ import logging
 import os
 import urllib.request
 
+from burger import tracing
+
 VERSION_MANIFEST = 'https://piston-meta.mojang.com/mc/game/version_manifest_v2.json'
 
 _cached_version_manifest = None
@@ -10,11 +12,12 @@ _cached_version_metas = {}
 
 
 def _load_json(url):
-    stream = urllib.request.urlopen(url)
-    try:
-        return json.load(stream)
-    finally:
-        stream.close()
+    with tracing.span(url, 'download'):
+        stream = urllib.request.urlopen(url)
+        try:
+            return json.load(stream)
+        finally:
+            stream.close()
 
 
 def get_version_manifest():
@@ -69,7 +72,8 @@ def client_jar(version: str):
         )
         url = meta['downloads']['client']['url']
         logging.info(f'Downloading {version} from {url}')
-        urllib.request.urlretrieve(url, filename=filename)
+        with tracing.span(url, 'download'):
+            urllib.request.urlretrieve(url, filename=filename)
     return filename
 
 
@@ -83,7 +87,8 @@ def mappings_txt(version: str):
         )
         url = meta['downloads']['client_mappings']['url']
         logging.info(f'Downloading {version} mappings from {url}')
-        urllib.request.urlretrieve(url, filename=filename)
+        with tracing.span(url, 'download'):
+            urllib.request.urlretrieve(url, filename=filename)
     return filename
 
 
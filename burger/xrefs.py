@@ -0,0 +1,93 @@
+import threading
+from typing import NamedTuple
+
+from burger import tracing
+from burger.jarindex import scan_class
+
+
+class Site(NamedTuple):
+    """Where a field or method is referenced."""
+
+    class_name: str
+    method_name: str
+    method_descriptor: str
+    offset: int
+    # 'call', 'read' or 'write'
+    kind: str
+
+
+class XrefIndex:
+    """
+    Maps every field and method (by owner, name and descriptor) to the places
+    in the jar's code that reference it.  Each class is only scanned once it
+    is first asked about, straight from its bytes and without disassembling
+    anything, and the results are kept for the rest of the run.
+    """
+
+    def __init__(self, classloader):
+        self.classloader = classloader
+        # Class name -> [((owner, name, descriptor), Site)]
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def references_in(self, class_name: str):
+        """
+        Returns every reference made by the code of `class_name`, in order,
+        as ((owner, name, descriptor), Site) pairs.
+        """
+        references = self._classes.get(class_name)
+        if references is not None:
+            return references
+
+        found = []
+        with tracing.span(class_name, 'class.xrefs'):
+            with self.classloader.open(f'{class_name}.class') as source:
+                scan_class(source, found)
+
+        references = [
+            (
+                (
+                    constant.class_.name.value,
+                    constant.name_and_type.name.value,
+                    constant.name_and_type.descriptor.value,
+                ),
+                Site(class_name, method_name, method_descriptor, offset, kind),
+            )
+            for method_name, method_descriptor, offset, kind, constant in found
+        ]
+        with self._lock:
+            return self._classes.setdefault(class_name, references)
+
+    def _sites(self, name, descriptor, owner, within, kinds):
+        if within is None:
+            within = self.classloader.paths.classes
+        elif isinstance(within, str):
+            within = [within]
+
+        sites = []
+        for class_name in within:
+            for key, site in self.references_in(class_name):
+                if (
+                    key[1] == name
+                    and site.kind in kinds
+                    and (owner is None or key[0] == owner)
+                    and (descriptor is None or key[2] == descriptor)
+                ):
+                    sites.append(site)
+        return sites
+
+    def callers(self, name, descriptor=None, *, owner=None, within=None):
+        """
+        Returns the sites that call the method `name` (with `descriptor` and
+        declared on `owner`, if given), in the classes named by `within` (a
+        class name or several), or in the whole jar if it isn't given.
+        """
+        return self._sites(name, descriptor, owner, within, ('call',))
+
+    def accesses(
+        self, name, descriptor=None, *, owner=None, within=None, kinds=('read', 'write')
+    ):
+        """
+        Returns the sites that read or write the field `name`, like callers().
+        """
+        return self._sites(name, descriptor, owner, within, kinds)
@@ -2,57 +2,96 @@ import argparse
 import json
 import logging
 import os
+import sqlite3
 import sys
-import traceback
 import urllib
+from contextlib import nullcontext
 
-from jawa.classloader import ClassLoader
 from jawa.transforms import expand_constants, simple_swap
 
-from burger import website
+from burger import (
+    columns,
+    database,
+    demand,
+    incremental,
+    jarindex,
+    parallel,
+    selection,
+    states,
+    tracing,
+    website,
+)
+from burger.classloader import JarClassLoader
 from burger.mappings import Mappings, set_global_mappings
+from burger.output import write_sharded
+from burger.profiling import ToppingProfiler
+from burger.registry import load_toppings
 from burger.roundedfloats import transform_floats
+from burger.scheduler import ToppingScheduler
 
 
-def import_toppings():
+class DependencyNode:
+    def __init__(self, topping):
+        self.topping = topping
+        self.provides = topping.PROVIDES
+        self.depends = topping.DEPENDS
+        self.childs = []
+
+    def __repr__(self):
+        return str(self.topping)
+
+
+def order_toppings(loaded_toppings, all_toppings):
     """
-    Attempts to imports either a list of toppings or, if none were
-    given, attempts to load all available toppings.
+    Orders the given toppings so that every topping runs after the toppings it
+    depends on, pulling in any missing dependencies from `all_toppings`.
     """
-    this_dir = os.path.dirname(__file__)
-    toppings_dir = os.path.join(this_dir, 'burger', 'toppings')
-    from_list = []
-
-    # Traverse the toppings directory and import everything.
-    for root, dirs, files in os.walk(toppings_dir):
-        for file_ in files:
-            if not file_.endswith('.py'):
-                continue
-            elif file_.startswith('__'):
-                continue
-            elif file_ == 'topping.py':
-                continue
-
-            from_list.append(file_[:-3])
-
-    from burger.toppings.topping import Topping
-
-    toppings = {}
-    last = Topping.__subclasses__()
-
-    for topping in from_list:
-        __import__('burger.toppings.%s' % topping)
-        current = Topping.__subclasses__()
-        subclasses = list([o for o in current if o not in last])
-        last = Topping.__subclasses__()
-        if len(subclasses) == 0:
-            logging.error(f"Topping '{topping}' contains no topping")
-        elif len(subclasses) >= 2:
-            logging.error(f"Topping '{topping}' contains more than one topping")
-        else:
-            toppings[topping] = subclasses[0]
+    # Order topping execution by building dependency tree
+    topping_nodes = []
+    topping_provides = {}
+    for topping in loaded_toppings:
+        topping_node = DependencyNode(topping)
+        topping_nodes.append(topping_node)
+        for provides in topping_node.provides:
+            topping_provides[provides] = topping_node
+
+    # Include missing dependencies
+    for topping in topping_nodes:
+        for dependency in topping.depends:
+            if dependency not in topping_provides:
+                for other_topping in all_toppings.values():
+                    if dependency in other_topping.PROVIDES:
+                        topping_node = DependencyNode(other_topping)
+                        topping_nodes.append(topping_node)
+                        for provides in topping_node.provides:
+                            topping_provides[provides] = topping_node
+
+    # Find dependency childs
+    for topping in topping_nodes:
+        for dependency in topping.depends:
+            if dependency not in topping_provides:
+                sys.stderr.write(f'({topping}) requires ({dependency})')
+                sys.exit(1)
+            if topping_provides[dependency] not in topping.childs:
+                topping.childs.append(topping_provides[dependency])
+
+    # Run leaves first
+    to_be_run = []
+    while len(topping_nodes) > 0:
+        stuck = True
+        for topping in topping_nodes:
+            if len(topping.childs) == 0:
+                stuck = False
+                for parent in topping_nodes:
+                    if topping in parent.childs:
+                        parent.childs.remove(topping)
+                to_be_run.append(topping.topping)
+                topping_nodes.remove(topping)
+        if stuck:
+            sys.stderr.write("Can't resolve dependencies")
+            sys.exit(1)
 
-    return toppings
+    return to_be_run
 
 
 if __name__ == '__main__':
@@ -67,13 +106,78 @@ if __name__ == '__main__':
     )
     parser.add_argument('-t', '--toppings')
     parser.add_argument('-o', '--output')
+    parser.add_argument(
+        '-O',
+        '--output-dir',
+        help='Write each top-level section to its own file in this directory, along with an index.json manifest',
+    )
     parser.add_argument(
         '-L',
         '--log',
         help="The log level, may be 'error', 'warn', 'info', or 'debug'. Defaults to 'info'.",
         default='info',
     )
+    parser.add_argument(
+        '--sqlite',
+        help='Store the results in this SQLite database (created if needed) instead of writing JSON, unless --output is also passed',
+    )
     parser.add_argument('-c', '--compact', action='store_true')
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='The number of worker processes toppings that support it (such as identify) and --output-dir may use, or 0 for one per CPU. Defaults to 1, meaning no workers.',
+    )
+    parser.add_argument(
+        '-p',
+        '--profile',
+        action='store_true',
+        help='Print the time, memory and class loads used by each topping to stderr',
+    )
+    parser.add_argument(
+        '--profile-output', help='Also write the profiling report to this JSON file'
+    )
+    parser.add_argument(
+        '--trace',
+        help='Write a Chrome trace-event JSON file (viewable in Perfetto) covering toppings, class parses, walk_method calls, packet decompilation and downloads',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='The number of toppings that may run at the same time (in threads), as soon as their dependencies are available. Defaults to 1, running toppings one after another.',
+    )
+    parser.add_argument(
+        '--lazy',
+        action='store_true',
+        help='Only compute what the toppings passed with -t need, rather than everything their dependencies provide. -t may then also name individual provides, such as identify.block.list',
+    )
+    parser.add_argument(
+        '--select',
+        help='Only output these comma-separated aggregate paths, such as blocks.block.*.states or tags.items/*, and only run the toppings needed for them. Implies --lazy.',
+    )
+    parser.add_argument(
+        '--states-table',
+        help='Also write a dense table of every block state to this file, which burger.states can load to convert state ids to and from blocks and property values',
+    )
+    parser.add_argument(
+        '--block-columns',
+        help='Also write the hardness, resistance, friction, light and solidity of every block, by block and by state id, to this NumPy .npz file (requires NumPy)',
+    )
+    parser.add_argument(
+        '--no-jar-index',
+        action='store_true',
+        help="Don't load or save the jar metadata index that's normally stored next to the jar",
+    )
+    parser.add_argument(
+        '--previous',
+        help='The output of a previous run (from --output or --output-dir), whose identified classes are checked before scanning the jar',
+    )
+    parser.add_argument(
+        '--previous-mappings',
+        help="The mappings of the version --previous was run on. Downloaded using the previous run's version id if not given.",
+    )
     parser.add_argument('-l', '--list', action='store_true')
     parser.add_argument('-m', '--mappings')
     parser.add_argument('-s', '--url')
@@ -84,7 +188,6 @@ if __name__ == '__main__':
         sys.exit(1)
 
     toppings = args.toppings.split(',') if args.toppings else None
-    output = open(args.output, 'w') if args.output else sys.stdout
     list_toppings = args.list
     compact = args.compact
     url = args.url
@@ -97,6 +200,21 @@ if __name__ == '__main__':
     logger = logging.getLogger(__name__)
     logging.basicConfig(level=args.log.upper())
 
+    if args.trace:
+        tracing.set_global_tracer(tracing.Tracer())
+
+    parallel.set_global_jobs(args.jobs)
+
+    if (args.profile or args.profile_output) and args.concurrency > 1:
+        # Memory and class load counts are process-wide, so each topping's
+        # numbers would include every other topping running alongside it
+        sys.stderr.write('--profile can only be used with --concurrency 1\n')
+        sys.exit(1)
+
+    if args.block_columns and columns.numpy is None:
+        sys.stderr.write('NumPy is needed for --block-columns\n')
+        sys.exit(1)
+
     if '://' in args.version:
         # Download a JAR from the given URL
         url_path = args.version
@@ -123,8 +241,27 @@ if __name__ == '__main__':
 
     set_global_mappings(Mappings.parse(open(mappings_path, 'r').read()))
 
-    # Load all toppings
-    all_toppings = import_toppings()
+    if args.previous:
+        previous = incremental.load_previous_aggregate(args.previous)
+        previous_mappings_path = args.previous_mappings
+        if not previous_mappings_path:
+            previous_version = previous.get('version', {}).get('id')
+            if previous_version is None:
+                sys.stderr.write(
+                    "The previous run's version isn't known, please provide its mappings file using --previous-mappings\n"
+                )
+                sys.exit(1)
+            previous_mappings_path = website.mappings_txt(previous_version)
+        with open(previous_mappings_path, 'r') as fin:
+            previous_mappings = Mappings.parse(fin.read())
+        incremental.set_global_previous_classes(
+            incremental.deobfuscate_classes(
+                previous.get('classes', {}), previous_mappings
+            )
+        )
+
+    # Load all toppings, without importing them until we know which are needed
+    all_toppings = load_toppings()
 
     # List all of the available toppings,
     # as well as their docstring if available.
@@ -137,7 +274,32 @@ if __name__ == '__main__':
         sys.exit(0)
 
     # Get the toppings we want
-    if toppings is None:
+    select_paths = args.select.split(',') if args.select else None
+    if (args.states_table or args.block_columns) and (
+        toppings is not None or select_paths is not None
+    ):
+        # These are built from the blocks and their states, so they have to be
+        # found
+        toppings = (toppings or []) + ['blockstates']
+    if select_paths is not None:
+        # Selecting paths always runs lazily, as nothing else is output anyway
+        try:
+            requested = (toppings or []) + selection.selected_provides(
+                select_paths, all_toppings
+            )
+            loaded_toppings, demanded = demand.resolve(requested, all_toppings)
+        except Exception as e:
+            sys.stderr.write(f'{e}\n')
+            sys.exit(1)
+        demand.set_global_demand(demanded)
+    elif args.lazy and toppings is not None:
+        try:
+            loaded_toppings, demanded = demand.resolve(toppings, all_toppings)
+        except Exception as e:
+            sys.stderr.write(f'{e}\n')
+            sys.exit(1)
+        demand.set_global_demand(demanded)
+    elif toppings is None:
         loaded_toppings = all_toppings.values()
     else:
         loaded_toppings = []
@@ -147,68 +309,20 @@ if __name__ == '__main__':
             else:
                 loaded_toppings.append(all_toppings[topping])
 
-    class DependencyNode:
-        def __init__(self, topping):
-            self.topping = topping
-            self.provides = topping.PROVIDES
-            self.depends = topping.DEPENDS
-            self.childs = []
-
-        def __repr__(self):
-            return str(self.topping)
-
-    # Order topping execution by building dependency tree
-    topping_nodes = []
-    topping_provides = {}
-    for topping in loaded_toppings:
-        topping_node = DependencyNode(topping)
-        topping_nodes.append(topping_node)
-        for provides in topping_node.provides:
-            topping_provides[provides] = topping_node
-
-    # Include missing dependencies
-    for topping in topping_nodes:
-        for dependency in topping.depends:
-            if dependency not in topping_provides:
-                for other_topping in all_toppings.values():
-                    if dependency in other_topping.PROVIDES:
-                        topping_node = DependencyNode(other_topping)
-                        topping_nodes.append(topping_node)
-                        for provides in topping_node.provides:
-                            topping_provides[provides] = topping_node
-
-    # Find dependency childs
-    for topping in topping_nodes:
-        for dependency in topping.depends:
-            if dependency not in topping_provides:
-                sys.stderr.write(f'({topping}) requires ({dependency})')
-                sys.exit(1)
-            if topping_provides[dependency] not in topping.childs:
-                topping.childs.append(topping_provides[dependency])
-
-    # Run leaves first
-    to_be_run = []
-    while len(topping_nodes) > 0:
-        stuck = True
-        for topping in topping_nodes:
-            if len(topping.childs) == 0:
-                stuck = False
-                for parent in topping_nodes:
-                    if topping in parent.childs:
-                        parent.childs.remove(topping)
-                to_be_run.append(topping.topping)
-                topping_nodes.remove(topping)
-        if stuck:
-            sys.stderr.write("Can't resolve dependencies")
-            sys.exit(1)
+    to_be_run = [
+        topping.load() for topping in order_toppings(loaded_toppings, all_toppings)
+    ]
 
     summary = []
 
-    classloader = ClassLoader(
+    classloader = JarClassLoader(
         client_path, max_cache=0, bytecode_transforms=[simple_swap, expand_constants]
     )
+    if not args.no_jar_index:
+        with tracing.span('jar index', 'jar'):
+            classloader.index = jarindex.load_or_build(client_path, classloader)
     names = classloader.path_map.keys()
-    num_classes = sum(1 for name in names if name.endswith('.class'))
+    num_classes = len(classloader.paths.classes)
 
     aggregate = {
         'source': {
@@ -219,33 +333,82 @@ if __name__ == '__main__':
         }
     }
 
-    available = []
-    for topping in to_be_run:
-        missing = [dep for dep in topping.DEPENDS if dep not in available]
-        if len(missing) != 0:
-            logging.debug(f'Dependencies failed for {topping}: Missing {missing}')
-            continue
-
-        orig_aggregate = aggregate.copy()
+    profiler = None
+    if args.profile or args.profile_output:
+        profiler = ToppingProfiler(classloader)
+
+    def run_topping(topping, topping_aggregate):
+        with (
+            profiler.profile(topping) if profiler else nullcontext(),
+            tracing.span(topping.__name__, 'topping'),
+        ):
+            topping.act(topping_aggregate, classloader)
+
+    ToppingScheduler(
+        to_be_run,
+        aggregate,
+        run_topping,
+        concurrency=args.concurrency,
+        on_available=profiler.mark_available if profiler else None,
+    ).run()
+
+    if classloader.index is not None:
         try:
-            topping.act(aggregate, classloader)
-            available.extend(topping.PROVIDES)
-        except Exception:
-            aggregate = orig_aggregate  # If the topping failed, don't leave things in an incomplete state
-            logger.debug(f'Failed to run {topping}')
-            if logging.root.isEnabledFor(logging.DEBUG):
-                traceback.print_exc()
+            classloader.index.save_statics(jarindex.index_path(client_path))
+        except sqlite3.Error as e:
+            logging.warning(f'Unable to update the jar index: {e}')
+
+    if profiler:
+        profiler.stop()
+        if args.profile:
+            sys.stderr.write(profiler.format_table() + '\n')
+        if args.profile_output:
+            profiler.write_json(args.profile_output)
+
+    if args.states_table:
+        if 'min_state_id' in next(
+            iter(aggregate.get('blocks', {}).get('block', {}).values()), {}
+        ):
+            states.StateTable.build(aggregate['blocks']).save(args.states_table)
+        else:
+            logging.error("Block states weren't found, so no state table was written")
+
+    if args.block_columns:
+        if 'blocks' in aggregate:
+            columns.write_block_columns(aggregate['blocks'], args.block_columns)
+        else:
+            logging.error("Blocks weren't found, so no block columns were written")
+
+    if select_paths is not None:
+        aggregate = selection.select(aggregate, select_paths)
 
     summary.append(aggregate)
 
-    if not compact:
-        json.dump(transform_floats(summary), output, sort_keys=True, indent=4)
+    if tracing.TRACER:
+        tracing.TRACER.write(args.trace)
+
+    if args.sqlite:
+        connection = database.connect(args.sqlite)
+        try:
+            database.write_aggregate(connection, aggregate)
+        finally:
+            connection.close()
+
+    if args.output_dir:
+        write_sharded(aggregate, args.output_dir, compact, parallel.JOBS)
+    elif args.sqlite and not args.output:
+        pass
     else:
-        json.dump(transform_floats(summary), output)
+        output = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            if not compact:
+                json.dump(transform_floats(summary), output, sort_keys=True, indent=4)
+            else:
+                json.dump(transform_floats(summary), output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
 
     # Cleanup temporary downloads (the URL download is temporary)
     if url_path:
         os.remove(url_path)
-    # Cleanup file output (if used)
-    if output is not sys.stdout:
-        output.close()
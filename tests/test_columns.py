@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from burger import columns
+from tests.test_states import make_blocks
+
+
+@unittest.skipIf(columns.numpy is None, 'NumPy is not installed')
+class BlockColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.blocks = make_blocks()
+        for numeric_id, text_id in enumerate(self.blocks['ordered_blocks']):
+            block = self.blocks['block'][text_id]
+            block['numeric_id'] = numeric_id
+            block['max_state_id'] = block['min_state_id'] + block['num_states'] - 1
+        self.blocks['block']['stairs'].update(hardness=2.0, resistance=3.0)
+        # Not a constant, so it isn't stored
+        self.blocks['block']['wheat']['light'] = {'field': 'a.b'}
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'blocks.npz')
+            columns.write_block_columns(self.blocks, path)
+            with columns.numpy.load(path) as data:
+                text_ids = list(data['text_ids'])
+                blocks = data['blocks']
+                states = data['states']
+
+        self.assertEqual(text_ids, ['air', 'stairs', 'wheat'])
+        self.assertEqual(list(blocks['numeric_id']), [0, 1, 2])
+        self.assertEqual(list(blocks['hardness']), [0.0, 2.0, 0.0])
+        self.assertEqual(list(blocks['resistance']), [0.0, 3.0, 0.0])
+        self.assertAlmostEqual(float(blocks['friction'][0]), 0.6, places=6)
+        self.assertEqual(list(blocks['light']), [0, 0, -1])
+        self.assertEqual(list(blocks['min_state_id']), [0, 1, 17])
+        self.assertEqual(list(blocks['max_state_id']), [0, 16, 24])
+
+        self.assertEqual(len(states), 25)
+        for state_id, state in enumerate(states):
+            block = blocks[state['block']]
+            self.assertLessEqual(block['min_state_id'], state_id)
+            self.assertLessEqual(state_id, block['max_state_id'])
+            self.assertEqual(state['packed'], state_id - block['min_state_id'])
+            self.assertEqual(state['hardness'], block['hardness'])
+
+    def test_without_states(self):
+        for block in self.blocks['block'].values():
+            for name in columns.STATE_ID_COLUMNS:
+                del block[name]
+        arrays = columns.block_arrays(self.blocks)
+        self.assertEqual(list(arrays['blocks']['num_states']), [-1, -1, -1])
+        self.assertEqual(len(arrays['states']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
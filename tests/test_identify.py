@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+from burger.toppings import identify
+from burger.toppings.identify import IGNORE_DUPLICATES, IdentifyTopping
+
+
+def jar_order(results):
+    """
+    Stands in for _identify_all, yielding `results` and then failing if the
+    scan goes on past them.
+    """
+    yield from results
+    raise AssertionError('The scan went on after every key was found')
+
+
+class IdentifyTest(unittest.TestCase):
+    def act(self, keys, known, results):
+        missing = sorted(keys - known.keys())
+        aggregate = {}
+        with (
+            mock.patch.object(identify, 'demanded_keys', return_value=keys),
+            mock.patch.object(
+                identify, 'identify_known', return_value=(dict(known), missing)
+            ),
+            mock.patch.object(
+                identify, '_identify_all', return_value=jar_order(results)
+            ),
+        ):
+            IdentifyTopping.act(aggregate, None)
+        return aggregate['classes']
+
+    def test_scan_stops_once_mappings_cover_every_key(self):
+        keys = {
+            'block.list',
+            'block.register',
+            'item.list',
+            'item.register',
+            'recipe.superclass',
+            'sounds.event',
+            'sounds.list',
+            'nethandler.client',
+            'packet.packetbuffer',
+        }
+        known = {
+            'block.list': 'a',
+            'item.list': 'b',
+            'sounds.event': 'c',
+        }
+        classes = self.act(
+            keys,
+            known,
+            [
+                ('nethandler.client', 'd'),
+                # Later matches of keys in IGNORE_DUPLICATES are left alone
+                ('nethandler.client', 'e'),
+                ('packet.packetbuffer', 'f'),
+            ],
+        )
+        self.assertEqual(classes['nethandler.client'], 'd')
+        self.assertEqual(classes['packet.packetbuffer'], 'f')
+        self.assertEqual(classes['sounds.list'], 'c')
+        self.assertNotIn('block.register', classes)
+
+    def test_no_scan_when_only_older_keys_are_missing(self):
+        keys = {'block.list', 'block.register', 'recipe.superclass'}
+        classes = self.act(keys, {'block.list': 'a'}, [])
+        self.assertEqual(classes, {'block.list': 'a'})
+
+    def test_everything_is_scanned_for_without_mappings(self):
+        keys = {'block.list', 'block.register', 'recipe.superclass'}
+        wanted, required = identify.scan_keys(sorted(keys), {})
+        self.assertEqual(wanted, keys)
+        self.assertEqual(required, keys)
+
+    def test_ignore_duplicates_are_scanned_for(self):
+        keys = set(IGNORE_DUPLICATES)
+        wanted, required = identify.scan_keys(sorted(keys), {'block.list': 'a'})
+        self.assertEqual(required, keys)
+
+    def test_previous_classes_of_ignore_duplicates_are_not_candidates(self):
+        previous = {'nethandler.client': 'a.b', 'item.list': 'c.d'}
+        with mock.patch.object(identify.incremental, 'PREVIOUS_CLASSES', previous):
+            candidates = identify.known_candidates({'nethandler.client', 'item.list'})
+        self.assertNotIn('nethandler.client', candidates)
+        self.assertEqual(candidates['item.list'][0], 'c.d')
+
+
+if __name__ == '__main__':
+    unittest.main()
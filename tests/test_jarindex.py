@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from burger import jarindex
+
+
+class ClassLoader:
+    """Stands in for a JarClassLoader of a jar with only resources in it."""
+
+    def __init__(self, paths):
+        self.path_map = dict.fromkeys(paths)
+
+
+class JarIndexTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.jar_path = os.path.join(directory.name, 'client.jar')
+        with open(self.jar_path, 'wb') as fout:
+            fout.write(b'not really a jar')
+        self.classloader = ClassLoader(['pack.mcmeta', 'assets/a.json'])
+
+    def test_classes_are_read_when_needed(self):
+        index = jarindex.load_or_build(self.jar_path, self.classloader)
+        self.assertFalse(index.has_classes)
+        self.assertFalse(os.path.exists(jarindex.index_path(self.jar_path)))
+
+        self.assertEqual(index.resources, ['pack.mcmeta', 'assets/a.json'])
+        self.assertTrue(index.has_classes)
+        loaded = jarindex.load_or_build(self.jar_path, None)
+        self.assertTrue(loaded.has_classes)
+        self.assertEqual(loaded.resources, ['pack.mcmeta', 'assets/a.json'])
+
+    def test_statics_without_classes(self):
+        index = jarindex.load_or_build(self.jar_path, self.classloader)
+        index.add_statics('a', '{"b": "stone"}')
+        index.save_statics(jarindex.index_path(self.jar_path))
+        self.assertFalse(index.has_classes)
+
+        loaded = jarindex.load_or_build(self.jar_path, self.classloader)
+        self.assertEqual(loaded.statics, {'a': '{"b": "stone"}'})
+        self.assertFalse(loaded.has_classes)
+        # The classes are still read once they're needed
+        self.assertEqual(loaded.resources, ['pack.mcmeta', 'assets/a.json'])
+        self.assertTrue(
+            jarindex.load_or_build(self.jar_path, self.classloader).has_classes
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import json
+import unittest
+
+from burger.registry import MANIFEST_PATH, build_manifest, topping_modules
+
+
+class ManifestTest(unittest.TestCase):
+    def test_manifest_is_up_to_date(self):
+        with open(MANIFEST_PATH, 'r') as fin:
+            manifest = json.load(fin)
+        self.assertEqual(
+            manifest,
+            build_manifest(sorted(topping_modules())),
+            'Rebuild the manifest with `python -m burger.registry`',
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+from jawa.assemble import assemble
+from jawa.cf import ClassFile
+
+from burger.statics import StaticTable
+from burger.toppings import sounds
+from burger.toppings.sounds import SoundTopping
+from tests.test_statics import ClassLoader
+
+
+def make_sound_events():
+    cf = ClassFile.create('a')
+    register = cf.constants.create_method_ref('a', 'a', '(Ljava/lang/String;)La;')
+    code = []
+    for name, value in (('b', 'ambient.cave'), ('c', 'Not a sound')):
+        code.append(('ldc', cf.constants.create_string(value)))
+        if name == 'b':
+            code.append(('invokestatic', register))
+        code.append(('putstatic', cf.constants.create_field_ref('a', name, 'La;')))
+    code.append(('return',))
+
+    method = cf.methods.create('<clinit>', '()V', code=True)
+    method.access_flags.acc_static = True
+    method.code.max_stack = 2
+    method.code.assemble(assemble(code))
+    cf.classloader = ClassLoader(a=cf)
+    cf.classloader.statics = StaticTable(cf.classloader)
+    return cf
+
+
+class SoundTest(unittest.TestCase):
+    def test_fields(self):
+        cf = make_sound_events()
+        aggregate = {
+            'classes': {'sounds.event': 'a', 'sounds.list': 'a'},
+            'version': {'id': '1.21.5'},
+            'language': {'subtitles': {}},
+        }
+        with (
+            mock.patch.object(sounds.website, 'get_version_meta'),
+            mock.patch.object(
+                sounds.website, 'get_asset_index', return_value={'objects': {}}
+            ),
+            mock.patch.object(sounds, 'get_sounds', return_value={}),
+        ):
+            SoundTopping.act(aggregate, cf.classloader)
+
+        self.assertEqual(
+            aggregate['sounds'],
+            {'ambient.cave': {'name': 'ambient.cave', 'id': 0, 'field': 'b'}},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from burger import states
+from burger.states import StateTable
+
+
+def make_blocks():
+    return {
+        'ordered_blocks': ['air', 'stairs', 'wheat'],
+        'block': {
+            'air': {'states': [], 'num_states': 1, 'min_state_id': 0},
+            'stairs': {
+                'states': [
+                    {
+                        'name': 'facing',
+                        'type': 'direction',
+                        'values': ['north', 'south', 'west', 'east'],
+                    },
+                    {'name': 'half', 'type': 'enum', 'values': ['top', 'bottom']},
+                    {'name': 'waterlogged', 'type': 'bool'},
+                ],
+                'num_states': 16,
+                'min_state_id': 1,
+            },
+            'wheat': {
+                'states': [{'name': 'age', 'type': 'int', 'min': 0, 'max': 7}],
+                'num_states': 8,
+                'min_state_id': 17,
+            },
+        },
+    }
+
+
+class StateTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = StateTable.build(make_blocks())
+
+    def test_decode(self):
+        self.assertEqual(self.table.decode(0), ('air', {}))
+        # The last property by name varies the fastest
+        self.assertEqual(
+            self.table.decode(2),
+            ('stairs', {'facing': 'north', 'half': 'top', 'waterlogged': False}),
+        )
+        self.assertEqual(
+            self.table.decode(5),
+            ('stairs', {'facing': 'south', 'half': 'top', 'waterlogged': True}),
+        )
+        self.assertEqual(self.table.decode(24), ('wheat', {'age': 7}))
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.table), 25)
+        for state_id in range(len(self.table)):
+            self.assertEqual(self.table.encode(*self.table.decode(state_id)), state_id)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'states.bin')
+            self.table.save(path)
+            loaded = StateTable.load(path)
+        for state_id in range(len(self.table)):
+            self.assertEqual(loaded.decode(state_id), self.table.decode(state_id))
+        self.assertEqual(loaded.encode('wheat', {'age': 3}), 20)
+
+    def check_many(self):
+        state_ids = list(range(len(self.table)))
+        indices, value_indices = self.table.decode_many(state_ids)
+        self.assertEqual(list(indices[:3]), [0, 1, 1])
+        self.assertEqual(list(value_indices[5]), [1, 0, 0])
+        encoded = self.table.encode_many(indices, value_indices)
+        self.assertEqual(list(encoded), state_ids)
+
+    @unittest.skipIf(states.numpy is None, 'NumPy is not installed')
+    def test_many_with_numpy(self):
+        self.check_many()
+
+    def test_many_without_numpy(self):
+        with mock.patch.object(states, 'numpy', None):
+            self.check_many()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from jawa.assemble import assemble
+from jawa.cf import ClassFile
+from jawa.transforms import expand_constants, simple_swap
+
+from burger.statics import StaticTable
+
+
+class ClassLoader(dict):
+    index = None
+    bytecode_transforms = [simple_swap, expand_constants]
+
+
+class StaticTableTest(unittest.TestCase):
+    def setUp(self):
+        self.cf = ClassFile.create('a')
+
+    def field(self, name):
+        return ('putstatic', self.cf.constants.create_field_ref('a', name, 'La;'))
+
+    def ldc(self, value):
+        return ('ldc', self.cf.constants.create_string(value))
+
+    def evaluate(self, code):
+        method = self.cf.methods.create('<clinit>', '()V', code=True)
+        method.access_flags.acc_static = True
+        method.code.max_stack = 4
+        method.code.assemble(assemble([*code, ('return',)]))
+        self.cf.classloader = ClassLoader(a=self.cf)
+        return StaticTable(self.cf.classloader).fields('a')
+
+    def test_evaluate(self):
+        create = self.cf.constants.create_method_ref(
+            'k', 'a', '(Ljava/lang/String;)La;'
+        )
+        fields = self.evaluate(
+            [
+                self.ldc('stone'),
+                ('invokestatic', create),
+                self.field('b'),
+                self.ldc('dirt'),
+                self.field('c'),
+            ]
+        )
+        self.assertEqual(
+            fields,
+            {
+                'b': {
+                    'invoke': 'k.a',
+                    'descriptor': '(Ljava/lang/String;)La;',
+                    'args': ['stone'],
+                },
+                'c': 'dirt',
+            },
+        )
+
+    def test_failed_walk_keeps_later_fields(self):
+        fields = self.evaluate(
+            [
+                self.ldc('stone'),
+                self.field('b'),
+                # Pops from an empty stack, which the walk can't follow
+                ('pop',),
+                self.ldc('dirt'),
+                self.field('c'),
+                self.ldc('sand'),
+                self.field('d'),
+            ]
+        )
+        self.assertEqual(fields, {'b': 'stone', 'c': 'dirt', 'd': 'sand'})
+
+
+if __name__ == '__main__':
+    unittest.main()
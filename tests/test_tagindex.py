@@ -0,0 +1,38 @@
+import unittest
+
+from burger.tagindex import TagIndex, registry_ids
+
+
+class TagIndexTest(unittest.TestCase):
+    def test_plural_tag_types(self):
+        aggregate = {
+            'blocks': {
+                'block': {'stone': {'numeric_id': 1}, 'dirt': {'numeric_id': 9}}
+            },
+            'tags': {
+                'block/mineable': {'type': 'block', 'values': ['minecraft:stone']},
+                'blocks/dirt': {'type': 'blocks', 'values': ['minecraft:dirt']},
+            },
+        }
+        registries = registry_ids(aggregate)
+        self.assertIs(registries['blocks'], registries['block'])
+        self.assertNotIn('items', registries)
+
+        tags = TagIndex.from_aggregate(aggregate)
+        self.assertTrue(tags.contains('block/mineable', 'stone'))
+        self.assertTrue(tags.contains('blocks/dirt', 'minecraft:dirt'))
+        self.assertFalse(tags.contains('blocks/dirt', 'stone'))
+        self.assertEqual(tags.ids('blocks/dirt'), [9])
+
+    def test_tag_ids_section(self):
+        aggregate = {
+            'blocks': {'block': {'stone': {'numeric_id': 1}}},
+            'tags': {'block/a': {'type': 'block', 'values': ['minecraft:stone']}},
+            # Taken as given rather than worked out again
+            'tag_ids': {'block/a': [4]},
+        }
+        self.assertEqual(TagIndex.from_aggregate(aggregate).ids('block/a'), [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
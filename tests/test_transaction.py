@@ -0,0 +1,160 @@
+import copy
+import json
+import threading
+import unittest
+
+from burger.transaction import Transaction
+
+
+def make_aggregate():
+    return {
+        'classes': {'block.list': 'a'},
+        'blocks': {'ordered_blocks': ['air', 'stone'], 'block': {'air': {'id': 0}}},
+    }
+
+
+class TransactionTest(unittest.TestCase):
+    def test_commit(self):
+        aggregate = make_aggregate()
+        transaction = Transaction()
+        wrapped = transaction.wrap(aggregate)
+        wrapped['classes']['item.list'] = 'b'
+        wrapped['blocks']['ordered_blocks'].append('dirt')
+        wrapped['blocks']['block']['air']['hardness'] = 0.0
+        wrapped['items'] = {'item': {}}
+        wrapped['items']['item']['stick'] = {'id': 1}
+        del wrapped['classes']['block.list']
+
+        # Nothing changes until the commit
+        self.assertEqual(aggregate, make_aggregate())
+        transaction.commit()
+
+        self.assertEqual(aggregate['classes'], {'item.list': 'b'})
+        self.assertEqual(
+            aggregate['blocks']['ordered_blocks'], ['air', 'stone', 'dirt']
+        )
+        self.assertEqual(
+            aggregate['blocks']['block']['air'], {'id': 0, 'hardness': 0.0}
+        )
+        self.assertEqual(aggregate['items'], {'item': {'stick': {'id': 1}}})
+
+    def test_reads_see_own_changes(self):
+        aggregate = make_aggregate()
+        wrapped = Transaction().wrap(aggregate)
+        blocks = wrapped['blocks']
+        blocks['block']['stone'] = {'id': 1}
+        blocks['ordered_blocks'].sort(reverse=True)
+
+        self.assertEqual(wrapped['blocks']['block']['stone'], {'id': 1})
+        self.assertEqual(list(wrapped['blocks']['ordered_blocks']), ['stone', 'air'])
+        self.assertNotIn('stone', aggregate['blocks']['block'])
+        self.assertEqual(aggregate['blocks']['ordered_blocks'], ['air', 'stone'])
+
+    def test_rollback(self):
+        aggregate = make_aggregate()
+        transaction = Transaction()
+        wrapped = transaction.wrap(aggregate)
+        wrapped['classes']['item.list'] = 'b'
+        wrapped['blocks']['ordered_blocks'].sort(reverse=True)
+        wrapped['blocks']['block']['air']['hardness'] = 0.0
+        wrapped['items'] = {}
+        transaction.rollback()
+        transaction.commit()
+
+        self.assertEqual(aggregate, make_aggregate())
+
+    def test_rollback_keeps_other_changes(self):
+        aggregate = make_aggregate()
+        failing = Transaction()
+        succeeding = Transaction()
+        failing.wrap(aggregate)['blocks']['ordered_blocks'].append('dirt')
+        succeeding.wrap(aggregate)['blocks']['ordered_blocks'].append('sand')
+        succeeding.wrap(aggregate)['classes']['item.list'] = 'b'
+        succeeding.commit()
+        failing.rollback()
+
+        self.assertEqual(
+            aggregate['blocks']['ordered_blocks'], ['air', 'stone', 'sand']
+        )
+        self.assertEqual(aggregate['classes'], {'block.list': 'a', 'item.list': 'b'})
+
+    def test_appends_are_merged(self):
+        aggregate = make_aggregate()
+        first = Transaction()
+        second = Transaction()
+        first.wrap(aggregate)['blocks']['ordered_blocks'].append('dirt')
+        second.wrap(aggregate)['blocks']['ordered_blocks'].extend(['sand', 'clay'])
+        second.commit()
+        first.commit()
+
+        self.assertEqual(
+            aggregate['blocks']['ordered_blocks'],
+            ['air', 'stone', 'sand', 'clay', 'dirt'],
+        )
+
+    def test_created_values_are_unwrapped(self):
+        aggregate = make_aggregate()
+        transaction = Transaction()
+        wrapped = transaction.wrap(aggregate)
+        # Built from wrapped values, and changed without going through a wrapper
+        section = {'air': wrapped['blocks']['block']['air']}
+        wrapped['copy'] = section
+        section['list'] = wrapped['blocks']['ordered_blocks']
+        transaction.commit()
+
+        self.assertIs(type(aggregate['copy']['air']), dict)
+        self.assertIs(type(aggregate['copy']['list']), list)
+        json.dumps(aggregate)
+
+    def test_copy(self):
+        aggregate = make_aggregate()
+        transaction = Transaction()
+        wrapped = transaction.wrap(aggregate)
+        blocks = wrapped['blocks'].copy()
+        blocks['block']['air']['hardness'] = 0.0
+        self.assertNotIn('hardness', aggregate['blocks']['block']['air'])
+        transaction.rollback()
+
+        self.assertEqual(aggregate, make_aggregate())
+
+    def test_deepcopy(self):
+        aggregate = make_aggregate()
+        transaction = Transaction()
+        wrapped = transaction.wrap(aggregate)
+        wrapped['blocks']['block']['air']['hardness'] = 0.0
+        blocks = copy.deepcopy(wrapped['blocks'])
+
+        self.assertIs(type(blocks), dict)
+        self.assertIs(type(blocks['ordered_blocks']), list)
+        self.assertEqual(blocks['block']['air'], {'id': 0, 'hardness': 0.0})
+        json.dumps(blocks)
+        blocks['block']['air']['id'] = 5
+        transaction.commit()
+        self.assertEqual(aggregate['blocks']['block']['air']['id'], 0)
+
+    def test_lock(self):
+        aggregate = make_aggregate()
+        lock = threading.RLock()
+        transaction = Transaction(lock)
+        wrapped = transaction.wrap(aggregate)
+        wrapped['classes']['item.list'] = 'b'
+
+        # Another thread holding the lock keeps the commit from happening
+        lock.acquire()
+        committing = threading.Thread(target=transaction.commit)
+        committing.start()
+        committing.join(0.05)
+        self.assertTrue(committing.is_alive())
+        self.assertNotIn('item.list', aggregate['classes'])
+        lock.release()
+        committing.join()
+        self.assertEqual(aggregate['classes']['item.list'], 'b')
+
+    def test_isinstance(self):
+        wrapped = Transaction().wrap(make_aggregate())
+        self.assertIsInstance(wrapped, dict)
+        self.assertIsInstance(wrapped['blocks']['ordered_blocks'], list)
+
+
+if __name__ == '__main__':
+    unittest.main()